@@ -1,11 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import joblib
-import re
 import plotly.express as px
 import warnings
 
+from screening import Screener, extract_number
+
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
@@ -23,32 +22,15 @@ def reset_app():
 # 1. Load Resources
 @st.cache_resource
 def load_resources():
-    try:
-        model = joblib.load('mental_health_hybrid_model.pkl')
-        encoders = joblib.load('label_encoders.pkl')
-        feature_columns = joblib.load('feature_columns.pkl')
-        return model, encoders, feature_columns
-    except Exception as e:
-        return None, None, None
-
-model, encoders, feature_columns = load_resources()
+    return Screener.load(cache_size=4096)
 
-if model is None:
-    st.error("🚨 Model files missing! Please upload .pkl files to GitHub.")
+try:
+    screener = load_resources()
+except Exception as e:  # missing files, checksum or schema mismatch: show the actual reason
+    st.error("🚨 Could not load the model.")
+    st.code(f"{type(e).__name__}: {e}")
     st.stop()
 
-# Helper: Extract numbers
-def extract_number(text):
-    try:
-        if pd.isna(text): return 0.0
-        text_str = str(text)
-        if '-' in text_str:
-            return float(text_str.split('-')[0].strip())
-        match = re.search(r"[-+]?\d*\.\d+|\d+", text_str)
-        return float(match.group()) if match else 0.0
-    except:
-        return 0.0
-
 # Helper: Wellness Tips
 def get_recommendations(condition):
     tips = {
@@ -156,26 +138,14 @@ st.divider()
 analyze_btn = st.button("🚀 Analyze My Mental Health", type="primary")
 
 if analyze_btn:
-    age_numeric = extract_number(age_input)
     cgpa_numeric = extract_number(cgpa_input)
     
-    input_dict = {}
-    if len(feature_columns) == 33:
-        input_dict[feature_columns[0]] = age_numeric
-        input_dict[feature_columns[1]] = gender
-        input_dict[feature_columns[2]] = uni
-        input_dict[feature_columns[3]] = dept
-        input_dict[feature_columns[4]] = year
-        input_dict[feature_columns[5]] = cgpa_numeric
-        input_dict[feature_columns[6]] = scholarship
-        for i in range(26):
-            input_dict[feature_columns[7+i]] = answers[i]
-            
-        input_df = pd.DataFrame([input_dict])
-        
+    profile = {"age": age_input, "gender": gender, "uni": uni, "dept": dept,
+               "year": year, "cgpa": cgpa_numeric, "sch": scholarship}
+    if len(screener.feature_columns) == 33:
         try:
             with st.spinner("AI Model is analyzing patterns..."):
-                probs = model.predict_proba(input_df)
+                results = screener.predict_one(profile, answers)
             
             st.subheader("📊 AI Diagnosis Result")
             result_cols = st.columns(3)
@@ -183,19 +153,10 @@ if analyze_btn:
             risk_scores = []
             healthy_count = 0
             
-            for i, cond in enumerate(conditions):
-                prob_arr = probs[i][0]
-                best_idx = np.argmax(prob_arr)
-                label = encoders[f'{cond} Label'].inverse_transform([best_idx])[0]
-                confidence = prob_arr[best_idx] * 100
+            for i, (cond, label, confidence, is_healthy, _, k) in enumerate(results):
                 
                 # Smart Label Mapping
-                display_label = label
-                if label == "Minimal Anxiety": display_label = "No Anxiety / Healthy"
-                if label == "Low Stress": display_label = "No Stress / Healthy"
-                if label == "No Depression" or label == "Minimal Depression": display_label = "No Depression / Healthy"
-
-                is_healthy = any(safe in label for safe in ["Minimal", "Low", "None", "No Depression"])
+                display_label = screener.labels.display(cond, k, "healthy")
                 
                 with result_cols[i]:
                     st.markdown(f"**{cond}**")
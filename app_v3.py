@@ -1,11 +1,13 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
-import re
+import os
+import time
+import uuid
 import warnings
 from datetime import datetime
 
+from screening import Attributor, Screener, ScoringTimeout, is_emergency, top_features, what_if
+from screening import metrics, tracing
+
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
@@ -19,7 +21,12 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Opt-in: MH_TRACE=traces.jsonl records the duration of each phase of every rerun (see trace_summary.py)
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+trace = tracing.get_tracer("app_v3").rerun(session_id)
+
 # --- CUSTOM CSS (SAFE & SCOPED for Dark/Light Mode) ---
+trace.start("styles")
 st.markdown("""
 <style>
     /* 1. General UI Elements */
@@ -123,6 +130,7 @@ st.markdown("""
     }
 </style>
 """, unsafe_allow_html=True)
+trace.end()
 
 # -----------------------------
 # 2. TRANSLATIONS & MAPPINGS
@@ -162,7 +170,15 @@ translations = {
         "emergency_text": "Your response indicates significant distress. If you feel unsafe, call 999 or a helpline immediately.",
         "clinical_note": "⚠️ **Clinical Note:** Self-harm risk detected despite low overall score.",
         "err_fill": "Please complete all fields correctly.",
-        "err_name": "Please enter a valid name (at least 3 letters)."
+        "err_name": "Please enter a valid name (at least 3 letters).",
+        "err_busy": "⏳ The system is busy right now. Please press Analyze again in a moment.",
+        "whatif_title": "🔍 What-if: answers that move this result",
+        "whatif_caption": "Each line changes one answer by one level and shows how the probability of the current result changes (percentage points).",
+        "whatif_up": "one level higher",
+        "whatif_down": "one level lower",
+        "why_title": "🧭 Why this result: answers and profile fields that drive it",
+        "why_caption": "Contribution of each answer or profile field to the probability of the current result, compared with a typical student (percentage points).",
+        "insight_show": "Show"
     },
     "Bangla": {
         "title": "শিক্ষার্থী মানসিক স্বাস্থ্য মূল্যায়ন",
@@ -198,7 +214,15 @@ translations = {
         "emergency_text": "আপনার উত্তর মানসিক ঝুঁকির ইঙ্গিত দিচ্ছে। নিজেকে আঘাত করার আশঙ্কা থাকলে এখনই ৯৯৯ বা হেল্পলাইনে কল করুন।",
         "clinical_note": "⚠️ **ক্লিনিক্যাল নোট:** সামগ্রিক স্কোর কম হলেও আত্মহানির ঝুঁকি দেখা যাচ্ছে।",
         "err_fill": "সব তথ্য সঠিকভাবে পূরণ করুন।",
-        "err_name": "সঠিক নাম লিখুন (অন্তত ৩টি অক্ষর)।"
+        "err_name": "সঠিক নাম লিখুন (অন্তত ৩টি অক্ষর)।",
+        "err_busy": "⏳ সিস্টেম এখন ব্যস্ত। কিছুক্ষণ পর আবার ফলাফল দেখুন চাপুন।",
+        "whatif_title": "🔍 যদি উত্তর বদলায়: যে উত্তরগুলো ফলাফলে প্রভাব ফেলে",
+        "whatif_caption": "প্রতিটি লাইনে একটি উত্তর এক ধাপ বদলালে বর্তমান ফলাফলের সম্ভাবনা কতটা বদলায় (শতাংশ পয়েন্ট) তা দেখানো হয়েছে।",
+        "whatif_up": "এক ধাপ বেশি",
+        "whatif_down": "এক ধাপ কম",
+        "why_title": "🧭 কেন এই ফলাফল: যে উত্তর ও প্রোফাইল তথ্য এটি নির্ধারণ করছে",
+        "why_caption": "একজন সাধারণ শিক্ষার্থীর তুলনায় প্রতিটি উত্তর বা প্রোফাইল তথ্য বর্তমান ফলাফলের সম্ভাবনায় কতটা অবদান রাখে (শতাংশ পয়েন্ট)।",
+        "insight_show": "দেখুন"
     }
 }
 
@@ -248,34 +272,51 @@ q_labels_bn = [
     "২৫. খুব ধীর/খুব দ্রুত নড়াচড়া?", "২৬. নিজেকে আঘাত করার চিন্তা?"
 ]
 
+WHAT_IF_TOP = 3  # what-if lines shown per condition under the result cards
+WHY_TOP = 4  # drivers shown per condition
+
 # -----------------------------
 # 3. HELPER FUNCTIONS
 # -----------------------------
-def extract_number(text):
-    if not text: return 0.0
-    try:
-        match = re.search(r"[-+]?\d*\.\d+|\d+", str(text))
-        return float(match.group()) if match else 0.0
-    except: return 0.0
-
 @st.cache_resource
 def load_resources():
-    try:
-        model = joblib.load("mental_health_hybrid_model.pkl")
-        encoders = joblib.load("label_encoders.pkl")
-        feature_columns = joblib.load("feature_columns.pkl")
-        return model, encoders, feature_columns, None
-    except Exception as e:
-        return None, None, None, str(e)
-
-def is_low_risk_label(label: str) -> bool:
-    low_exact = {"Minimal Anxiety", "Low Stress", "No Depression", "Minimal Depression", "Normal", "None"}
-    return (label in low_exact) or any(x in label for x in ["Minimal", "Low", "No Depression", "No Stress", "No Anxiety"])
-
-def severity_bucket(label: str) -> str:
-    if any(x in label for x in ["Severe", "High"]): return "Severe/High"
-    if "Moderate" in label: return "Moderate"
-    return "Mild" 
+    screener = Screener.load(cache_size=4096)
+    # Opt-in: MH_POOL_WORKERS=N scores in N worker processes so reruns of other sessions don't stall
+    n_workers = int(os.environ.get("MH_POOL_WORKERS", "0"))
+    if n_workers > 0:
+        screener.enable_process_pool(
+            n_workers=n_workers,
+            blas_threads=int(os.environ.get("MH_POOL_BLAS_THREADS", "1")),
+            timeout=float(os.environ.get("MH_POOL_TIMEOUT", "10")),
+        )
+    else:
+        # Shared by all sessions: coalesce concurrent Analyze clicks
+        screener.enable_micro_batching(max_batch_size=32, max_wait_ms=5.0)
+    if os.environ.get("MH_PROFILE") == "1":
+        screener.enable_profiling()  # per-stage model timing for the sidebar debug panel
+    # Opt-in: MH_DRIFT=1 (default baseline) or MH_DRIFT=<baseline file> for the sidebar drift panel
+    drift = os.environ.get("MH_DRIFT")
+    if drift:
+        screener.enable_drift_monitor(None if drift == "1" else drift)
+    # Opt-in: MH_METRICS_FILE=path rewrites Prometheus text metrics there every 15 s (one writer per process)
+    if os.environ.get("MH_METRICS_FILE"):
+        metrics.REGISTRY.start_textfile_writer(os.environ["MH_METRICS_FILE"])
+    return screener
+
+@st.cache_resource
+def load_store():
+    # Opt-in: MH_STORE=assessments.db saves every analysis (batched background writes, SQLite WAL)
+    path = os.environ.get("MH_STORE")
+    if not path:
+        return None
+    from screening import AssessmentStore
+
+    return AssessmentStore(path)
+
+@st.cache_resource
+def load_attributor():
+    # Shared by all sessions: compiled LR/SVC parameters and an LRU of per-student SVC attributions
+    return Attributor(load_resources())
 
 def get_suggestions(condition: str, bucket: str, lang: str):
     tips_en = {
@@ -322,6 +363,7 @@ if "profile_locked" not in st.session_state:
     st.session_state.profile_locked = False
 if "profile_data" not in st.session_state:
     st.session_state.profile_data = {}
+metrics.SESSIONS.touch(session_id)  # "mh_active_sessions" in the metrics export
 
 def reset_all():
     st.session_state.clear()
@@ -331,6 +373,7 @@ def reset_all():
 # -----------------------------
 # 5. UI & LOGIC
 # -----------------------------
+trace.start("header")
 st.sidebar.markdown("### 🌐 Language / ভাষা")
 # Store lang in session state so format_func can access it
 st.session_state.lang = st.sidebar.radio("Language", ("English", "Bangla"), label_visibility="collapsed")
@@ -346,15 +389,68 @@ with c2:
     if st.button(t["reset_btn"], type="primary"):
         reset_all()
 st.markdown("---")
+trace.end()
 
 # Load Model
-model, encoders, feature_columns, err = load_resources()
-if model is None:
-    st.error("🚨 System Error: Model files missing.")
-    st.code(err)
+trace.start("load_model")
+try:
+    screener = load_resources()
+except Exception as e:  # not cached by st.cache_resource, so the next rerun retries
+    st.error("🚨 System Error: could not load the model.")
+    st.code(f"{type(e).__name__}: {e}")
     st.stop()
+trace.end()
+
+# Opt-in debug panel (MH_PROFILE=1): model time per pipeline stage, all sessions combined
+debug_slot = st.sidebar.empty() if screener.profiler is not None else None
+
+def render_debug_panel():
+    if debug_slot is None:
+        return
+    with debug_slot.container():
+        with st.expander("⏱️ Model timing (debug)"):
+            last = screener.profiler.last
+            if last:  # per thread: this rerun's own call, unless it was micro-batched on the batcher's thread
+                st.caption(f"This session's model call: {last['predict_proba']:.1f} ms")
+            st.caption("Per stage, all sessions combined:")
+            st.dataframe(
+                [{k: round(v, 3) if isinstance(v, float) else v for k, v in r.items()} for r in screener.profiler.table()],
+                hide_index=True,
+            )
+            if screener.pool is not None:
+                st.caption("Scoring runs in worker processes; only in-process calls are timed.")
+
+# Opt-in admin panel (MH_DRIFT): intake and prediction drift vs the baseline, all sessions combined
+drift_slot = st.sidebar.empty() if screener.drift is not None else None
+
+def render_drift_panel():
+    if drift_slot is None:
+        return
+    report = screener.drift.report("recent")
+    with drift_slot.container():
+        with st.expander(f"📉 Drift monitor (admin): {report['status']}"):
+            st.caption(f"{report['n']} recent predictions vs a baseline of {report['baseline_n']} "
+                       "(PSI < 0.1 stable, 0.1-0.25 moderate, ≥ 0.25 shift)")
+            if report["features"]:
+                st.dataframe(
+                    [{"feature": f["feature"], "group": f["group"], "PSI": round(f["psi"], 3),
+                      "KL": round(f["kl"], 3), "status": f["status"]} for f in report["features"][:10]],
+                    hide_index=True,
+                )
+
+trace.start("panels")
+render_debug_panel()
+render_drift_panel()
+trace.end()
+
+try:
+    store = load_store()
+except Exception as e:
+    store = None
+    st.sidebar.warning(f"Results are not being saved: {type(e).__name__}: {e}")
 
 # --- SIDEBAR PROFILE ---
+trace.start("sidebar")
 st.sidebar.header(t["sidebar_title"])
 
 locked = st.session_state.profile_locked
@@ -415,6 +511,7 @@ with st.sidebar.expander(t["helpline_title"], expanded=True):
 📞 **Moner Bondhu:** 01779632588  
 🚑 **National Emergency:** 999
 """)
+trace.end()
 
 # Gatekeeper
 if not st.session_state.profile_locked:
@@ -423,6 +520,7 @@ if not st.session_state.profile_locked:
     st.stop()
 
 # --- QUESTIONNAIRE ---
+trace.start("questionnaire")
 # Use Saved Data for Display (Greeting)
 p_data = st.session_state.profile_data
 
@@ -459,34 +557,56 @@ with cR:
         st.divider()
 
 analyze = st.button(t["analyze_btn"], type="primary", use_container_width=True)
+trace.end()
+
+# --- WHAT-IF / WHY: computed only when switched on; a fragment, so the switch does not rerun the page ---
+@st.fragment
+def render_insights(p_data, answers, results):
+    with st.expander(t["whatif_title"]):
+        st.caption(t["whatif_caption"])
+        if st.toggle(t["insight_show"], key="show_whatif"):
+            # One-level answer changes, scored in one batched model call
+            with trace.span("what_if"):
+                current = {r.condition: r.label for r in results}
+                for ranked in what_if(screener, p_data, answers, top=WHAT_IF_TOP).values():
+                    for w in ranked:
+                        step = t["whatif_up"] if w.delta > 0 else t["whatif_down"]
+                        change = f" ({current[w.condition]} → {w.label})" if w.changes_label else ""
+                        st.markdown(f"**{q_list[w.question - 1]}** {step}: {w.condition} {w.shift:+.1f} pp{change}")
+
+    with st.expander(t["why_title"]):
+        st.caption(t["why_caption"])
+        if st.toggle(t["insight_show"], key="show_why"):
+            # Per-feature attributions of each label (exact LR part, sampled and cached SVC part)
+            with trace.span("attribution"):
+                field_names = [t[k].split(". ", 1)[-1] for k in ("age", "gender", "uni", "dept", "year", "cgpa", "scholarship")]
+                field_names += q_list
+                for a in load_attributor().explain_one(p_data, answers):
+                    d_lbl = screener.labels.display(a.condition, int(a.index[0]), "bn" if lang == "Bangla" else "en")
+                    drivers = [f"{field_names[j]} {v * 100:+.1f} pp" for j, v in top_features(a, 0, WHY_TOP)]
+                    st.markdown(f"**{a.condition}** ({d_lbl}): " + " · ".join(drivers))
 
 # --- RESULTS ---
 if analyze:
     # Use p_data (Internal English Values) directly for prediction
-    input_dict = {
-        feature_columns[0]: extract_number(p_data["age"]),
-        feature_columns[1]: p_data["gender"], # Already "Male"/"Female"
-        feature_columns[2]: p_data["uni"],    # Already "Public"/"Private"
-        feature_columns[3]: p_data["dept"],   # Already "CSE", etc.
-        feature_columns[4]: p_data["year"],   # Already "First Year", etc.
-        feature_columns[5]: float(p_data["cgpa"]),
-        feature_columns[6]: p_data["sch"]     # Already "Yes"/"No"
-    }
-    for i in range(26):
-        input_dict[feature_columns[7+i]] = answers[i]
-    
-    input_df = pd.DataFrame([input_dict]).reindex(columns=feature_columns, fill_value=0)
-
-    with st.spinner(t["analyzing"]):
-        probs = model.predict_proba(input_df)
-
-    if answers[25] >= 2:
+    with trace.span("prediction"), st.spinner(t["analyzing"]):
+        try:
+            results = screener.predict_one(p_data, answers)
+        except ScoringTimeout:
+            st.error(t["err_busy"])
+            st.stop()
+
+    trace.start("results")
+    emergency = is_emergency(answers)
+    if store is not None:  # queued only; the background writer commits it
+        store.record(p_data, answers, results, emergency, session=session_id,
+                     model_version=(screener.manifest or {}).get("version"))
+    if emergency:
         st.markdown(f"<div class='emergency-box'><h3>🚨 {'Emergency Alert' if lang=='English' else 'জরুরি সতর্কতা'}</h3><p>{t['emergency_text']}</p></div>", unsafe_allow_html=True)
 
     st.success(t["success"])
     st.subheader(t["result_title"])
 
-    conds = ["Anxiety", "Stress", "Depression"]
     cards = st.columns(3)
     risk_data = [] 
     
@@ -498,30 +618,16 @@ if analyze:
         "-----------------------"
     ]
 
-    for i, c in enumerate(conds):
-        p_arr = probs[i][0]
-        idx = int(np.argmax(p_arr))
-        lbl = encoders[f"{c} Label"].inverse_transform([idx])[0]
-        conf = float(p_arr[idx]) * 100
-        
-        is_low = is_low_risk_label(lbl)
-        bkt = severity_bucket(lbl)
-
-        d_lbl = lbl
-        if lang == "Bangla":
-            if is_low: d_lbl = "ঝুঁকি নেই / কম"
-            elif "Moderate" in lbl: d_lbl = "মাঝারি"
-            elif any(x in lbl for x in ["Severe", "High"]): d_lbl = "তীব্র"
-            else: d_lbl = "মৃদু"
-        else:
-            if is_low: d_lbl = f"No/Low {c}"
+    for i, (c, lbl, conf, is_low, bkt, k) in enumerate(results):
+
+        d_lbl = screener.labels.display(c, k, "bn" if lang == "Bangla" else "en")
 
         with cards[i]:
             st.markdown(f"### {c}")
             if is_low:
                 st.success(f"**{d_lbl}**")
                 st.progress(0)
-                if c == "Depression" and answers[25] >= 2:
+                if c == "Depression" and emergency:
                     st.warning(t["clinical_note"])
             else:
                 st.error(f"**{d_lbl}**")
@@ -530,8 +636,12 @@ if analyze:
         
         r_txt.append(f"{c}: {lbl} ({conf:.1f}%)")
         risk_data.append((c, conf, lbl, bkt, is_low))
+    trace.end()
+
+    render_insights(p_data, answers, results)
 
     # --- SUGGESTIONS ---
+    trace.start("suggestions")
     st.markdown("---")
     
     concerns = [r for r in risk_data if not r[4]] 
@@ -551,7 +661,7 @@ if analyze:
         
         for c, conf, lbl, bkt, _ in concerns:
             tips = get_suggestions(c, bkt, lang)
-            is_severe = (bkt == "Severe/High") or (c == "Depression" and answers[25] >= 2)
+            is_severe = (bkt == "Severe/High") or (c == "Depression" and emergency)
             style = "suggestion-severe" if is_severe else "suggestion-box"
             
             st.markdown(f"**{c} ({lbl})**")
@@ -559,7 +669,10 @@ if analyze:
             
             r_txt.append(f"\n[{c} Suggestions]")
             r_txt.extend([f"- {tip}" for tip in tips])
+    trace.end()
 
+    trace.start("report")
+    report_t0 = time.perf_counter()
     st.markdown("---")
     st.download_button(
         label=t["download_btn"],
@@ -567,6 +680,12 @@ if analyze:
         file_name=f"Report_{p_data['name'].replace(' ', '_')}.txt",
         mime="text/plain"
     )
+    trace.end()
+    metrics.STAGE["report"].observe(time.perf_counter() - report_t0)
+
+trace.start("footer")
+render_debug_panel()  # refresh after this rerun's analysis
+render_drift_panel()
 
 st.markdown("<br>", unsafe_allow_html=True)
 st.divider()
@@ -574,3 +693,4 @@ st.markdown(
     f"<div class='footer'>{t['dev_by']} | {t['disclaimer_short']}</div>",
     unsafe_allow_html=True
 )
+trace.end()
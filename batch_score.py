@@ -0,0 +1,270 @@
+"""Headless batch scorer for whole-cohort screening.
+
+Scores a survey export (CSV or Excel) with the same artifacts the Streamlit
+apps use, one vectorized ``predict_proba`` call per chunk, and streams the
+labels, confidences and severity buckets to an output CSV.
+
+Usage:
+    python batch_score.py intake.csv -o scored.csv
+    python batch_score.py intake.xlsx -o scored.csv --chunk-size 5000
+    python batch_score.py intake.csv -o scored.csv --compare-per-row 200
+    python batch_score.py intake.csv -o scored.csv --compiled
+    python batch_score.py intake.csv -o scored.csv --cascade    # early exit, see calibrate_cascade.py
+    python batch_score.py intake.csv -o scored.csv --distilled  # student model, see distill_model.py
+    python batch_score.py intake.csv -o scored.csv --attributions 3  # top 3 drivers per condition
+    python batch_score.py intake.csv -o scored.csv --strict  # fail on the first row with an invalid answer
+
+A row whose answers are blank, unparsable or outside 0-3 is not scored: its
+labels stay empty and "Input Error" says which answers are wrong. Its
+Emergency Flag is still set from Q26 when Q26 itself is valid.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from screening import CONDITIONS, Screener, extract_number, feature_aliases
+from screening.core import EMERGENCY_LEVEL
+
+# Text answers as exported by the questionnaire, mapped to the model scale
+ANSWER_MAP = {
+    "not at all": 0, "never": 0, "not at all / never": 0,
+    "sometimes": 1, "several days / sometimes": 1,
+    "often": 2, "more than half the days / often": 2,
+    "very often": 3, "nearly every day / very often": 3,
+}
+
+
+# -----------------------------
+# CHUNK PROCESSING
+# -----------------------------
+def read_chunks(path, chunk_size):
+    """Yield DataFrame chunks; CSV is streamed, Excel is sliced after load."""
+    if str(path).lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+def answer_to_int(value):
+    """The 0-3 answer in one cell, or None if it is blank, unparsable or out of range."""
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ANSWER_MAP:
+            return ANSWER_MAP[text]
+        match = re.match(r"[-+]?\d+(\.\d+)?", text)  # "2", "2 - Often"
+        if match is None:
+            return None
+        value = float(match.group())
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(value) if value in (0, 1, 2, 3) else None
+
+def align_headers(chunk, feature_columns):
+    """Rename headers matching a model column up to surrounding whitespace; raise if a column is missing.
+
+    The ``feature_columns.pkl`` names end in spaces that exports often
+    strip, and a missing column must not be scored as answer 0.
+    """
+    wanted = {str(c).strip(): c for c in feature_columns}
+    chunk = chunk.rename(columns=lambda c: wanted.get(str(c).strip(), c))
+    missing = [c for c in feature_columns if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(repr(c) for c in missing)}")
+    return chunk
+
+def clean_chunk(chunk, feature_columns):
+    """``(X, errors)``: a raw chunk aligned to the 33 model columns the way the UI does.
+
+    ``errors`` holds one message per row, "" for a valid row. An invalid
+    answer is NaN in ``X``, never a guessed 0, so such rows must not be scored.
+    """
+    X = align_headers(chunk, feature_columns)[list(feature_columns)].copy()
+    X[feature_columns[0]] = X[feature_columns[0]].map(extract_number)
+    X[feature_columns[5]] = X[feature_columns[5]].map(extract_number)
+    names = {col: alias for alias, col in feature_aliases(feature_columns).items()}
+    problems = [[] for _ in range(len(X))]
+    for col in feature_columns[7:]:
+        raw = X[col]
+        num = pd.to_numeric(raw, errors="coerce")
+        if num.isna().any():
+            # Text answers ("Often") only need the slow per-value mapping
+            num = raw.map(answer_to_int).astype(float)
+        bad = ~num.isin([0, 1, 2, 3])
+        for pos in np.flatnonzero(bad.to_numpy()):
+            value = raw.iloc[pos]
+            blank = value is None or value != value or str(value).strip() == ""
+            problems[pos].append(f"{names[col]} blank" if blank else f"{names[col]}={value!r}")
+        X[col] = num.where(~bad).astype(float if bad.any() else int)
+    errors = pd.Series([f"answers must be 0-3: {', '.join(p)}" if p else "" for p in problems],
+                       index=X.index, dtype=object)
+    return X, errors
+
+def prepare_features(chunk, feature_columns):
+    """Like ``clean_chunk``, but every row must be valid; raises ValueError naming the first bad row."""
+    X, errors = clean_chunk(chunk, feature_columns)
+    bad = errors[errors != ""]
+    if len(bad):
+        raise ValueError(f"{len(bad)} rows with invalid answers, first: data row {bad.index[0] + 1}: {bad.iloc[0]}")
+    return X
+
+def output_columns(id_column, attributions):
+    """The output CSV header, so chunks without a single valid row still write every column."""
+    columns = ([id_column] if id_column else []) + ["Emergency Flag", "Input Error"]
+    for c in CONDITIONS:
+        columns += [f"{c} Label", f"{c} Confidence", f"{c} Severity", f"{c} Low Risk"]
+    for c in CONDITIONS if attributions else ():
+        for i in range(attributions):
+            columns += [f"{c} Driver {i + 1}", f"{c} Driver {i + 1} pp"]
+    return columns
+
+def decode_chunk(probs, labels, index):
+    """Turn the per-condition probability matrices into output columns."""
+    out = pd.DataFrame(index=index)
+    for d in labels.decode(probs):
+        c = d.condition
+        out[f"{c} Label"] = d.label
+        out[f"{c} Confidence"] = np.round(d.confidence, 2)
+        out[f"{c} Severity"] = d.bucket
+        out[f"{c} Low Risk"] = d.is_low
+    return out
+
+def attribution_columns(attributions, feature_columns, top, index):
+    """Top ``top`` contributing columns per condition, largest absolute contribution first."""
+    out = pd.DataFrame(index=index)
+    names = np.asarray(feature_columns, dtype=object)
+    for a in attributions:
+        order = np.argsort(-np.abs(a.values), axis=1, kind="stable")[:, :top]
+        values = np.take_along_axis(a.values, order, axis=1)
+        for i in range(order.shape[1]):
+            out[f"{a.condition} Driver {i + 1}"] = names[order[:, i]]
+            out[f"{a.condition} Driver {i + 1} pp"] = np.round(values[:, i] * 100, 2)
+    return out
+
+def score_file(input_path, output_path, chunk_size=2000, id_column=None, compiled=False, cascade=False,
+               distilled=False, attributions=0, attribution_samples=16, strict=False):
+    """``(n_rows, n_invalid, elapsed, t_model)``; with ``strict`` the first invalid row raises ValueError."""
+    screener = Screener.load(compiled=compiled or cascade)
+    if cascade:
+        screener.enable_cascade()
+    if distilled:
+        screener.enable_distilled()
+    feature_columns = screener.feature_columns
+    attributor = None
+    if attributions:
+        from screening.attribution import Attributor
+
+        attributor = Attributor(screener, n_samples=attribution_samples)
+
+    columns = output_columns(id_column, min(attributions, len(feature_columns)))
+    answers = list(feature_columns[7:])
+    n_rows = n_invalid = 0
+    t_model = 0.0
+    t0 = time.perf_counter()
+    first = True
+    for chunk in read_chunks(input_path, chunk_size):
+        X, errors = clean_chunk(chunk, feature_columns)
+        if chunk.empty:
+            continue
+        valid = (errors == "").to_numpy()
+        if strict and not valid.all():
+            i = int(np.argmin(valid))
+            if not first:
+                os.remove(output_path)  # no partial output from a refused file
+            raise ValueError(f"data row {chunk.index[i] + 1}: {errors.iloc[i]}")
+
+        out = pd.DataFrame(index=chunk.index)
+        if valid.any():
+            Xv = X[valid].astype({c: int for c in answers})
+            t_start = time.perf_counter()
+            probs = screener.predict_proba(Xv, distilled=distilled)
+            t_model += time.perf_counter() - t_start
+            out = out.join(decode_chunk(probs, screener.labels, Xv.index))
+            if attributor is not None:
+                out = out.join(attribution_columns(attributor.explain(Xv), feature_columns, attributions, Xv.index))
+        q26 = X[feature_columns[-1]]
+        out["Emergency Flag"] = (q26 >= EMERGENCY_LEVEL).astype(object).where(q26.notna())
+        out["Input Error"] = errors
+        if id_column:
+            out[id_column] = chunk[id_column].to_numpy()
+
+        out.reindex(columns=columns).to_csv(output_path, mode="w" if first else "a", header=first, index=False)
+        first = False
+        n_rows += len(chunk)
+        n_invalid += int((~valid).sum())
+
+    elapsed = time.perf_counter() - t0
+    return n_rows, n_invalid, elapsed, t_model
+
+def per_row_throughput(input_path, n_rows):
+    """Time the UI path: one single-row DataFrame + predict_proba per student."""
+    screener = Screener.load()
+    sample = prepare_features(next(read_chunks(input_path, n_rows)), screener.feature_columns)
+    records = sample.to_dict("records")
+
+    t0 = time.perf_counter()
+    for rec in records:
+        screener.predict_many([rec])
+    elapsed = time.perf_counter() - t0
+    return len(records), elapsed
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score a survey export with the hybrid model.")
+    parser.add_argument("input", help="CSV or Excel file whose headers match feature_columns.pkl")
+    parser.add_argument("-o", "--output", default="scored.csv", help="Output CSV path (default: scored.csv)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per predict_proba call")
+    parser.add_argument("--id-column", help="Input column copied to the output to identify students")
+    parser.add_argument("--compiled", action="store_true",
+                        help="Score with the NumPy-only compiled model instead of the sklearn pipeline")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Compiled model with early exit: the SVC only runs for rows the LR voter is unsure about")
+    parser.add_argument("--distilled", action="store_true",
+                        help="Score with the distilled student model (faster, approximate; see distill_model.py)")
+    parser.add_argument("--attributions", type=int, default=0, metavar="K",
+                        help="Add the K columns contributing most to each condition's label (screening.attribution)")
+    parser.add_argument("--attribution-samples", type=int, default=16,
+                        help="Permutation walks per row for the SVC part of the attributions (even)")
+    parser.add_argument("--strict", action="store_true",
+                        help="Fail on the first row with a blank, unparsable or out-of-range answer "
+                             "instead of writing it unscored with an Input Error")
+    parser.add_argument("--compare-per-row", type=int, default=0, metavar="N",
+                        help="Also score the first N rows one at a time (UI path) and report both throughputs")
+    args = parser.parse_args(argv)
+
+    try:
+        n_rows, n_invalid, elapsed, t_model = score_file(
+            args.input, args.output, args.chunk_size, args.id_column, args.compiled, args.cascade,
+            args.distilled, args.attributions, args.attribution_samples, args.strict)
+    except ValueError as e:
+        print(f"error: {args.input}: {e}", file=sys.stderr)
+        return 1
+    if not n_rows:
+        print(f"Scored 0 rows: {args.input} has no data rows, nothing written")
+        return 0
+    print(f"Scored {n_rows - n_invalid} rows -> {args.output}")
+    if n_invalid:
+        print(f"warning: {n_invalid} rows with invalid answers were not scored; see their Input Error column",
+              file=sys.stderr)
+    if t_model:
+        print(f"Batch:   {n_rows / elapsed:,.0f} rows/sec end-to-end "
+              f"({(n_rows - n_invalid) / t_model:,.0f} rows/sec in predict_proba)")
+
+    if args.compare_per_row:
+        n, per_row = per_row_throughput(args.input, args.compare_per_row)
+        print(f"Per-row: {n / per_row:,.0f} rows/sec (one-row DataFrame per student, as in app_v3.py)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
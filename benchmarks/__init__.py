@@ -0,0 +1 @@
+"""Benchmarks and performance budgets. Run modules from the repo root: ``python -m benchmarks.<name>``."""
@@ -0,0 +1,111 @@
+"""Scripted Streamlit ``AppTest`` sessions for app.py, app_v2.py and app_v3.py.
+
+``new_session`` creates an AppTest for an app; ``fill_and_analyze`` enters a
+profile and 26 answers through the app's own widgets and clicks Analyze (it
+runs the script; for app_v3 the profile form is submitted first).
+``interactions`` splits the same flow into the steps a browser would send,
+one rerun each (used by the rerun-cost benchmark).
+"""
+import os
+
+from screening.core import ROOT
+
+APPS = ["app.py", "app_v2.py", "app_v3.py"]
+
+# Answer option text per app, indexed by answer value 0-3
+APP_OPTIONS = ["Not at all / Never", "Several days / Sometimes", "More than half the days / Often",
+               "Nearly every day / Very Often"]
+APP_V2_OPTIONS = ["Not at all", "Sometimes", "Often", "Very Often"]
+APP_V3_OPTIONS = ["Not at all", "Sometimes", "Often", "Very Often"]
+
+
+def new_session(app, timeout=120):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(os.path.join(ROOT, app), default_timeout=timeout)
+
+
+def _click_analyze(at):
+    next(b for b in at.button if "Analyze" in b.label).click().run()
+    return at
+
+
+def _sidebar_profile(at, profile, cgpa_as_text):
+    age, gender, uni, year, sch = at.sidebar.selectbox
+    age.select(profile["age"])
+    gender.select(profile["gender"])
+    uni.select(profile["uni"])
+    year.select(profile["year"])
+    sch.select(profile["sch"])
+    dept = at.sidebar.text_input[0]
+    dept.input(profile["dept"])
+    if cgpa_as_text:
+        at.sidebar.text_input[1].input(f"{profile['cgpa']:.2f}")
+    else:
+        at.sidebar.number_input[0].set_value(profile["cgpa"])
+
+
+def fill_and_analyze(at, app, profile, answers, name="Test Student"):
+    """Fill the widgets of an already-run AppTest and click Analyze."""
+    if app == "app.py":
+        _sidebar_profile(at, profile, cgpa_as_text=True)
+        for i, a in enumerate(answers):
+            at.selectbox(key=f"q_{i}_False").select(APP_OPTIONS[a])
+    elif app == "app_v2.py":
+        _sidebar_profile(at, profile, cgpa_as_text=False)
+        for i, a in enumerate(answers):
+            at.select_slider(key=f"q_{i}_False").set_value(APP_V2_OPTIONS[a])
+    elif app == "app_v3.py":
+        if not at.session_state["profile_locked"]:
+            at.text_input(key="p_name").input(name)
+            for key in ("age", "gender", "uni", "dept", "year", "sch"):
+                at.selectbox(key=f"p_{key}").select(profile[key])
+            at.number_input(key="p_cgpa").set_value(profile["cgpa"])
+            at.checkbox(key="p_conf").check()
+            at.sidebar.button[0].click().run()
+        for i, a in enumerate(answers):
+            at.radio(key=f"q_{i}").set_value(APP_V3_OPTIONS[a])
+    else:
+        raise ValueError(f"unknown app {app!r}; expected one of {APPS}")
+    return _click_analyze(at)
+
+
+def interactions(app, profile, answers, name="Test Student"):
+    """The flow as (step name, fn(at)) pairs; the caller runs the script after each fn.
+
+    Every widget change outside a form is its own rerun, as in a browser;
+    app_v3's profile form is one rerun (its submit).
+    """
+    steps = []
+    if app in ("app.py", "app_v2.py"):
+        for i, key in enumerate(("age", "gender", "uni", "year", "sch")):
+            steps.append((f"profile.{key}", lambda at, i=i, key=key: at.sidebar.selectbox[i].select(profile[key])))
+        steps.append(("profile.dept", lambda at: at.sidebar.text_input[0].input(profile["dept"])))
+        if app == "app.py":
+            steps.append(("profile.cgpa", lambda at: at.sidebar.text_input[1].input(f"{profile['cgpa']:.2f}")))
+            options, widget = APP_OPTIONS, "selectbox"
+        else:
+            steps.append(("profile.cgpa", lambda at: at.sidebar.number_input[0].set_value(profile["cgpa"])))
+            options, widget = APP_V2_OPTIONS, "select_slider"
+        for i, a in enumerate(answers):
+            if widget == "selectbox":
+                steps.append((f"answer.{i + 1}", lambda at, i=i, a=a: at.selectbox(key=f"q_{i}_False").select(options[a])))
+            else:
+                steps.append((f"answer.{i + 1}",
+                              lambda at, i=i, a=a: at.select_slider(key=f"q_{i}_False").set_value(options[a])))
+    elif app == "app_v3.py":
+        def lock_profile(at):
+            at.text_input(key="p_name").input(name)
+            for key in ("age", "gender", "uni", "dept", "year", "sch"):
+                at.selectbox(key=f"p_{key}").select(profile[key])
+            at.number_input(key="p_cgpa").set_value(profile["cgpa"])
+            at.checkbox(key="p_conf").check()
+            at.sidebar.button[0].click()
+
+        steps.append(("profile.lock", lock_profile))
+        for i, a in enumerate(answers):
+            steps.append((f"answer.{i + 1}", lambda at, i=i, a=a: at.radio(key=f"q_{i}").set_value(APP_V3_OPTIONS[a])))
+    else:
+        raise ValueError(f"unknown app {app!r}; expected one of {APPS}")
+    steps.append(("analyze", lambda at: next(b for b in at.button if "Analyze" in b.label).click()))
+    return steps
@@ -0,0 +1,177 @@
+"""Rerun cost of the Streamlit apps as sessions pile up (AppTest sessions in one process, one rerun at a time).
+
+This is a rerun-cost benchmark, not a server load test. At each session
+count, N threads each open an ``AppTest`` session of an app and walk through
+a student's visit with random think times between steps: the first page
+load, the sidebar profile (app_v3: fill the form and lock it), the 26
+answers and Analyze. Every widget change is one rerun, as in a browser
+(``benchmarks.app_flows.interactions``). All sessions share the process
+and its ``st.cache_resource`` model. AppTest swaps a process-global runtime
+for each run, so reruns execute one at a time behind a lock. A rerun's
+latency is its wait for the lock plus its run: the queue in front of one
+busy core. Concurrent reruns, the scoring pool and a real ``streamlit run``
+server's threads and websockets are not exercised. Per app and session
+count it reports rerun latency percentiles (and the median run time alone),
+reruns/s, process CPU (100% = one core busy) and peak RSS. Latencies include
+AppTest's own element-tree handling, so compare apps and levels with each
+other rather than with browser timings.
+
+Usage:
+    python -m benchmarks.app_rerun_cost
+    python -m benchmarks.app_rerun_cost --apps app_v3.py --sessions 1,8,32 --think 0.5,3 --json reruns.json
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+from benchmarks.app_flows import APPS, interactions, new_session
+from benchmarks.synthetic import PROFILE_OPTIONS
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (``q`` in 0-1) of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+_RUN_LOCK = threading.Lock()  # AppTest.run is not thread-safe (process-global runtime)
+
+
+def visit(app, rng, think):
+    """One session's flow; returns ([(rerun latency, run time)], error or None)."""
+    profile = {k: rng.choice(v) for k, v in PROFILE_OPTIONS.items()}
+    profile["cgpa"] = round(rng.uniform(2.0, 4.0), 2)
+    answers = [rng.randint(0, 3) for _ in range(26)]
+    latencies = []
+    at = new_session(app, timeout=600)
+    steps = [("load", lambda at: None)] + interactions(app, profile, answers)
+    for name, step in steps:
+        if name != "load":
+            time.sleep(rng.uniform(*think))
+        try:
+            step(at)
+            t0 = time.perf_counter()
+            with _RUN_LOCK:
+                t1 = time.perf_counter()
+                at.run()
+            t2 = time.perf_counter()
+            latencies.append((t2 - t0, t2 - t1))
+        except Exception as e:  # a widget that did not render is a failed session too
+            return latencies, f"{name}: {type(e).__name__}: {e}"
+        if at.exception:
+            return latencies, f"{name}: {at.exception[0].value}"
+    return latencies, None
+
+
+def run_level(app, sessions, think, seed):
+    gc.collect()
+    latencies, errors = [], []
+    lock = threading.Lock()
+    rss_start = rss_mb()
+    peak = [rss_start]
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(0.2):
+            peak[0] = max(peak[0], rss_mb())
+
+    def session(i):
+        rng = random.Random(f"{seed}-{app}-{sessions}-{i}")
+        time.sleep(rng.uniform(0, think[1]))  # staggered arrivals
+        local, error = visit(app, rng, think)
+        with lock:
+            latencies.extend(local)
+            if error:
+                errors.append(error)
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    done.set()
+    sampler.join()
+    peak[0] = max(peak[0], rss_mb())
+    runs = sorted(run for _, run in latencies)
+    latencies = sorted(total for total, _ in latencies)
+    return {
+        "app": app,
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": errors,
+        "reruns_per_sec": len(latencies) / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "run_p50_ms": percentile(runs, 0.50) * 1000,
+        "cpu_pct": 100 * cpu / wall,
+        "rss_start_mb": rss_start,
+        "rss_peak_mb": peak[0],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", default=",".join(APPS), help="Comma-separated app files")
+    parser.add_argument("--sessions", default="1,4,16", help="Comma-separated concurrent session counts")
+    parser.add_argument("--think", default="0.2,1.0", help="min,max seconds between a session's interactions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    apps = args.apps.split(",")
+    levels = [int(n) for n in args.sessions.split(",")]
+    think = tuple(float(x) for x in args.think.split(","))
+    results = []
+    print("note: reruns run one at a time (AppTest is not thread-safe); latency = wait + run, not a server load test")
+    print(f"{'app':10s} {'sess':>4} {'reruns':>6} {'rr/s':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'run p50':>8} {'cpu %':>6} {'rss MB':>7} {'errors':>6}")
+    for app in apps:
+        # Warm-up visit (model load, caches) outside the measurements
+        _, error = visit(app, random.Random(args.seed), (0.0, 0.0))
+        if error:
+            print(f"{app}: warm-up failed: {error}")
+            return 1
+        for n in levels:
+            r = run_level(app, n, think, args.seed)
+            results.append(r)
+            print(f"{app:10s} {n:>4} {r['reruns']:>6} {r['reruns_per_sec']:>6.1f} {r['p50_ms']:>8.1f} "
+                  f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} {r['run_p50_ms']:>8.1f} "
+                  f"{r['cpu_pct']:>6.0f} {r['rss_peak_mb']:>7.0f} {len(r['errors']):>6}")
+            for e in r["errors"][:3]:
+                print(f"    {e}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    ok = not any(r["errors"] for r in results)
+    print("OK" if ok else "FAIL: sessions failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
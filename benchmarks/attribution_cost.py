@@ -0,0 +1,144 @@
+"""Per-feature attributions: cost, exactness of the LR part and accuracy of the sampled SVC part.
+
+For random students, times ``Attributor.explain_one`` uncached and cached
+and ``explain`` on a batch, next to the model calls a generic KernelSHAP
+would need for one student (its default 2 * 33 + 2048 coalitions, scored
+as one batch with the sklearn pipeline and a one-row background: a lower
+bound). Checks that
+
+* every row's contributions add up to its probability minus the base,
+* the probabilities match ``Screener.predict_proba``,
+* the LR log-odds contributions equal the log-odds change of switching
+  that feature alone from the reference student (exact for a linear model),
+* a row's attribution is the same alone, in a batch and from the cache,
+* the incremental walk kernel matches materialized walk rows.
+
+Reports the SVC approximation's error against a 512-walk run (relative L1
+and top-3 overlap).
+
+Usage:
+    python -m benchmarks.attribution_cost
+    python -m benchmarks.attribution_cost --students 50 --samples 32 --max-ms 50
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import random_answers, random_profile
+from screening import Screener, build_input_row
+from screening.attribution import Attributor, top_features
+
+KERNEL_SHAP_COALITIONS = 2 * 33 + 2048
+
+
+def best_ms(fn, repeat):
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def linear_mismatch(attributor, rows, attributions):
+    """Largest gap between ``linear`` and the log-odds change of switching one feature alone."""
+    from screening.attribution import _softmax_parameters
+
+    compiled = attributor.compiled
+    Z = compiled.transform(compiled.rows_from_records(rows))
+    z_ref = attributor.Z_bg[0]
+    worst = 0.0
+    for out, a in zip(compiled.outputs, attributions):
+        lr = [m for m in out.members if type(m).__name__ == "CompiledLogistic"]
+        W, b = _softmax_parameters(lr[0])
+        for r in range(len(rows)):
+            c = a.index[r]
+            for j in attributor.features:
+                cols = attributor.owner == j
+                z = z_ref.copy()
+                z[cols] = Z[r, cols]
+                worst = max(worst, abs((z - z_ref) @ W[:, c] - a.linear[r, j]))
+    return worst
+
+
+def walk_kernel_mismatch(attributor, rows):
+    """Largest gap between the incremental walk kernel and the kernel of materialized walk rows."""
+    compiled = attributor.compiled
+    Z = compiled.transform(compiled.rows_from_records(rows))
+    n, S, F = len(Z), attributor.n_samples, len(attributor.features)
+    rng = np.random.default_rng(0)
+    pos = np.stack([[rng.permutation(F) for _ in range(S)] for _ in range(n)])
+    bg = np.zeros((n, S), dtype=np.int64)
+    column = np.searchsorted(attributor.features, attributor.owner)
+    switched = pos[:, :, column][:, :, None, :] < np.arange(F + 1)[:, None]
+    start = attributor.Z_bg[bg]
+    H = (start[:, :, None, :] + (Z[:, None, :] - start)[:, :, None, :] * switched).reshape(-1, Z.shape[1])
+    return max(float(np.abs(attributor._walk_kernel(attributor._tables, k, Z, bg, pos) - k.kernel(H)).max()) for k in compiled.kernels)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=16, help="Permutation walks per row (even)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ms", type=float, default=100.0, help="Budget for one uncached explain_one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    screener = Screener.load()
+    cols = screener.feature_columns
+    students = [(random_profile(rng), random_answers(rng)) for _ in range(args.students)]
+    rows = [build_input_row(cols, p, a) for p, a in students]
+    batch = [build_input_row(cols, random_profile(rng), random_answers(rng)) for _ in range(args.batch)]
+
+    uncached = Attributor(screener, n_samples=args.samples, cache_size=0)
+    cached = Attributor(screener, n_samples=args.samples)
+    cold = statistics.median(best_ms(lambda: uncached.explain_one(p, a), args.repeat) for p, a in students)
+    warm = statistics.median(best_ms(lambda: cached.explain_one(p, a), args.repeat) for p, a in students)
+    t0 = time.perf_counter()
+    batched = uncached.explain(batch)
+    batch_rate = len(batch) / (time.perf_counter() - t0)
+    coalitions = [build_input_row(cols, *students[0])] * KERNEL_SHAP_COALITIONS
+    kernel_shap = best_ms(lambda: screener.predict_proba(coalitions), 1)
+    print(f"explain_one uncached {cold:7.2f} ms  cached {warm:6.3f} ms  batch {batch_rate:6.0f} rows/s  "
+          f"(KernelSHAP model calls alone: >= {kernel_shap:.0f} ms per student)")
+
+    probs = screener.predict_proba(batch)
+    additivity = max(float(np.abs(a.values.sum(axis=1) - (a.probability - a.base)).max()) for a in batched)
+    parity = max(float(np.abs(a.probability - p.max(axis=1)).max()) for a, p in zip(batched, probs))
+    labels = all((a.index == p.argmax(axis=1)).all() for a, p in zip(batched, probs))
+    linear = linear_mismatch(uncached, rows[:5], uncached.explain(rows[:5]))
+    together = uncached.explain(rows)
+    alone = [uncached.explain([r]) for r in rows]
+    again = cached.explain(rows)
+    stable = max(float(np.abs(t.values[i] - single[c].values[0]).max())
+                 for i, single in enumerate(alone) for c, t in enumerate(together))
+    stable = max(stable, max(float(np.abs(t.values - g.values).max()) for t, g in zip(together, again)))
+    kernel = walk_kernel_mismatch(uncached, rows[:3])
+    print(f"sum of contributions vs probability - base: {additivity:.1e}")
+    print(f"probability vs predict_proba:               {parity:.1e} (labels {'match' if labels else 'DIFFER'})")
+    print(f"LR log-odds vs one-feature switch:          {linear:.1e}")
+    print(f"alone vs batch vs cache:                    {stable:.1e}")
+    print(f"walk kernel vs materialized rows:           {kernel:.1e}")
+
+    reference = Attributor(screener, n_samples=512, cache_size=0).explain(rows)
+    error = statistics.mean(float(np.abs(t.values - r.values).sum() / np.abs(r.values).sum())
+                            for t, r in zip(together, reference))
+    overlap = statistics.mean(len({j for j, _ in top_features(t, i, 3)} & {j for j, _ in top_features(r, i, 3)}) / 3
+                              for t, r in zip(together, reference) for i in range(len(rows)))
+    print(f"{args.samples} walks vs 512: relative L1 error {error:.3f}, top-3 overlap {overlap:.2f}")
+
+    ok = (cold <= args.max_ms and additivity < 1e-6 and parity < 1e-9 and labels and linear < 1e-9
+          and stable < 1e-12 and kernel < 1e-9)
+    print("OK" if ok else "FAIL: attribution over budget or a check failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Load time: the three joblib pickles vs the model bundle.
+
+``cold`` runs each loader in a fresh interpreter (joblib, numpy and the
+sklearn modules the model refers to are imported first, so only artifact
+loading is timed); ``warm`` repeats the load in one
+process, with the files in the page cache.
+
+Usage:
+    python -m benchmarks.bundle_load
+    python -m benchmarks.bundle_load --runs 15 --bundle model_bundle
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from screening.core import BUNDLE_PATH, ROOT, load_artifacts, load_resources
+
+PROBE = """
+import json, time
+import joblib, numpy, sklearn.compose, sklearn.ensemble, sklearn.impute, sklearn.linear_model
+import sklearn.multioutput, sklearn.pipeline, sklearn.preprocessing, sklearn.svm
+import screening.bundle
+from screening.core import load_artifacts
+t0 = time.perf_counter()
+{call}
+print(json.dumps({{"ms": (time.perf_counter() - t0) * 1000}}))
+"""
+
+
+def loaders(bundle):
+    return {
+        "pickles (joblib x3)": ("load_artifacts(('mental_health_hybrid_model.pkl', 'label_encoders.pkl', "
+                                "'feature_columns.pkl'))", lambda: load_resources()),
+        "bundle (mmap, verified)": (f"load_artifacts({bundle!r})", lambda: load_artifacts(bundle)),
+        "bundle (no mmap)": (f"load_artifacts({bundle!r}, mmap=False)", lambda: load_artifacts(bundle, mmap=False)),
+    }
+
+
+def cold(call, runs):
+    code = PROBE.format(call=call)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout)["ms"])
+    return statistics.median(samples)
+
+
+def warm(fn, runs):
+    fn()
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bundle", default=BUNDLE_PATH)
+    parser.add_argument("--runs", type=int, default=9)
+    args = parser.parse_args(argv)
+
+    print(f"{'loader':26s} {'cold ms':>9s} {'warm ms':>9s}")
+    for name, (call, fn) in loaders(args.bundle).items():
+        print(f"{name:26s} {cold(call, args.runs):9.2f} {warm(fn, args.runs):9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
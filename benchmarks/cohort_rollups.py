@@ -0,0 +1,100 @@
+"""Cohort dashboard queries: precomputed rollups vs GROUP BY over the raw rows.
+
+Fills assessment stores of growing size through ``AssessmentStore`` (so the
+rollups are maintained incrementally, as in the app) with synthetic
+profiles and labels from the bundle's schema, then times the dashboard's
+query for every dimension both from the rollups (``analytics.summary``) and
+recomputed from the raw rows (``analytics.compute``). It also reports the
+writer's throughput with and without rollups and checks with
+``analytics.verify`` that the incremental rollups match a full rebuild.
+
+Usage:
+    python -m benchmarks.cohort_rollups
+    python -m benchmarks.cohort_rollups --rows 10000,100000,500000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import random_profile
+from screening import CONDITIONS, ConditionResult
+from screening.analytics import DIMENSIONS, compute, summary, verify
+from screening.bundle import read_manifest
+from screening.core import BUNDLE_PATH
+from screening.store import AssessmentStore, assessment_row, connect
+
+
+def synthetic_rows(n, rng, labels):
+    rows = []
+    for _ in range(n):
+        answers = [int(a) for a in rng.integers(0, 4, 26)]
+        results = [ConditionResult(c, str(rng.choice(labels[c])), float(rng.uniform(30, 99)), False, "", 0)
+                   for c in CONDITIONS]
+        rows.append(assessment_row(random_profile(rng), answers, results))
+    return rows
+
+
+def fill(path, rows, rollups):
+    store = AssessmentStore(path, batch_size=1024, max_pending=len(rows) + 1, rollups=rollups)
+    t0 = time.perf_counter()
+    for row in rows:
+        store.record_row(row)
+    store.flush()
+    wall = time.perf_counter() - t0
+    store.close()
+    return len(rows) / wall
+
+
+def median_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10000,100000", help="Comma-separated store sizes")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    labels = read_manifest(BUNDLE_PATH)["schema"]["labels"]
+    rng = np.random.default_rng(args.seed)
+    ok = True
+    print(f"{'rows':>8s} {'write rows/s':>13s} {'(no rollups)':>13s} {'rollup query ms':>16s} "
+          f"{'raw GROUP BY ms':>16s} {'speedup':>8s} {'consistent':>10s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(s) for s in args.rows.split(",")):
+            rows = synthetic_rows(n, rng, labels)
+            path = os.path.join(tmp, f"rollups{n}.db")
+            with_rollups = fill(path, rows, rollups=True)
+            without = fill(os.path.join(tmp, f"plain{n}.db"), rows, rollups=False)
+
+            conn = connect(path, readonly=True)
+            try:
+                rollup_ms = median_ms(lambda: [summary(conn, d) for d in DIMENSIONS], args.runs)
+                raw_ms = median_ms(lambda: compute(conn), max(1, args.runs // 2))
+                problems = verify(conn)
+                total = summary(conn, "all")[0]["n"]
+            finally:
+                conn.close()
+            consistent = not problems and total == n
+            ok &= consistent
+            print(f"{n:8d} {with_rollups:13,.0f} {without:13,.0f} {rollup_ms:16.2f} {raw_ms:16.1f} "
+                  f"{raw_ms / rollup_ms:7.0f}x {str(consistent):>10s}")
+            for p in problems[:5]:
+                print(f"  {p}")
+    print("OK" if ok else "FAIL: incremental rollups differ from a rebuild")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
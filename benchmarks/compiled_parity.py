@@ -0,0 +1,79 @@
+"""Parity and latency of the compiled NumPy path vs the sklearn pipeline.
+
+Fails (exit 1) if any probability differs from ``model.predict_proba`` by
+more than ``--tol`` (default 1e-6).
+
+Usage:
+    python -m benchmarks.compiled_parity
+    python -m benchmarks.compiled_parity --rows 5000 --tol 1e-9
+"""
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from benchmarks.synthetic import random_rows, to_frame
+from screening import Screener, build_input_row
+from screening.compiled import CompiledModel
+
+warnings.filterwarnings("ignore")
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--tol", type=float, default=1e-6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    screener = Screener.load()
+    model, cols = screener.model, screener.feature_columns
+
+    t0 = time.perf_counter()
+    compiled = CompiledModel(model, cols)
+    print(f"compile: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    # Parity, including missing values (NaN numerics, None categoricals)
+    rows = random_rows(args.rows, model, seed=args.seed)
+    rows[::17, 0] = np.nan
+    rows[::23, 3] = None
+    df = to_frame(rows, cols)
+    ref = model.predict_proba(df)
+    got = compiled.predict_proba(rows)
+    max_err = max(float(np.abs(a - b).max()) for a, b in zip(ref, got))
+    same_argmax = all((a.argmax(1) == b.argmax(1)).all() for a, b in zip(ref, got))
+    print(f"parity: max |diff| = {max_err:.2e} over {args.rows} rows, argmax identical: {same_argmax}")
+
+    # Single-row latency on the UI path (profile dict + answers)
+    profile = {"age": "18-22", "gender": "Male", "uni": "Private", "dept": "CSE",
+               "year": "First Year", "cgpa": 3.5, "sch": "No"}
+    answers = [1] * 26
+    fast = Screener(model, screener.encoders, cols, compiled=True)
+    sk_one = best_of(lambda: screener.predict_proba([build_input_row(cols, profile, answers)]), 50)
+    np_one = best_of(lambda: fast.predict_proba([build_input_row(cols, profile, answers)]), 50)
+    print(f"single row: sklearn {sk_one * 1e3:.2f} ms, compiled {np_one * 1e3:.3f} ms ({sk_one / np_one:.0f}x)")
+
+    # Batch throughput
+    sk_batch = best_of(lambda: model.predict_proba(df), 3)
+    np_batch = best_of(lambda: compiled.predict_proba(rows), 3)
+    print(f"batch {args.rows}: sklearn {args.rows / sk_batch:,.0f} rows/s, "
+          f"compiled {args.rows / np_batch:,.0f} rows/s ({sk_batch / np_batch:.1f}x)")
+
+    ok = max_err <= args.tol and same_argmax
+    print("OK" if ok else f"FAIL: parity above tolerance {args.tol:g}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
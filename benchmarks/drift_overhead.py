@@ -0,0 +1,85 @@
+"""Drift monitor: per-request overhead and detection on known shifts.
+
+Times ``DriftMonitor.observe`` for one row (the UI/service path) and per row
+of a batch, and the cached single-row ``predict_many`` with and without the
+monitor. Then builds a baseline from synthetic reference rows and checks the
+verdicts: fresh rows from the same generator must read "stable", and rows
+whose answers are all shifted up by one step must read "shift".
+
+Usage:
+    python -m benchmarks.drift_overhead
+    python -m benchmarks.drift_overhead --rows 20000 --max-us 20
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import random_rows
+from screening import Screener
+from screening.drift import DriftMonitor
+
+
+def per_call_us(fn, calls):
+    fn()
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return best / calls * 1e6
+
+
+def verdict(screener, baseline, rows):
+    monitor = DriftMonitor.for_screener(screener, baseline=baseline, window=float("inf"))
+    monitor.observe(rows, screener.predict_many(rows))
+    return monitor.report("total")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Reference rows for the baseline")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--max-us", type=float, default=20.0, help="Budget for one single-row observe")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    screener = Screener.load(compiled=True, cache_size=4096)
+    cols = screener.feature_columns
+    data = random_rows(args.rows, screener.model, seed=args.seed, app_share=0.0, correlated_share=0.5)
+    record = [dict(zip(cols, data[0]))]
+    result = screener.predict_many(record)
+
+    monitor = DriftMonitor.for_screener(screener)
+    single = per_call_us(lambda: monitor.observe(record, result), args.calls)
+    batch_results = screener.predict_many(data[:1000])
+    batch = per_call_us(lambda: monitor.observe(data[:1000], batch_results), 5) / 1000
+    plain = per_call_us(lambda: screener.predict_many(record), args.calls)
+    screener.drift = monitor
+    monitored = per_call_us(lambda: screener.predict_many(record), args.calls)
+    screener.drift = None
+    print(f"observe, one row:            {single:7.2f} us")
+    print(f"observe, per row of 1000:    {batch:7.2f} us")
+    print(f"cached predict_many(1 row):  {plain:7.2f} us -> {monitored:7.2f} us with the monitor")
+
+    ref = DriftMonitor.for_screener(screener, window=float("inf"))
+    ref.observe(data, screener.predict_many(data))
+    baseline = ref.snapshot()
+    same = random_rows(args.rows // 2, screener.model, seed=args.seed + 1, app_share=0.0, correlated_share=0.5)
+    shifted = random_rows(args.rows // 2, screener.model, seed=args.seed + 2, app_share=0.0, correlated_share=0.5)
+    shifted[:, 7:] = np.minimum(shifted[:, 7:].astype(int) + 1, 3)
+    stable, moved = verdict(screener, baseline, same), verdict(screener, baseline, shifted)
+    for name, r in (("same distribution", stable), ("answers shifted +1", moved)):
+        worst = r["features"][0]
+        print(f"{name:20s} {r['status']:9s} worst {worst['feature']} PSI {worst['psi']:.3f}  "
+              + ", ".join(f"{g} {v:.3f}" for g, v in r["groups"].items()))
+
+    ok = single <= args.max_us and stable["status"] == "stable" and moved["status"] == "shift"
+    print("OK" if ok else "FAIL: observe over budget or wrong drift verdict")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Closed-loop load test for ``serve.py``.
+
+At each concurrency level, N client threads send /predict requests
+back-to-back for ``--duration`` seconds (keep-alive connections, distinct
+random questionnaires so the prediction cache does not hide model cost).
+Reports p50/p95/p99 latency, requests/sec and rows/sec per level.
+
+Usage:
+    python serve.py --port 8000 &
+    python -m benchmarks.http_load_test --url http://127.0.0.1:8000 --concurrency 1,4,16,32
+    python -m benchmarks.http_load_test --batch 50 --json results.json
+"""
+import argparse
+import http.client
+import json
+import math
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+PROFILE = {"age": "18-22", "gender": "Female", "uni": "Public", "dept": "EEE",
+           "year": "Second Year", "cgpa": 3.2, "sch": "No"}
+
+
+def make_body(rng, batch):
+    rows = []
+    for _ in range(batch):
+        row = dict(PROFILE, cgpa=round(rng.uniform(2.0, 4.0), 2))
+        row.update({f"q{i + 1}": rng.randint(0, 3) for i in range(26)})
+        rows.append(row)
+    payload = {"features": rows[0]} if batch == 1 else {"rows": rows}
+    return json.dumps(payload).encode("utf-8")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (``q`` in 0-1) of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+def run_level(host, port, concurrency, duration, batch, seed):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(i):
+        rng = random.Random(f"{seed}-{concurrency}-{i}")
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        local, local_err = [], 0
+        while time.perf_counter() < stop_at:
+            body = make_body(rng, batch)
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    local_err += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                local_err += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=60)
+                continue
+            local.append(time.perf_counter() - t0)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors.append(local_err)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "batch": batch,
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "rps": len(latencies) / wall,
+        "rows_per_sec": len(latencies) * batch / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", default="1,4,16,32", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--batch", type=int, default=1, help="Rows per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    url = urlparse(args.url)
+    host, port = url.hostname, url.port or 80
+
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    conn.request("GET", "/readyz")
+    if conn.getresponse().status != 200:
+        print("service is not ready (GET /readyz != 200)")
+        return 1
+    conn.close()
+
+    results = []
+    print(f"{'conc':>5} {'req/s':>9} {'rows/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for level in [int(c) for c in args.concurrency.split(",")]:
+        r = run_level(host, port, level, args.duration, args.batch, args.seed)
+        results.append(r)
+        print(f"{level:>5} {r['rps']:>9.1f} {r['rows_per_sec']:>9.1f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>6}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
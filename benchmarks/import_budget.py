@@ -0,0 +1,68 @@
+"""Import-time budget for the ``screening`` package.
+
+Each measurement runs in a fresh interpreter so nothing is already cached in
+``sys.modules``. Fails (exit 1) when the median import time exceeds the budget
+or when importing the package drags in a heavy dependency.
+
+Usage:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 100 --runs 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["streamlit", "plotly", "pandas", "numpy", "sklearn", "joblib", "scipy"]
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import screening
+from screening import Screener, extract_number, is_low_risk_label, severity_bucket
+elapsed = time.perf_counter() - t0
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"ms": elapsed * 1000, "heavy": heavy}}))
+"""
+
+
+def measure(runs):
+    code = PROBE.format(heavy=HEAVY_MODULES)
+    samples, heavy = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout)
+        samples.append(result["ms"])
+        heavy.update(result["heavy"])
+    return samples, sorted(heavy)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--runs", type=int, default=11)
+    args = parser.parse_args(argv)
+
+    samples, heavy = measure(args.runs)
+    median = statistics.median(samples)
+    print(f"import screening: median {median:.2f} ms, min {min(samples):.2f} ms, "
+          f"max {max(samples):.2f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    ok = True
+    if heavy:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(heavy)}")
+        ok = False
+    if median > args.budget_ms:
+        print("FAIL: import time over budget")
+        ok = False
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Decode cost: per-row inverse_transform + substring checks vs LabelTables.
+
+Both paths decode the same random probability matrices; the legacy path is
+the loop the apps used before the tables (including the display-label
+mapping), and the results are checked for equality before timing.
+
+Usage:
+    python -m benchmarks.label_decode
+    python -m benchmarks.label_decode --sizes 1,100,10000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from screening import CONDITIONS, Screener, is_low_risk_label, severity_bucket
+
+
+def legacy_display(c, lbl, style):
+    if style == "bn":
+        if is_low_risk_label(lbl): return "ঝুঁকি নেই / কম"
+        elif "Moderate" in lbl: return "মাঝারি"
+        elif any(x in lbl for x in ["Severe", "High"]): return "তীব্র"
+        return "মৃদু"
+    if style == "en":
+        return f"No/Low {c}" if is_low_risk_label(lbl) else lbl
+    if lbl == "Minimal Anxiety": return "No Anxiety / Healthy"
+    if lbl == "Low Stress": return "No Stress / Healthy"
+    if lbl in ["No Depression", "Minimal Depression"]: return "No Depression / Healthy"
+    return lbl
+
+
+def legacy_decode(encoders, probs, style):
+    n = len(probs[0])
+    results = [[] for _ in range(n)]
+    for i, c in enumerate(CONDITIONS):
+        p = probs[i]
+        for r in range(n):
+            idx = p[r].argmax()
+            lbl = str(encoders[f"{c} Label"].inverse_transform([idx])[0])
+            results[r].append((c, lbl, float(p[r, idx] * 100), is_low_risk_label(lbl), severity_bucket(lbl),
+                               legacy_display(c, lbl, style)))
+    return results
+
+
+def table_decode(screener, probs, style):
+    return [[(*r[:5], screener.labels.display(r.condition, r.index, style)) for r in row]
+            for row in screener.decode(probs)]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,100,10000")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    screener = Screener.load()
+    rng = np.random.default_rng(args.seed)
+    k = [len(screener.encoders[f"{c} Label"].classes_) for c in CONDITIONS]
+
+    print(f"{'rows':>6} {'legacy ms':>10} {'tables ms':>10} {'speedup':>8}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        probs = [rng.dirichlet(np.ones(kc), size=n) for kc in k]
+        for style in ("en", "bn", "healthy"):
+            if legacy_decode(screener.encoders, probs, style) != table_decode(screener, probs, style):
+                print(f"FAIL: decoded results differ (style {style!r}, {n} rows)")
+                return 1
+        repeat = 3 if n > 1000 else 20
+        legacy = best_of(lambda: legacy_decode(screener.encoders, probs, "en"), repeat)
+        tables = best_of(lambda: table_decode(screener, probs, "en"), repeat)
+        print(f"{n:>6} {legacy * 1000:>10.3f} {tables * 1000:>10.3f} {legacy / tables:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Metrics registry: per-update cost, scoring overhead and export format.
+
+Times a counter ``inc`` and a histogram ``observe`` on their own, then the
+cached single-row ``predict_many`` and an uncached ``predict_proba`` with the
+registry's hot-path calls swapped for no-ops and with them live, and the
+time to render the full registry. The rendered text is checked line by
+line: every family has HELP/TYPE, every sample parses as a number, and
+histogram buckets are cumulative with ``+Inf`` equal to ``_count``.
+
+Usage:
+    python -m benchmarks.metrics_overhead
+    python -m benchmarks.metrics_overhead --max-us 2
+"""
+import argparse
+import re
+import sys
+import time
+
+from benchmarks.synthetic import random_rows
+from screening import Screener, metrics
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (\S+)$')
+
+
+def per_call_us(fn, calls):
+    fn()
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return best / calls * 1e6
+
+
+class _Off:
+    """Stands in for a metric child with the registry switched off."""
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+def switched_off():
+    off = _Off()
+    saved = dict(metrics.STAGE), dict(metrics.PREDICTED), metrics.BATCH_ROWS
+    metrics.STAGE.update({s: off for s in metrics.STAGE})
+    metrics.PREDICTED.update({m: off for m in metrics.PREDICTED})
+    metrics.BATCH_ROWS = off
+    return saved
+
+
+def restore(saved):
+    metrics.STAGE.update(saved[0])
+    metrics.PREDICTED.update(saved[1])
+    metrics.BATCH_ROWS = saved[2]
+
+
+def check_format(text):
+    """Problems found in a text exposition, as strings."""
+    problems, typed, buckets = [], {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            typed[name] = kind
+            continue
+        if line.startswith("#") or not line:
+            continue
+        m = SAMPLE.match(line)
+        if not m:
+            problems.append(f"unparsable line: {line!r}")
+            continue
+        name, labels, value = m.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            problems.append(f"bad value: {line!r}")
+            continue
+        base = re.sub(r"_(bucket|sum|count)$", "", name)
+        if name not in typed and base not in typed:
+            problems.append(f"sample without TYPE: {name}")
+        if name.endswith("_bucket"):
+            series = re.sub(r',?le="[^"]*"', "", labels or "").replace("{}", "")
+            prev = buckets.get((base, series), [])
+            if prev and value < prev[-1]:
+                problems.append(f"buckets not cumulative: {line!r}")
+            buckets[(base, series)] = prev + [value]
+        elif name.endswith("_count") and typed.get(base) == "histogram":
+            counts = buckets.get((base, labels or ""), [])
+            if not counts or counts[-1] != value:
+                problems.append(f"+Inf bucket != count for {base}{labels or ''}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--max-us", type=float, default=2.0, help="Budget for one counter inc / histogram observe")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    counter = metrics.Registry().counter("bench_total", "benchmark counter")
+    hist = metrics.Registry().histogram("bench_seconds", "benchmark histogram")
+    inc = per_call_us(counter.inc, args.calls)
+    observe = per_call_us(lambda: hist.observe(0.003), args.calls)
+    print(f"counter inc:                 {inc:7.3f} us")
+    print(f"histogram observe:           {observe:7.3f} us")
+
+    screener = Screener.load(compiled=True, cache_size=4096)
+    data = random_rows(64, screener.model, seed=args.seed)
+    record = [dict(zip(screener.feature_columns, data[0]))]
+    screener.predict_many(record)
+    timings = {}
+    for state in ("off", "on"):
+        saved = switched_off() if state == "off" else None
+        timings[state] = (per_call_us(lambda: screener.predict_many(record), args.calls),
+                          per_call_us(lambda: screener.predict_proba(data[:1]), 200))
+        if saved:
+            restore(saved)
+    for i, name in enumerate(("cached predict_many(1 row)", "uncached predict_proba(1)")):
+        off, on = timings["off"][i], timings["on"][i]
+        print(f"{name + ':':28s} {off:8.2f} us -> {on:8.2f} us with metrics ({on - off:+.2f} us)")
+
+    text = metrics.REGISTRY.render()
+    render = per_call_us(metrics.REGISTRY.render, 200)
+    print(f"render ({len(text.splitlines())} lines):        {render:7.1f} us")
+    problems = check_format(text)
+    for p in problems[:10]:
+        print("  " + p)
+
+    ok = inc <= args.max_us and observe <= args.max_us and not problems
+    print("OK" if ok else "FAIL: metric updates over budget or malformed exposition")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
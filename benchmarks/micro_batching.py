@@ -0,0 +1,91 @@
+"""Concurrent single-row scoring with and without the micro-batcher.
+
+Simulates ``--sessions`` Streamlit sessions (threads) that each submit
+``--requests`` distinct questionnaires through ``Screener.predict_one`` at
+the same time, and reports throughput, per-request latency and the batcher's
+batch-size / queueing-delay metrics.
+
+Usage:
+    python -m benchmarks.micro_batching
+    python -m benchmarks.micro_batching --sessions 64 --max-batch-size 64 --max-wait-ms 3
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+
+from screening import Screener
+
+PROFILE = {"age": "18-22", "gender": "Female", "uni": "Public", "dept": "EEE",
+           "year": "Second Year", "cgpa": 3.2, "sch": "Yes"}
+
+
+def run(screener, sessions, requests, seed):
+    rng = np.random.default_rng(seed)
+    answers = rng.integers(0, 4, (sessions, requests, 26)).tolist()
+    latencies = []
+    lock = threading.Lock()
+    start = threading.Barrier(sessions + 1)
+
+    def session(i):
+        start.wait()
+        local = []
+        for a in answers[i]:
+            t0 = time.perf_counter()
+            screener.predict_one(PROFILE, a)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "rps": sessions * requests / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10, help="Requests per session")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--compiled", action="store_true")
+    args = parser.parse_args(argv)
+
+    base = Screener.load(compiled=args.compiled)
+    direct = Screener(base.model, base.encoders, base.feature_columns, compiled=args.compiled)
+    batched = Screener(base.model, base.encoders, base.feature_columns, compiled=args.compiled)
+    batched.enable_micro_batching(args.max_batch_size, args.max_wait_ms)
+
+    # Idle path: one session at a time must not pay the queueing delay
+    idle = run(batched, 1, args.requests, seed=1)
+    print(f"idle (1 session, batcher on): p50 {idle['p50_ms']:.2f} ms")
+
+    for name, scr in (("direct", direct), ("batched", batched)):
+        r = run(scr, args.sessions, args.requests, seed=2)
+        print(f"{name:8s} {args.sessions} sessions: {r['rps']:8.1f} req/s  "
+              f"p50 {r['p50_ms']:7.2f} ms  p95 {r['p95_ms']:7.2f} ms")
+
+    st = batched.batcher.stats()
+    print(f"batcher: {st['batches']} batches, mean size {st['mean_batch_size']:.1f}, "
+          f"{st['direct_calls']} direct calls, queue delay p50 {st['queue_delay_ms']['p50']:.2f} ms "
+          f"p95 {st['queue_delay_ms']['p95']:.2f} ms")
+    print(f"batch sizes: {st['batch_size_hist']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
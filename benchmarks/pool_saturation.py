@@ -0,0 +1,101 @@
+"""Rerun latency of an idle session while scoring saturates the server.
+
+A Streamlit rerun is mostly pure-Python work in the server process (widget
+construction, translations, session state). This benchmark emulates one with
+a fixed chunk of Python work and measures its latency while ``--busy``
+sessions continuously score batches:
+
+* ``no load``    - nothing else running
+* ``in-process`` - busy sessions call the model in the server process
+* ``pool``       - busy sessions submit jobs to a ScoringPool
+
+Usage:
+    python -m benchmarks.pool_saturation
+    python -m benchmarks.pool_saturation --busy 8 --workers 4 --blas-threads 1
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+
+from benchmarks.synthetic import random_rows
+from screening import Screener
+from screening.pool import ScoringPool
+
+
+def fake_rerun():
+    """~ the Python-side work of building 26 radio widgets and a sidebar form."""
+    widgets = []
+    for i in range(26):
+        opts = [f"opt_{j}_{i}" for j in range(4)]
+        widgets.append({"key": f"q_{i}", "label": f"**{i}. question text {i}?**", "options": opts,
+                        "html": "".join(f"<li>{o}</li>" for o in opts)})
+    for _ in range(2000):
+        "".join(w["html"] for w in widgets)
+    return widgets
+
+
+def measure_reruns(duration, think=0.02):
+    """Latency from when a rerun is due (after think time) to when it finishes,
+    so time spent waiting for the GIL after waking up is included."""
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        due = time.perf_counter() + think
+        time.sleep(think)
+        fake_rerun()
+        latencies.append(time.perf_counter() - due)
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(0.95 * (len(latencies) - 1))] * 1000
+
+
+def saturate(score_fn, records, busy, duration):
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            score_fn(records)
+
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(busy)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    try:
+        return measure_reruns(duration)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--busy", type=int, default=4, help="Concurrently scoring sessions")
+    parser.add_argument("--batch", type=int, default=50, help="Rows per scoring job")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--blas-threads", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per scenario")
+    args = parser.parse_args(argv)
+
+    screener = Screener.load()
+    cols = screener.feature_columns
+    records = [dict(zip(cols, row)) for row in random_rows(args.batch, screener.model).tolist()]
+
+    p50, p95 = measure_reruns(args.duration)
+    print(f"no load     : rerun p50 {p50:6.2f} ms  p95 {p95:6.2f} ms")
+
+    p50, p95 = saturate(screener.predict_many, records, args.busy, args.duration)
+    print(f"in-process  : rerun p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  ({args.busy} busy sessions)")
+
+    t0 = time.perf_counter()
+    with ScoringPool(n_workers=args.workers, blas_threads=args.blas_threads, timeout=60) as pool:
+        print(f"pool start  : {time.perf_counter() - t0:.1f} s for {args.workers} pre-warmed workers")
+        p50, p95 = saturate(pool.predict_many, records, args.busy, args.duration)
+    print(f"pool        : rerun p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  ({args.busy} busy sessions, "
+          f"{args.workers} workers x {args.blas_threads} BLAS threads)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
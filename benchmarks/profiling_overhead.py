@@ -0,0 +1,64 @@
+"""Per-stage model timing, and the profiler's own overhead.
+
+Prints the aggregated stage table for a workload of single-row and batched
+calls, then compares the single-row ``predict_proba`` latency never
+profiled / profiling enabled / enabled then disabled (the wrappers are
+removed, so the last should match the first).
+
+Usage:
+    python -m benchmarks.profiling_overhead
+    python -m benchmarks.profiling_overhead --compiled --batch 500
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.synthetic import random_rows, to_frame
+from screening import Screener
+
+
+def min_ms(fn, runs):
+    """Best of ``runs`` (the least noisy estimate of a sub-millisecond difference)."""
+    fn()
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return min(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--compiled", action="store_true")
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=300, help="Single-row calls per measurement")
+    args = parser.parse_args(argv)
+
+    screener = Screener.load(compiled=args.compiled)
+    data = random_rows(args.batch, screener.model, seed=0)
+    rows = data if args.compiled else to_frame(data, screener.feature_columns)
+    one = rows[:1] if args.compiled else rows.iloc[:1]
+
+    profiler = screener.enable_profiling()
+    for _ in range(50):
+        screener.predict_proba(one)
+    for _ in range(10):
+        screener.predict_proba(rows)
+    print(f"50 single-row + 10 x {args.batch}-row calls ({'compiled' if args.compiled else 'sklearn'}):")
+    print(profiler.format_table())
+    screener.disable_profiling()
+
+    call = lambda: screener.predict_proba(one)
+    off = min_ms(call, args.runs)
+    screener.enable_profiling()
+    on = min_ms(call, args.runs)
+    screener.disable_profiling()
+    after = min_ms(call, args.runs)
+    print(f"\nsingle-row predict_proba (best of {args.runs}): never profiled {off:.3f} ms, profiling on {on:.3f} ms "
+          f"({(on - off) * 1000:+.1f} us), disabled again {after:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Hyperparameter search: successive halving vs the exhaustive grid, and a consistent Pareto frontier.
+
+Writes a synthetic labelled survey (see ``benchmarks.training_repro``) and
+runs ``train_model.py --search`` on it with a small grid. Checks that
+
+* no frontier point is dominated by a final-round candidate, and every
+  other final-round candidate is dominated by one,
+* the best halving macro-F1 is within ``--max-f1-gap`` of the exhaustive
+  grid's (every candidate cross-validated on all rows, in one round),
+* the flags printed for the most accurate frontier point retrain exactly
+  those parameters (``train_model.py <flags> --no-cv``).
+
+Reports halving and exhaustive wall time and how much of the exhaustive
+frontier survived the halving.
+
+Usage:
+    python -m benchmarks.search_pareto
+    python -m benchmarks.search_pareto --rows 3000 --folds 5 --jobs 2 --factor 2
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import train_model
+from benchmarks.training_repro import labelled_survey
+from screening import Screener
+from screening.search import candidates, dominates, pareto_front, successive_halving
+
+GRID = {"lr_C": [0.1, 1.0], "svc_C": [0.3, 1.0, 3.0], "svc_gamma": ["scale", 0.1], "weights": [None, [1.0, 2.0]]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--factor", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--max-f1-gap", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    shipped = Screener.load(compiled=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        survey, grid = os.path.join(tmp, "survey.csv"), os.path.join(tmp, "grid.json")
+        labelled_survey(survey, shipped, args.rows, args.seed)
+        with open(grid, "w", encoding="utf-8") as f:
+            json.dump(GRID, f)
+        cache = os.path.join(tmp, "cache")
+        code = train_model.main([survey, "-o", os.path.join(tmp, "search"), "--search", "--grid", grid,
+                                 "--folds", str(args.folds), "--factor", str(args.factor), "--jobs", str(args.jobs),
+                                 "--cache-dir", cache])
+        if code:
+            return code
+        with open(os.path.join(tmp, "search", "search_report.json"), encoding="utf-8") as f:
+            report = json.load(f)
+
+        print("--- exhaustive grid")
+        X, labels, _ = train_model.read_survey(survey, shipped.feature_columns)
+        _, Y = train_model.encode_labels(labels)
+        params_list = candidates(GRID)
+        t0 = time.perf_counter()
+        full = successive_halving(X, Y, shipped.feature_columns, params_list, factor=len(params_list),
+                                  n_splits=args.folds, n_jobs=args.jobs, memory=cache, seed=train_model.SEED)[0]
+        exhaustive_seconds = time.perf_counter() - t0
+
+        best = report["frontier"][0]
+        out = os.path.join(tmp, "best")
+        code = train_model.main([survey, "-o", out, "--no-cv", "--no-cache"]
+                                + train_model.param_flags(best["params"]).split())
+        if code:
+            return code
+        with open(os.path.join(out, "training_report.json"), encoding="utf-8") as f:
+            retrained = json.load(f)["params"]
+
+    final, frontier = report["rounds"][-1]["results"], report["frontier"]
+    undominated = not any(dominates(r, p) for p in frontier for r in final)
+    covered = all(r in frontier or any(dominates(q, r) for q in final) for r in final)
+    halving_f1 = max(r["macro_f1"] for r in final)
+    full_f1 = max(r["macro_f1"] for r in full["results"])
+    full_front = [r["params"] for r in pareto_front(full["results"])]
+    survived = sum(p in [r["params"] for r in final] for p in full_front)
+    halving_seconds = sum(r["seconds"] for r in report["rounds"])
+
+    print("---")
+    print(f"{len(params_list)} candidates: halving {halving_seconds:.1f} s ("
+          + " -> ".join(f"{r['candidates']} on {r['rows']} rows" for r in report["rounds"])
+          + f"), exhaustive {exhaustive_seconds:.1f} s")
+    print(f"best macro-F1: halving {halving_f1:.3f}, exhaustive {full_f1:.3f}; "
+          f"{survived} of {len(full_front)} exhaustive frontier points survived the halving")
+    print(f"frontier: {len(frontier)} of {len(final)} final candidates, consistent: {undominated and covered}")
+    print(f"flags retrain the chosen parameters: {retrained == best['params']}")
+    ok = undominated and covered and full_f1 - halving_f1 <= args.max_f1_gap and retrained == best["params"]
+    print("OK" if ok else "FAIL: inconsistent frontier, halving lost accuracy or the flags do not round-trip")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
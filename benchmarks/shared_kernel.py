@@ -0,0 +1,73 @@
+"""Shared SVC kernel vs one kernel per SVC on the compiled model.
+
+Reports the support-vector overlap between the three conditions' SVCs, the
+largest probability difference between the two modes and against sklearn,
+and the kernel and full ``predict_proba`` time per batch size. Fails (exit 1)
+if the shared path differs from ``model.predict_proba`` by more than
+``--tol`` or changes any predicted class.
+
+Usage:
+    python -m benchmarks.shared_kernel
+    python -m benchmarks.shared_kernel --rows 5000 --sizes 1,100,5000
+"""
+import argparse
+import sys
+import warnings
+
+import numpy as np
+
+from benchmarks.compiled_parity import best_of
+from benchmarks.synthetic import random_rows, to_frame
+from screening import Screener
+from screening.compiled import CompiledModel, CompiledSVC
+
+warnings.filterwarnings("ignore")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="Rows for the parity check")
+    parser.add_argument("--sizes", default="1,100,2000", help="Comma-separated batch sizes to time")
+    parser.add_argument("--tol", type=float, default=1e-9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    screener = Screener.load()
+    model, cols = screener.model, screener.feature_columns
+    shared = CompiledModel(model, cols)
+    separate = CompiledModel(model, cols, shared_kernel=False)
+    svcs = [m for out in separate.outputs for m in out.members if isinstance(m, CompiledSVC)]
+    for k in shared.kernels:
+        print(f"support vectors: {k.n_total} over {len(svcs)} SVCs, {len(k.support_vectors)} unique "
+              f"({k.overlap:.2f}x fewer kernel columns)")
+
+    rows = random_rows(args.rows, model, seed=args.seed)
+    ref = model.predict_proba(to_frame(rows, cols))
+    a, b = shared.predict_proba(rows), separate.predict_proba(rows)
+    err_sk = max(float(np.abs(x - y).max()) for x, y in zip(a, ref))
+    err_sep = max(float(np.abs(x - y).max()) for x, y in zip(a, b))
+    same_argmax = all((x.argmax(1) == y.argmax(1)).all() for x, y in zip(a, ref))
+    print(f"parity: max |diff| vs sklearn {err_sk:.2e}, vs per-SVC kernels {err_sep:.2e}, "
+          f"argmax identical: {same_argmax}")
+
+    print(f"{'rows':>6s} {'kernel ms':>22s} {'predict_proba ms':>24s}")
+    print(f"{'':6s} {'per-SVC':>10s} {'shared':>10s}  {'per-SVC':>10s} {'shared':>10s} {'speedup':>8s}")
+    rng = np.random.default_rng(args.seed)
+    for n in [int(x) for x in args.sizes.split(",")]:
+        batch = random_rows(n, model, seed=int(rng.integers(1 << 31)))
+        Z = shared.transform(batch)
+        repeat = 50 if n <= 100 else 5
+        k_sep = best_of(lambda: [m.kernel(Z) for m in svcs], repeat)
+        k_sh = best_of(lambda: [k.kernel(Z) for k in shared.kernels], repeat)
+        p_sep = best_of(lambda: separate.predict_proba(batch), repeat)
+        p_sh = best_of(lambda: shared.predict_proba(batch), repeat)
+        print(f"{n:6d} {k_sep * 1e3:10.3f} {k_sh * 1e3:10.3f}  {p_sep * 1e3:10.3f} {p_sh * 1e3:10.3f} "
+              f"{p_sep / p_sh:7.2f}x")
+
+    ok = err_sk <= args.tol and same_argmax
+    print("OK" if ok else f"FAIL: parity above tolerance {args.tol:g}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Insert throughput of the assessment store under many concurrent sessions.
+
+``--sessions`` threads (Streamlit sessions) each record ``--records``
+assessments at once while a reader thread keeps querying the database. The
+benchmark reports the time a session spends in ``record`` (what the UI
+pays), the end-to-end insert rate until everything is committed, the
+writer's mean batch size, and checks that every row arrived exactly once and
+that the reader never failed. For comparison, the same rows are inserted
+synchronously with one commit per row (rollback journal), which is what a
+naive per-click INSERT would cost.
+
+Usage:
+    python -m benchmarks.store_insert
+    python -m benchmarks.store_insert --sessions 1,64,256 --records 50
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from screening import CONDITIONS, ConditionResult
+from screening.store import INSERT, SCHEMA, TABLE, AssessmentStore, assessment_row, connect
+
+PROFILE = {"name": "Test Student", "age": "18-22", "gender": "Female", "uni": "Public", "dept": "EEE",
+           "year": "Second Year", "cgpa": 3.2, "sch": "Yes"}
+RESULTS = [ConditionResult(c, f"Moderate {c}", 71.5, False, "Moderate", 2) for c in CONDITIONS]
+
+
+def run_store(path, sessions, records, answers, batch_size, flush_ms):
+    store = AssessmentStore(path, batch_size=batch_size, flush_ms=flush_ms)
+    stop = threading.Event()
+    reader_errors, reads = [], [0]
+
+    def reader():
+        conn = connect(path, readonly=True)
+        while not stop.is_set():
+            try:
+                conn.execute(f"SELECT dept, COUNT(*), AVG(anxiety_confidence) FROM {TABLE} GROUP BY dept").fetchall()
+                reads[0] += 1
+            except sqlite3.Error as e:
+                reader_errors.append(e)
+            time.sleep(0.005)
+        conn.close()
+
+    latencies = []
+    lock = threading.Lock()
+    start = threading.Barrier(sessions + 1)
+
+    # A unique name per assessment, to check that each arrives exactly once
+    profiles = [[dict(PROFILE, name=f"{i}-{j}") for j in range(records)] for i in range(sessions)]
+
+    def session(i):
+        start.wait()
+        local = []
+        for j in range(records):
+            t0 = time.perf_counter()
+            store.record(profiles[i][j], answers[i * records + j], RESULTS, session=f"s{i}")
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    r = threading.Thread(target=reader)
+    r.start()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    t_enqueue = time.perf_counter() - t0
+    store.flush()
+    wall = time.perf_counter() - t0
+    stop.set()
+    r.join()
+    stats = store.stats()
+    store.close()
+
+    conn = connect(path, readonly=True)
+    n, distinct = conn.execute(f"SELECT COUNT(*), COUNT(DISTINCT name) FROM {TABLE}").fetchone()
+    per_session = conn.execute(f"SELECT COUNT(*) FROM {TABLE} GROUP BY session").fetchall()
+    conn.close()
+    latencies.sort()
+    total = sessions * records
+    return {
+        "rows_per_sec": total / wall,
+        "enqueue_s": t_enqueue,
+        "record_p50_us": statistics.median(latencies) * 1e6,
+        "record_p99_us": latencies[int(0.99 * (len(latencies) - 1))] * 1e6,
+        "mean_batch": stats["mean_batch"],
+        "consistent": n == total and distinct == total and all(c[0] == records for c in per_session)
+                      and stats["dropped"] == 0 and stats["errors"] == 0,
+        "reader_errors": len(reader_errors),
+        "reads": reads[0],
+    }
+
+
+def run_naive(path, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    t0 = time.perf_counter()
+    for row in rows:
+        conn.execute(INSERT, row)
+        conn.commit()
+    wall = time.perf_counter() - t0
+    conn.close()
+    return len(rows) / wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,32,256", help="Comma-separated concurrent session counts")
+    parser.add_argument("--records", type=int, default=40, help="Assessments per session")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--flush-ms", type=float, default=50.0)
+    parser.add_argument("--naive-rows", type=int, default=500, help="Rows for the one-commit-per-row baseline")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        naive_rows = [assessment_row(PROFILE, a, RESULTS) for a in rng.integers(0, 4, (args.naive_rows, 26)).tolist()]
+        naive = run_naive(os.path.join(tmp, "naive.db"), naive_rows)
+        print(f"baseline (one commit per row, no WAL): {naive:,.0f} rows/s")
+        print(f"{'sessions':>8s} {'rows':>7s} {'rows/s':>10s} {'record p50 us':>14s} {'p99 us':>8s} "
+              f"{'mean batch':>10s} {'reads':>6s} {'consistent':>10s}")
+        for i, sessions in enumerate(int(s) for s in args.sessions.split(",")):
+            answers = rng.integers(0, 4, (sessions * args.records, 26)).tolist()
+            r = run_store(os.path.join(tmp, f"store{i}.db"), sessions, args.records, answers,
+                          args.batch_size, args.flush_ms)
+            consistent = r["consistent"] and r["reader_errors"] == 0
+            ok &= consistent
+            print(f"{sessions:8d} {sessions * args.records:7d} {r['rows_per_sec']:10,.0f} {r['record_p50_us']:14.1f} "
+                  f"{r['record_p99_us']:8.1f} {r['mean_batch']:10.1f} {r['reads']:6d} {str(consistent):>10s}")
+    print("OK" if ok else "FAIL: missing/duplicate rows or reader errors")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""Benchmark suite: load, preprocessing, inference, decoding and app reruns.
+
+Inputs are synthetic but schema-valid: rows come from ``feature_columns`` and
+the model's categorical vocabulary mixed with the apps' option lists (see
+``benchmarks.synthetic``), with a fixed seed. Each case reports the median,
+p95 and minimum time per call; batch cases also report rows/sec. Results go
+to JSON together with the commit, library versions and model hash, so two
+runs can be compared:
+
+Usage:
+    python -m benchmarks.suite -o bench.json
+    python -m benchmarks.suite --quick --skip-apps -o bench.json
+    python -m benchmarks.suite --only predict -o bench.json
+    python -m benchmarks.suite --compare old.json new.json --threshold 1.2 --metric min_ms
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import AGE_OPTIONS, random_answers, random_profile, random_rows, to_frame
+from screening import Screener, build_input_row, extract_number, load_artifacts, load_resources
+from screening.core import ROOT
+
+BATCH_SIZES = [1, 10, 100, 10000]
+
+
+# -----------------------------
+# TIMING
+# -----------------------------
+def measure(fn, min_repeat=5, max_repeat=50, min_time=0.3):
+    """Per-call seconds for ``fn``; fast calls are looped so each sample takes >= 2 ms."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= 0.002 or number >= 100_000:
+            break
+        number *= 10
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_repeat or (len(samples) < max_repeat and time.perf_counter() < deadline):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return samples
+
+
+def summarize(samples, rows=None):
+    s = sorted(samples)
+    out = {
+        "median_ms": statistics.median(s) * 1000,
+        "p95_ms": s[min(len(s) - 1, int(0.95 * len(s)))] * 1000,
+        "min_ms": s[0] * 1000,
+        "samples": len(s),
+    }
+    if rows:
+        out["rows"] = rows
+        out["rows_per_sec"] = rows / statistics.median(s)
+    return out
+
+
+# -----------------------------
+# CASES
+# -----------------------------
+def bench_load(repeat):
+    return {
+        "load.pickles": summarize(measure(load_resources, min_repeat=repeat)),
+        "load.default": summarize(measure(load_artifacts, min_repeat=repeat)),
+    }
+
+
+def bench_preprocess(screener, rng, repeat):
+    texts = AGE_OPTIONS + ["3.50", "3.5 out of 4", "", None]
+    profile, answers = random_profile(rng), random_answers(rng)
+    cols = screener.feature_columns
+    row = build_input_row(cols, profile, answers)
+    return {
+        "extract_number": summarize(measure(lambda: [extract_number(t) for t in texts], min_repeat=repeat),
+                                    rows=len(texts)),
+        "assemble.input_row": summarize(measure(lambda: build_input_row(cols, profile, answers), min_repeat=repeat)),
+        "assemble.dataframe": summarize(measure(lambda: screener.frame([row]), min_repeat=repeat)),
+    }
+
+
+def bench_predict(screener, compiled, rng, repeat):
+    out = {}
+    for n in BATCH_SIZES:
+        rows = random_rows(n, screener.model, seed=int(rng.integers(1 << 31)))
+        df = to_frame(rows, screener.feature_columns)
+        reps = max(3, repeat // 2) if n >= 10000 else repeat
+        out[f"predict_proba.sklearn.{n}"] = summarize(measure(lambda: screener.predict_proba(df), min_repeat=reps,
+                                                              max_repeat=reps if n >= 10000 else 50), rows=n)
+        out[f"predict_proba.compiled.{n}"] = summarize(measure(lambda: compiled.predict_proba(rows), min_repeat=reps,
+                                                               max_repeat=reps if n >= 10000 else 50), rows=n)
+    return out
+
+
+def bench_decode(screener, rng, repeat):
+    k = [len(t.labels) for t in screener.labels.tables]
+    out = {}
+    for n in (1, 100, 10000):
+        probs = [rng.dirichlet(np.ones(kc), size=n) for kc in k]
+        out[f"decode.{n}"] = summarize(measure(lambda: screener.decode(probs), min_repeat=repeat), rows=n)
+    return out
+
+
+def bench_apps(rng, repeat):
+    """Initial script run and Analyze rerun of each app; the first session also pays for model load."""
+    from benchmarks.app_flows import APPS, fill_and_analyze, new_session
+
+    out = {}
+    for app in APPS:
+        first, initial, analyze = None, [], []
+        for i in range(repeat + 1):
+            at = new_session(app)
+            t0 = time.perf_counter()
+            at.run()
+            t_initial = time.perf_counter() - t0
+            if at.exception:
+                raise RuntimeError(f"{app} raised on first run: {at.exception}")
+            profile, answers = random_profile(rng), random_answers(rng)
+            t0 = time.perf_counter()
+            fill_and_analyze(at, app, profile, answers)
+            t_analyze = time.perf_counter() - t0
+            if at.exception:
+                raise RuntimeError(f"{app} raised on Analyze: {at.exception}")
+            if i == 0:
+                first = t_initial
+            else:
+                initial.append(t_initial)
+                analyze.append(t_analyze)
+        out[f"apptest.{app}.cold_run"] = summarize([first])
+        out[f"apptest.{app}.run"] = summarize(initial)
+        out[f"apptest.{app}.analyze"] = summarize(analyze)
+    return out
+
+
+# -----------------------------
+# METADATA / COMPARE
+# -----------------------------
+def metadata(screener):
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    manifest = screener.manifest or {}
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "model_version": manifest.get("version"),
+        "model_hash": manifest.get("content_hash"),
+    }
+
+
+def compare(old_path, new_path, threshold, metric="median_ms"):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"old: {old['meta'].get('commit')}  new: {new['meta'].get('commit')}")
+    print(f"{'case':40s} {'old ms':>10s} {'new ms':>10s} {'ratio':>7s}   ({metric})")
+    regressions = []
+    for name, r in new["results"].items():
+        if name not in old["results"]:
+            continue
+        a, b = old["results"][name][metric], r[metric]
+        ratio = b / a if a else float("inf")
+        flag = " <-- slower" if ratio > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:40s} {a:10.3f} {b:10.3f} {ratio:6.2f}x{flag}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than {threshold:.2f}x")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=7, help="Minimum samples per case")
+    parser.add_argument("--quick", action="store_true", help="Fewer samples (3 per case, 1 per app)")
+    parser.add_argument("--skip-apps", action="store_true", help="Skip the Streamlit AppTest runs")
+    parser.add_argument("--only", help="Only run case groups starting with this (load, extract_number, assemble, "
+                                       "predict_proba, decode, apptest)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio flagged by --compare")
+    parser.add_argument("--metric", default="median_ms", choices=["median_ms", "min_ms", "p95_ms"],
+                        help="Statistic compared by --compare (min_ms is the least noisy)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold, args.metric)
+
+    repeat = 3 if args.quick else args.repeat
+    rng = np.random.default_rng(args.seed)
+    screener = Screener.load()
+    compiled = Screener.load(compiled=True).compiled
+
+    groups = [
+        (("load",), lambda: bench_load(repeat)),
+        (("extract_number", "assemble"), lambda: bench_preprocess(screener, rng, repeat)),
+        (("predict_proba",), lambda: bench_predict(screener, compiled, rng, repeat)),
+        (("decode",), lambda: bench_decode(screener, rng, repeat)),
+        (("apptest",), None if args.skip_apps else lambda: bench_apps(rng, 1 if args.quick else 3)),
+    ]
+    results = {}
+    for prefixes, fn in groups:
+        if fn is None or (args.only and not any(p.startswith(args.only) for p in prefixes)):
+            continue
+        for case, r in fn().items():
+            results[case] = r
+            rate = f"  {r['rows_per_sec']:>12,.0f} rows/s" if "rows_per_sec" in r else ""
+            print(f"{case:40s} median {r['median_ms']:10.3f} ms  p95 {r['p95_ms']:10.3f} ms{rate}", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": metadata(screener), "results": results}, f, indent=2)
+        print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
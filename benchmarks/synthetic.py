@@ -0,0 +1,79 @@
+"""Schema-valid synthetic questionnaire rows for benchmarks."""
+import numpy as np
+
+# Values the Streamlit apps actually send (not in the training vocabulary, so
+# they exercise the one-hot ``handle_unknown="ignore"`` path)
+APP_VALUES = {
+    1: ["Male", "Female"],
+    2: ["Public", "Private"],
+    3: ["CSE", "EEE", "BBA", "English", "Law", "Pharmacy", "Other"],
+    4: ["First Year", "Second Year", "Third Year", "Fourth Year", "Master"],
+    6: ["Yes", "No"],
+}
+AGE_GROUPS = [18.0, 23.0, 27.0, 30.0]
+AGE_OPTIONS = ["18-22", "23-26", "27-30", "Above 30"]  # what the apps' age selectboxes send
+
+# Profile option lists of the apps, keyed like the profile dicts they build
+PROFILE_OPTIONS = {
+    "age": AGE_OPTIONS,
+    "gender": APP_VALUES[1],
+    "uni": APP_VALUES[2],
+    "dept": APP_VALUES[3],
+    "year": APP_VALUES[4],
+    "sch": APP_VALUES[6],
+}
+
+
+def categorical_vocab(model):
+    """Training categories of the 5 categorical columns, keyed by feature index."""
+    if hasattr(model, "pre"):  # CompiledModel (compact export)
+        return {i: list(table) for i, table in zip(model.pre.cat_idx, model.pre.cat_tables)}
+    pre = model.steps[0][1]
+    cats = pre.named_transformers_["cat"].named_steps["onehot"].categories_
+    return dict(zip([1, 2, 3, 4, 6], [list(c) for c in cats]))
+
+
+def random_rows(n, model, seed=0, app_share=0.5, correlated_share=0.0):
+    """(n, 33) object array in feature_columns order.
+
+    ``app_share`` of the categorical values come from the app option lists,
+    the rest from the model's training vocabulary. Answers are uniform at
+    random, except for ``correlated_share`` of the rows, which answer around a
+    per-student level (closer to real questionnaires, including all-low and
+    all-high ones).
+    """
+    rng = np.random.default_rng(seed)
+    vocab = categorical_vocab(model)
+    rows = np.empty((n, 33), dtype=object)
+    rows[:, 0] = rng.choice(AGE_GROUPS, n)
+    rows[:, 5] = np.round(rng.uniform(2.0, 4.0, n), 2)
+    for col in (1, 2, 3, 4, 6):
+        use_app = rng.random(n) < app_share
+        rows[:, col] = np.where(use_app, rng.choice(APP_VALUES[col], n), rng.choice(vocab[col], n))
+    rows[:, 7:] = rng.integers(0, 4, (n, 26))
+    if correlated_share:
+        idx = np.flatnonzero(rng.random(n) < correlated_share)
+        level = rng.uniform(-0.5, 3.5, (idx.size, 1))
+        rows[idx, 7:] = np.clip(np.rint(level + rng.normal(0, 0.7, (idx.size, 26))), 0, 3).astype(int)
+    return rows
+
+
+def to_frame(rows, feature_columns):
+    """Typed DataFrame (numeric columns as numbers) for the sklearn path."""
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=feature_columns)
+    for i in [0, 5] + list(range(7, 33)):
+        df[feature_columns[i]] = pd.to_numeric(df[feature_columns[i]])
+    return df
+
+
+def random_profile(rng):
+    """A profile dict as the apps build it (option strings, CGPA as a float)."""
+    profile = {k: str(rng.choice(v)) for k, v in PROFILE_OPTIONS.items()}
+    profile["cgpa"] = round(float(rng.uniform(2.0, 4.0)), 2)
+    return profile
+
+
+def random_answers(rng):
+    return [int(a) for a in rng.integers(0, 4, 26)]
@@ -0,0 +1,72 @@
+"""Rerun tracing: per-span cost and an end-to-end traced app_v3 session.
+
+Times one span with tracing off (the shared no-op span) and on (a record
+handed to the JSONL exporter), then drives app_v3 through ``AppTest`` with
+``MH_TRACE`` set (first load, profile submission, answers, Analyze) and
+checks that every rerun phase was exported and that ``trace_summary.py``
+summarizes the file. Prints the summary table.
+
+Usage:
+    python -m benchmarks.trace_overhead
+    python -m benchmarks.trace_overhead --max-us 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.app_flows import fill_and_analyze, new_session
+from screening import tracing
+from trace_summary import print_summary, read_spans, summarize
+
+PHASES = {"styles", "header", "load_model", "panels", "sidebar", "questionnaire", "prediction", "results",
+          "suggestions", "report", "footer"}
+PROFILE = {"age": "18-22", "gender": "Female", "uni": "Public", "dept": "EEE", "year": "Second Year",
+           "cgpa": 3.2, "sch": "No"}
+
+
+def per_span_us(trace, calls):
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            with trace.span("phase"):
+                pass
+        best = min(best, time.perf_counter() - t0)
+    return best / calls * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--max-us", type=float, default=10.0, help="Budget for one recorded span")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces.jsonl")
+        off = per_span_us(tracing.get_tracer("bench", path="").rerun("s"), args.calls)
+        on = per_span_us(tracing.get_tracer("bench", path=os.path.join(tmp, "bench.jsonl")).rerun("s"), args.calls)
+        print(f"span, tracing off: {off:6.2f} us")
+        print(f"span, tracing on:  {on:6.2f} us")
+
+        os.environ["MH_TRACE"] = path
+        try:
+            at = new_session("app_v3.py").run()
+            fill_and_analyze(at, "app_v3.py", PROFILE, [1] * 26)
+        finally:
+            os.environ.pop("MH_TRACE", None)
+        tracing.get_tracer("app_v3", path).exporter.flush()
+        summary = summarize(read_spans(path, app="app_v3"))
+        print_summary(summary)
+
+    missing = PHASES - {r["phase"] for r in summary["phases"]}
+    if missing:
+        print(f"missing phases: {sorted(missing)}")
+    ok = not at.exception and not missing and on <= args.max_us
+    print("OK" if ok else "FAIL: span over budget, app error or phases missing")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
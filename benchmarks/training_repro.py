@@ -0,0 +1,87 @@
+"""Retraining: reproducibility, CV timing with and without the preprocessing cache, and a usable artifact.
+
+Writes a synthetic labelled survey (schema-valid rows labelled by the
+shipped model), then runs ``train_model.py`` on it twice with the same
+seed and a fresh preprocessing cache (cold, then warm). Checks that both
+runs write byte-identical artifacts and the same CV scores, that the
+retrained artifacts load into ``Screener`` and compile
+(``CompiledModel`` matches its ``predict_proba``), and reports CV wall
+time per run, the cores used, and label agreement with the shipped model
+on held-out rows.
+
+Usage:
+    python -m benchmarks.training_repro
+    python -m benchmarks.training_repro --rows 3000 --folds 5 --jobs 2
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+from joblib import effective_n_jobs
+
+import train_model
+from benchmarks.synthetic import random_rows, to_frame
+from screening import CONDITIONS, Screener
+from screening.compiled import CompiledModel
+
+
+def labelled_survey(path, screener, n, seed):
+    rows = random_rows(n, screener.compiled, seed=seed, correlated_share=0.5)
+    df = to_frame(rows, screener.feature_columns)
+    for d in screener.labels.decode(screener.compiled.predict_proba(rows)):
+        df[f"{d.condition} Label"] = d.label
+    df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--holdout", type=int, default=2000)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    shipped = Screener.load(compiled=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        survey = os.path.join(tmp, "survey.csv")
+        labelled_survey(survey, shipped, args.rows, args.seed)
+        reports = []
+        for run in ("cold", "warm"):
+            out = os.path.join(tmp, run)
+            print(f"--- {run} cache")
+            code = train_model.main([survey, "-o", out, "--folds", str(args.folds), "--jobs", str(args.jobs),
+                                     "--cache-dir", os.path.join(tmp, "cache")])
+            if code:
+                return code
+            with open(os.path.join(out, "training_report.json"), encoding="utf-8") as f:
+                reports.append(json.load(f))
+
+        cold, warm = reports
+        same_artifacts = cold["artifacts"] == warm["artifacts"]
+        same_scores = cold["cv"]["summary"] == warm["cv"]["summary"]
+        out = os.path.join(tmp, "warm")
+        retrained = Screener.load(source=tuple(os.path.join(out, name) for name in train_model.ARTIFACTS.values()))
+        holdout = random_rows(args.holdout, shipped.compiled, seed=args.seed + 1, correlated_share=0.5)
+        probs = retrained.predict_proba(to_frame(holdout, retrained.feature_columns))
+        compiled = CompiledModel(retrained.model, retrained.feature_columns).predict_proba(holdout)
+        parity = max(float(np.abs(a - b).max()) for a, b in zip(probs, compiled))
+        teacher = shipped.compiled.predict_proba(holdout)
+
+    print("---")
+    print(f"CV wall: cold cache {cold['cv']['wall_seconds']:.1f} s, warm cache {warm['cv']['wall_seconds']:.1f} s "
+          f"({effective_n_jobs(args.jobs)} of {os.cpu_count()} cores)")
+    print(f"same artifacts (sha256) and CV scores across runs: {same_artifacts and same_scores}")
+    print(f"retrained model: compiled vs predict_proba {parity:.1e}; agreement with the shipped model on "
+          f"{args.holdout} held-out rows: "
+          + ", ".join(f"{c} {np.mean(p.argmax(1) == t.argmax(1)):.1%}" for c, p, t in zip(CONDITIONS, probs, teacher)))
+    ok = same_artifacts and same_scores and parity < 1e-9
+    print("OK" if ok else "FAIL: retraining is not reproducible or the artifact does not compile")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
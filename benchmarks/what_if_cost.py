@@ -0,0 +1,89 @@
+"""What-if sensitivity: cost against the base prediction, and parity with one call per variant.
+
+For random students, times an uncached ``predict_one`` (the base prediction)
+and ``what_if`` (all one-level answer changes in one batched call, ranked
+per condition and cut to app_v3's top entries) on the scikit-learn pipeline
+app_v3 uses, and on the compiled model (kernel rows updated per variant).
+Both must stay within ``--max-ratio`` of the base prediction. Checks every
+reported shift and label against scoring each variant with its own
+``predict_proba`` call.
+
+Usage:
+    python -m benchmarks.what_if_cost
+    python -m benchmarks.what_if_cost --students 50 --max-ratio 2
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import random_answers, random_profile
+from screening import Screener, build_input_row
+from screening.sensitivity import variants, what_if
+
+
+def best_ms(fn, repeat):
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def naive(screener, profile, answers):
+    """{(question, delta, condition): (shift, label)} from one predict_proba per variant."""
+    cols = screener.feature_columns
+    base_row = build_input_row(cols, profile, answers)
+    base = screener.predict_proba([base_row])
+    out = {}
+    for i, d in variants(answers):
+        changed = list(answers)
+        changed[i] += d
+        probs = screener.predict_proba([build_input_row(cols, profile, changed)])
+        for table, p0, p in zip(screener.labels.tables, base, probs):
+            current = int(np.argmax(p0[0]))
+            out[(i + 1, d, table.condition)] = ((p[0, current] - p0[0, current]) * 100,
+                                                str(table.labels[int(np.argmax(p[0]))]))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="Budget for what_if / base, on either model")
+    parser.add_argument("--top", type=int, default=3, help="Entries kept per condition (app_v3's WHAT_IF_TOP)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    students = [(random_profile(rng), random_answers(rng)) for _ in range(args.students)]
+    ratios, mismatches = {}, 0
+    for name, compiled in (("sklearn (app_v3)", False), ("compiled", True)):
+        screener = Screener.load(compiled=compiled)
+        base, cost = [], []
+        for profile, answers in students:
+            base.append(best_ms(lambda: screener.predict_one(profile, answers), args.repeat))
+            cost.append(best_ms(lambda: what_if(screener, profile, answers, top=args.top), args.repeat))
+        for profile, answers in students[:5]:
+            expected = naive(screener, profile, answers)
+            for w in (w for ranked in what_if(screener, profile, answers).values() for w in ranked):
+                shift, label = expected[(w.question, w.delta, w.condition)]
+                if abs(w.shift - shift) > 1e-6 or w.label != label:
+                    mismatches += 1
+        ratios[name] = statistics.median(c / b for b, c in zip(base, cost))
+        print(f"{name:17s} base {statistics.median(base):7.2f} ms  what_if {statistics.median(cost):7.2f} ms  "
+              f"ratio {ratios[name]:.2f}x  (naive: {len(variants(students[0][1])) + 1} calls)")
+
+    print(f"variants checked against one call each: {mismatches} mismatches")
+    ok = max(ratios.values()) <= args.max_ratio and not mismatches
+    print("OK" if ok else "FAIL: what_if over budget or differs from per-variant scoring")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Build the versioned, checksummed model bundle from the three pickles.
+
+Usage:
+    python build_bundle.py                          # -> model_bundle/
+    python build_bundle.py -o model_bundle --version 2024.1
+    python build_bundle.py --check model_bundle     # verify an existing bundle
+"""
+import argparse
+import os
+import sys
+import time
+
+from screening.bundle import BundleError, dir_size, sha256_file, load_bundle, save_bundle
+from screening.core import BUNDLE_PATH, COLUMNS_PATH, ENCODERS_PATH, MODEL_PATH, load_resources
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the model bundle (manifest + pickle + memory-mappable arrays).")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--encoders", default=ENCODERS_PATH)
+    parser.add_argument("--columns", default=COLUMNS_PATH)
+    parser.add_argument("-o", "--output", default=BUNDLE_PATH, help="Bundle directory")
+    parser.add_argument("--version", help="Bundle version (default: date + content hash)")
+    parser.add_argument("--check", metavar="BUNDLE", help="Only verify an existing bundle")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        try:
+            _, _, _, manifest = load_bundle(args.check)
+        except BundleError as e:
+            print(f"INVALID: {e}")
+            return 1
+        print(f"OK: bundle {manifest['version']} ({manifest['content_hash'][:12]}), "
+              f"scikit-learn {manifest['versions']['sklearn']}")
+        return 0
+
+    model, encoders, feature_columns = load_resources(args.model, args.encoders, args.columns)
+    source = {os.path.basename(p): sha256_file(p) for p in (args.model, args.encoders, args.columns)}
+    try:
+        manifest = save_bundle(args.output, model, encoders, feature_columns, version=args.version, source=source)
+    except BundleError as e:
+        print(f"Refusing to build: {e}")
+        return 1
+
+    t0 = time.perf_counter()
+    load_bundle(args.output)
+    load_ms = (time.perf_counter() - t0) * 1000
+    n_arrays = sum(name.startswith("arrays/") for name in manifest["files"])
+    print(f"Wrote {args.output}: version {manifest['version']}, {n_arrays} arrays, "
+          f"{dir_size(args.output) / 1024:.0f} KiB, verified load {load_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
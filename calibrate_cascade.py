@@ -0,0 +1,77 @@
+"""Calibrate the early-exit cascade and report agreement, exit rate and speedup.
+
+Thresholds are fitted on synthetic schema-valid questionnaires (half uniform,
+half answering around a per-student level), checked on a separate holdout
+set, and written with the model hash to ``cascade_thresholds.json`` (read by
+``Screener.enable_cascade``).
+
+Usage:
+    python calibrate_cascade.py
+    python calibrate_cascade.py --target 0.999 --rows 50000 -o cascade_thresholds.json
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import random_rows
+from screening import CONDITIONS, Screener
+from screening.cascade import THRESHOLDS_PATH, CascadeModel, calibrate, evaluate, save_thresholds
+
+
+def best_of(fn, runs):
+    fn()
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate the early-exit cascade thresholds.")
+    parser.add_argument("--target", type=float, default=0.995, help="Min label agreement with the full ensemble")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence of the agreement bound")
+    parser.add_argument("--rows", type=int, default=20000, help="Calibration rows (same again for holdout)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=THRESHOLDS_PATH)
+    args = parser.parse_args(argv)
+
+    screener = Screener.load(compiled=True)
+    compiled = screener.compiled
+    calib = random_rows(args.rows, screener.model, seed=args.seed, correlated_share=0.5)
+    holdout = random_rows(args.rows, screener.model, seed=args.seed + 1, correlated_share=0.5)
+
+    thresholds, report = calibrate(compiled, calib, args.target, args.confidence)
+    cascade = CascadeModel(compiled, thresholds)
+    held = evaluate(compiled, cascade, holdout)
+    early = cascade.stats()["early_exit"]  # from the holdout pass inside evaluate
+
+    print(f"target agreement {args.target} at {args.confidence:.0%} confidence, "
+          f"{args.rows} calibration + {args.rows} holdout rows")
+    print(f"{'output':12s} {'threshold':>9s} {'exit (cal)':>10s} {'exit (hold)':>11s} {'agree (hold)':>12s} {'LR alone':>9s}")
+    for c in CONDITIONS:
+        r = report[c]
+        print(f"{c:12s} {r['threshold']:9.4f} {r['early_exit']:10.1%} {early[c]:11.1%} {held[c]:12.4%} "
+              f"{r['lr_agreement']:9.2%}")
+        r["holdout_agreement"], r["holdout_early_exit"] = held[c], early[c]
+    print(f"rows needing no SVC at all: {cascade.stats()['no_svc']:.1%}")
+
+    batch = holdout[:1000]
+    full_b, fast_b = best_of(lambda: compiled.predict_proba(batch), 5), best_of(lambda: cascade.predict_proba(batch), 5)
+    singles = [holdout[i:i + 1] for i in range(200)]
+    full_1 = best_of(lambda: [compiled.predict_proba(r) for r in singles], 3) / len(singles)
+    fast_1 = best_of(lambda: [cascade.predict_proba(r) for r in singles], 3) / len(singles)
+    print(f"speedup: 1000-row batch {full_b * 1000:.1f} -> {fast_b * 1000:.1f} ms ({full_b / fast_b:.1f}x), "
+          f"single row {full_1 * 1000:.3f} -> {fast_1 * 1000:.3f} ms ({full_1 / fast_1:.1f}x)")
+
+    speed = {"batch_1000_ms": [full_b * 1000, fast_b * 1000], "single_row_ms": [full_1 * 1000, fast_1 * 1000]}
+    save_thresholds(args.output, thresholds, screener.model_hash, args.target,
+                    dict(report, speed=speed, confidence=args.confidence, rows=args.rows, seed=args.seed))
+    print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
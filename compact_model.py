@@ -0,0 +1,145 @@
+"""Export the compact float32 model and report its trade-off against the original.
+
+The compact bundle (see ``screening.compact``) merges the SVCs' support
+vectors, optionally prunes weak ones, stores float32 parameters and holds no
+sklearn objects. The report compares it with the original bundle: size on
+disk, load time and RSS in a fresh interpreter (imports included, as a new
+Streamlit worker pays them), single-row latency, and label agreement and
+probability deviation on held-out synthetic questionnaires.
+
+Usage:
+    python compact_model.py                          # -> model_compact/
+    python compact_model.py --prune 0.01 -o model_compact --report compact_report.json
+    python compact_model.py --check model_compact    # verify an existing export
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import random_rows, to_frame
+from screening import CONDITIONS, Screener
+from screening.bundle import BundleError, describe_schema, dir_size, load_bundle
+from screening.compact import compact_model, save_compact
+from screening.compiled import CompiledModel
+from screening.core import COMPACT_PATH, ROOT, default_source, load_artifacts
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+from screening.core import load_artifacts
+load_artifacts({source!r})
+ms = (time.perf_counter() - t0) * 1000
+rss = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmRSS:"))
+print(json.dumps({{"ms": ms, "rss_mb": rss / 1024}}))
+"""
+
+
+def cold_load(source, runs):
+    """Median load time (imports included) and resident memory of a fresh interpreter."""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(source=source)], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout))
+    samples.sort(key=lambda r: r["ms"])
+    return samples[len(samples) // 2]
+
+
+def per_row_ms(screener, rows, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        for r in rows:
+            screener.predict_proba(r)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(rows) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the compact float32 model and report the trade-off.")
+    parser.add_argument("--source", help="Original bundle or pickles (default: model_bundle/)")
+    parser.add_argument("-o", "--output", default=COMPACT_PATH, help="Compact bundle directory")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--prune", type=float, default=0.0,
+                        help="Drop support vectors whose dual coefficients are all below this fraction of the max")
+    parser.add_argument("--rows", type=int, default=5000, help="Held-out rows for agreement")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-interpreter load runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--version", help="Bundle version (default: date + content hash)")
+    parser.add_argument("--report", help="Also write the report as JSON")
+    parser.add_argument("--check", metavar="DIR", help="Only verify an existing compact bundle")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        try:
+            _, _, _, manifest = load_bundle(args.check)
+        except BundleError as e:
+            print(f"INVALID: {e}")
+            return 1
+        print(f"OK: compact bundle {manifest['version']} ({manifest['content_hash'][:12]}) "
+              f"from {manifest['source'].get('version')}")
+        return 0
+
+    source = args.source or default_source()
+    model, encoders, cols, manifest = load_artifacts(source, mmap=False)
+    compact, stats = compact_model(CompiledModel(model, cols), args.dtype, args.prune)
+    origin = {"version": (manifest or {}).get("version"), "content_hash": (manifest or {}).get("content_hash")}
+    out_manifest = save_compact(args.output, compact, encoders, cols, describe_schema(model, encoders, cols),
+                                stats, source=origin, version=args.version)
+    print(f"Wrote {args.output}: version {out_manifest['version']}, {args.dtype}, "
+          f"{sum(stats['support_vectors'].values())} -> {stats['unique_support_vectors']} stored support vectors")
+
+    original = Screener(model, encoders, cols)
+    original_fast = Screener(model, encoders, cols, compiled=True)
+    small = Screener.load(args.output)
+
+    holdout = random_rows(args.rows, model, seed=args.seed + 1, correlated_share=0.5)
+    ref = model.predict_proba(to_frame(holdout, cols))
+    got = small.predict_proba(holdout)
+    agreement = {c: float((a.argmax(1) == b.argmax(1)).mean()) for c, a, b in zip(CONDITIONS, ref, got)}
+    max_dev = {c: float(np.abs(a - b).max()) for c, a, b in zip(CONDITIONS, ref, got)}
+    mean_dev = {c: float(np.abs(a - b).mean()) for c, a, b in zip(CONDITIONS, ref, got)}
+
+    singles = [holdout[i:i + 1] for i in range(200)]
+    frames = [to_frame(r, cols) for r in singles[:50]]
+    orig_src = source if isinstance(source, str) else None
+    report = {
+        "size_kib": {"original": dir_size(orig_src) / 1024 if orig_src else None,
+                     "compact": dir_size(args.output) / 1024},
+        "cold_load": {"original": cold_load(source, args.runs), "compact": cold_load(args.output, args.runs)},
+        "per_row_ms": {"original_sklearn": per_row_ms(original, frames),
+                       "original_compiled": per_row_ms(original_fast, singles),
+                       "compact": per_row_ms(small, singles)},
+        "agreement": agreement,
+        "max_prob_deviation": max_dev,
+        "mean_prob_deviation": mean_dev,
+        "compact": stats,
+        "rows": args.rows,
+        "seed": args.seed,
+    }
+
+    size, load, lat = report["size_kib"], report["cold_load"], report["per_row_ms"]
+    print(f"{'':28s} {'original':>12s} {'compact':>12s}")
+    if size["original"] is not None:
+        print(f"{'size on disk (KiB)':28s} {size['original']:12.0f} {size['compact']:12.0f}")
+    print(f"{'cold load incl. imports ms':28s} {load['original']['ms']:12.1f} {load['compact']['ms']:12.1f}")
+    print(f"{'RSS after load (MiB)':28s} {load['original']['rss_mb']:12.1f} {load['compact']['rss_mb']:12.1f}")
+    print(f"{'per-row predict ms':28s} {lat['original_sklearn']:12.3f} {lat['compact']:12.3f}   "
+          f"(original compiled {lat['original_compiled']:.3f})")
+    print(f"held-out agreement vs original ({args.rows} rows):")
+    for c in CONDITIONS:
+        print(f"  {c:12s} labels {agreement[c]:8.4%}   |p diff| max {max_dev[c]:.2e}  mean {mean_dev[c]:.2e}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
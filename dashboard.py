@@ -0,0 +1,94 @@
+import streamlit as st
+import os
+
+import pandas as pd
+import plotly.express as px
+
+from screening import CONDITIONS
+from screening.analytics import DIMENSIONS, summary
+from screening.store import connect
+
+# -----------------------------
+# 1. PAGE CONFIGURATION
+# -----------------------------
+st.set_page_config(page_title="Cohort Risk Dashboard", page_icon="📊", layout="wide")
+
+st.title("📊 Cohort Risk Dashboard")
+st.caption("Aggregated screening results from the assessment store (MH_STORE). "
+           "Counts come from precomputed rollups, so the page stays fast as data grows.")
+
+# -----------------------------
+# 2. DATA (rollup tables only: O(groups) per query)
+# -----------------------------
+path = st.sidebar.text_input("Store database", value=os.environ.get("MH_STORE", "assessments.db"))
+if not os.path.exists(path):
+    st.info(f"No assessment store at `{path}` yet. Run app_v3.py with MH_STORE set to collect assessments.")
+    st.stop()
+
+dimension = st.sidebar.selectbox("Group by", [d for d in DIMENSIONS if d != "all"], format_func=DIMENSIONS.get)
+condition = st.sidebar.selectbox("Condition", CONDITIONS)
+min_n = st.sidebar.number_input("Hide groups smaller than", min_value=1, value=5, step=1,
+                                help="Small groups are hidden to protect individual students.")
+if st.sidebar.button("🔄 Refresh"):
+    st.rerun()
+
+conn = connect(path, readonly=True)
+try:
+    overall = summary(conn, "all")
+    groups = summary(conn, dimension)
+except Exception as e:  # store created without rollups, or not initialised yet
+    st.error(f"Could not read cohort rollups: {e}. Run `python rebuild_rollups.py --db {path}`.")
+    st.stop()
+finally:
+    conn.close()
+
+if not overall:
+    st.info("No assessments stored yet.")
+    st.stop()
+
+# -----------------------------
+# 3. HEADLINE METRICS
+# -----------------------------
+total = overall[0]
+cols = st.columns(2 + len(CONDITIONS))
+cols[0].metric("Assessments", f"{total['n']:,}")
+cols[1].metric("Emergency flags", f"{total['emergency']:,}", f"{total['emergency_rate']:.1%}", delta_color="off")
+for col, c in zip(cols[2:], CONDITIONS):
+    col.metric(f"{c} at risk", f"{total['conditions'][c]['at_risk_rate']:.1%}")
+
+# -----------------------------
+# 4. BREAKDOWN BY GROUP
+# -----------------------------
+shown = [g for g in groups if g["n"] >= min_n]
+hidden = len(groups) - len(shown)
+st.subheader(f"{condition} by {DIMENSIONS[dimension]}")
+if hidden:
+    st.caption(f"{hidden} group(s) with fewer than {min_n} assessments hidden.")
+if not shown:
+    st.stop()
+
+mix = pd.DataFrame([
+    {DIMENSIONS[dimension]: g["group"], "Label": label, "Students": v["n"], "Share": v["n"] / g["n"]}
+    for g in shown for label, v in g["conditions"][condition]["labels"].items()
+])
+fig = px.bar(mix, x=DIMENSIONS[dimension], y="Share", color="Label", hover_data=["Students"],
+             template="plotly_white")
+fig.update_layout(yaxis_tickformat=".0%", barmode="stack")
+st.plotly_chart(fig, width="stretch")
+
+table = pd.DataFrame([
+    {DIMENSIONS[dimension]: g["group"], "Assessments": g["n"], "Emergency flags": g["emergency"],
+     "Emergency rate": g["emergency_rate"],
+     **{f"{c} at risk": g["conditions"][c]["at_risk_rate"] for c in CONDITIONS},
+     **{f"{c} mean confidence": g["conditions"][c]["mean_confidence"] for c in CONDITIONS}}
+    for g in shown
+])
+st.dataframe(
+    table.style.format({"Emergency rate": "{:.1%}", **{f"{c} at risk": "{:.1%}" for c in CONDITIONS},
+                        **{f"{c} mean confidence": "{:.1f}%" for c in CONDITIONS}}),
+    width="stretch", hide_index=True,
+)
+
+st.markdown('<div style="text-align:center; font-size:12px; color:#666; margin-top:40px;">'
+            'Screening results are not diagnoses. Use cohort views for planning support services only.</div>',
+            unsafe_allow_html=True)
@@ -0,0 +1,109 @@
+"""Distill the hybrid ensemble into a fast student model and report its fidelity.
+
+The teacher (the compiled ensemble, identical to ``predict_proba``) labels
+synthetic schema-valid questionnaires (the 26 items x 4 levels and the
+demographic options, half uniform and half answering around a per-student
+level) with its soft probabilities. One multinomial linear student per
+condition is fitted to them (see ``screening.distill``) and saved to
+``model_distilled/``. The report gives label agreement and KL divergence on
+separate held-out rows, and throughput of sklearn, the compiled ensemble
+and the student.
+
+Usage:
+    python distill_model.py
+    python distill_model.py --features quadratic --rows 100000 --report distill_report.json
+    python distill_model.py --check model_distilled
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.synthetic import random_rows, to_frame
+from screening import CONDITIONS, Screener
+from screening.bundle import BundleError, describe_schema, load_bundle
+from screening.distill import DISTILLED_PATH, FEATURES, distill, fidelity, save_distilled
+
+
+def best_of(fn, runs):
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distill the hybrid ensemble into a fast student model.")
+    parser.add_argument("-o", "--output", default=DISTILLED_PATH, help="Distilled bundle directory")
+    parser.add_argument("--features", default="linear", choices=FEATURES,
+                        help="quadratic adds pairwise products of the answers (closer fit, slower to train)")
+    parser.add_argument("--rows", type=int, default=50000, help="Synthetic training rows")
+    parser.add_argument("--holdout", type=int, default=10000, help="Held-out rows for the fidelity report")
+    parser.add_argument("--C", type=float, default=10.0, help="Inverse L2 regularization of the students")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--version", help="Bundle version (default: date + content hash)")
+    parser.add_argument("--report", help="Also write the report as JSON")
+    parser.add_argument("--check", metavar="DIR", help="Only verify an existing distilled bundle")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        try:
+            _, _, _, manifest = load_bundle(args.check)
+        except BundleError as e:
+            print(f"INVALID: {e}")
+            return 1
+        print(f"OK: distilled bundle {manifest['version']} ({manifest['content_hash'][:12]}), "
+              f"teacher {manifest['teacher'].get('version')}")
+        return 0
+
+    screener = Screener.load(compiled=True)
+    model, compiled, cols = screener.model, screener.compiled, screener.feature_columns
+    train = random_rows(args.rows, model, seed=args.seed, correlated_share=0.5)
+    holdout = random_rows(args.holdout, model, seed=args.seed + 1, correlated_share=0.5)
+
+    t0 = time.perf_counter()
+    student = distill(compiled, train, args.features, C=args.C)
+    fit_s = time.perf_counter() - t0
+    scores = fidelity(compiled.predict_proba(holdout), student.predict_proba(holdout))
+
+    batch = holdout[:min(10000, len(holdout))]
+    df = to_frame(batch, cols)
+    singles = [holdout[i:i + 1] for i in range(200)]
+    frames = [to_frame(r, cols) for r in singles[:20]]
+    n = len(batch)
+    speed = {
+        "sklearn": {"rows_per_sec": n / best_of(lambda: model.predict_proba(df), 1),
+                    "single_row_ms": best_of(lambda: [model.predict_proba(f) for f in frames], 3) / 20 * 1000},
+        "compiled": {"rows_per_sec": n / best_of(lambda: compiled.predict_proba(batch), 3),
+                     "single_row_ms": best_of(lambda: [compiled.predict_proba(r) for r in singles], 3) / 200 * 1000},
+        "distilled": {"rows_per_sec": n / best_of(lambda: student.predict_proba(batch), 5),
+                      "single_row_ms": best_of(lambda: [student.predict_proba(r) for r in singles], 5) / 200 * 1000},
+    }
+    report = {"features": args.features, "C": args.C, "rows": args.rows, "holdout": args.holdout,
+              "seed": args.seed, "fit_seconds": fit_s, "fidelity": scores, "speed": speed}
+
+    manifest = screener.manifest or {}
+    teacher = {"version": manifest.get("version"), "content_hash": screener.model_hash}
+    out = save_distilled(args.output, student, screener.encoders, describe_schema(model, screener.encoders, cols),
+                         teacher, report, version=args.version)
+    print(f"Wrote {args.output}: version {out['version']}, {args.features} student fitted on {args.rows} rows "
+          f"in {fit_s:.1f} s")
+
+    print(f"fidelity on {args.holdout} held-out rows:")
+    for c in CONDITIONS:
+        print(f"  {c:12s} agreement {scores[c]['agreement']:8.2%}   KL {scores[c]['kl']:.4f} nats")
+    print(f"{'':12s} {'rows/s (' + str(n) + ')':>16s} {'single row ms':>14s}")
+    for name, r in speed.items():
+        print(f"{name:12s} {r['rows_per_sec']:16,.0f} {r['single_row_ms']:14.3f}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Build the drift monitor's baseline from reference data, or compare a file with it.
+
+The baseline holds the histograms ``screening.drift.DriftMonitor`` keeps
+(answers, profile columns, predicted labels and confidences) for a reference
+set scored by the current model, together with the model hash. Build it from
+the data the model was trained on (a CSV/Excel file with the
+``feature_columns.pkl`` headers, as for ``batch_score.py``, whose rows with
+invalid answers are skipped), or from the
+assessments collected in a store. ``--compare`` scores another file and
+prints its drift report against a saved baseline.
+
+Usage:
+    python drift_baseline.py --csv training_data.csv            # -> drift_baseline.json
+    python drift_baseline.py --store assessments.db -o drift_baseline.json
+    python drift_baseline.py --compare new_intake.csv --show 15
+"""
+import argparse
+import sys
+
+from batch_score import clean_chunk, read_chunks
+from screening import Screener, build_input_row
+from screening.drift import BASELINE_PATH, PSI_MODERATE, PSI_SHIFT, DriftMonitor, save_baseline
+
+
+def feed_file(screener, path, chunk_size=2000):
+    for chunk in read_chunks(path, chunk_size):
+        X, errors = clean_chunk(chunk, screener.feature_columns)
+        X = X[(errors == "").to_numpy()]  # rows batch_score.py would not score either
+        if not X.empty:
+            screener.predict_many(X.astype({c: int for c in screener.feature_columns[7:]}))
+
+
+def feed_store(screener, path, chunk_size=2000):
+    from screening.store import ANSWER_COLUMNS, PROFILE_KEYS, TABLE, connect
+
+    conn = connect(path, readonly=True)
+    try:
+        cur = conn.execute(f"SELECT {', '.join(PROFILE_KEYS + ANSWER_COLUMNS)} FROM {TABLE}")
+        while True:
+            batch = cur.fetchmany(chunk_size)
+            if not batch:
+                break
+            rows = [build_input_row(screener.feature_columns, {k: r[k] for k in PROFILE_KEYS},
+                                    [r[q] for q in ANSWER_COLUMNS]) for r in batch]
+            screener.predict_many(rows)
+    finally:
+        conn.close()
+
+
+def print_report(report, show):
+    print(f"drift status: {report['status']} ({report['n']} rows vs baseline of {report['baseline_n']})")
+    print("worst PSI per group: " + ", ".join(f"{g} {v:.3f}" for g, v in report["groups"].items()))
+    print(f"{'feature':22s} {'group':10s} {'PSI':>8s} {'KL':>8s}  status")
+    for f in report["features"][:show]:
+        print(f"{f['feature']:22s} {f['group']:10s} {f['psi']:8.4f} {f['kl']:8.4f}  {f['status']}")
+    print(f"(PSI < {PSI_MODERATE} stable, {PSI_MODERATE}-{PSI_SHIFT} moderate, >= {PSI_SHIFT} shift)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or compare against the drift monitor baseline.")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv", help="Reference data (CSV/Excel with feature_columns headers)")
+    src.add_argument("--store", help="Reference data from an assessment store database")
+    src.add_argument("--compare", metavar="FILE", help="Report the drift of FILE against --baseline")
+    parser.add_argument("-o", "--output", default=BASELINE_PATH, help="Baseline file to write")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file for --compare")
+    parser.add_argument("--show", type=int, default=10, help="Features to print for --compare")
+    args = parser.parse_args(argv)
+
+    screener = Screener.load(compiled=True)
+    # An endless window: the whole input is counted as one window
+    try:
+        if args.compare:
+            monitor = screener.enable_drift_monitor(args.baseline, window=float("inf"))
+            feed_file(screener, args.compare)
+            print_report(monitor.report("total"), args.show)
+            return 0
+
+        monitor = screener.drift = DriftMonitor.for_screener(screener, window=float("inf"))
+        if args.csv:
+            feed_file(screener, args.csv)
+        else:
+            feed_store(screener, args.store)
+    except ValueError as e:
+        print(f"error: {args.compare or args.csv}: {e}")
+        return 1
+    snapshot = monitor.snapshot("total")
+    if not snapshot["n"]:
+        print("no reference rows; baseline not written")
+        return 1
+    manifest = screener.manifest or {}
+    # A compact export records the hash of the bundle it came from; both load the same baseline
+    model_hash = manifest.get("source", {}).get("content_hash") or manifest.get("content_hash")
+    save_baseline(args.output, snapshot, model_hash, source=args.csv or args.store)
+    print(f"Wrote {args.output}: {snapshot['n']} reference rows, {len(snapshot['features'])} features, "
+          f"model {(manifest.get('version') or 'pickles')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Recompute the cohort rollups of an assessment store from its raw rows.
+
+The rollups (see ``screening.analytics``) are normally kept up to date by
+the store's writer. This rebuilds them from scratch with ``GROUP BY``
+queries, under the write lock, and verifies the result; ``--verify`` only
+compares the stored rollups with a recomputation and exits 1 on any
+difference. Safe to run while the apps are writing.
+
+Usage:
+    python rebuild_rollups.py --db assessments.db
+    python rebuild_rollups.py --db assessments.db --verify
+"""
+import argparse
+import os
+import sys
+import time
+
+from screening.analytics import ROLLUP_SCHEMA, rebuild, verify
+from screening.store import SCHEMA, connect
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute and verify the cohort rollups of an assessment store.")
+    parser.add_argument("--db", default=os.environ.get("MH_STORE"), help="Store database (default: $MH_STORE)")
+    parser.add_argument("--verify", action="store_true", help="Only compare the stored rollups with the raw rows")
+    parser.add_argument("--show", type=int, default=20, help="Differences to print")
+    args = parser.parse_args(argv)
+    if not args.db or not os.path.exists(args.db):
+        parser.error(f"no store database at {args.db!r}; pass --db or set MH_STORE")
+
+    conn = connect(args.db)
+    try:
+        if args.verify and not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_groups'").fetchone():
+            print("INCONSISTENT: the store has no rollup tables; run without --verify to build them")
+            return 1
+        if not args.verify:
+            conn.executescript(SCHEMA + ROLLUP_SCHEMA)
+            t0 = time.perf_counter()
+            groups, labels = rebuild(conn)
+            print(f"rebuilt {groups} group and {labels} label rollups in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        t0 = time.perf_counter()
+        problems = verify(conn)
+        ms = (time.perf_counter() - t0) * 1000
+    finally:
+        conn.close()
+
+    if problems:
+        print(f"INCONSISTENT: {len(problems)} rollups differ from the raw rows ({ms:.1f} ms)")
+        for p in problems[:args.show]:
+            print(f"  {p}")
+        return 1
+    print(f"OK: rollups match the raw rows ({ms:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
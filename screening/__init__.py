@@ -0,0 +1,49 @@
+"""Student mental health screening: inference core without Streamlit.
+
+Names are resolved lazily so ``import screening`` does not pull in numpy,
+pandas or sklearn until something is actually scored.
+"""
+
+_EXPORTS = {
+    "Screener": "core",
+    "ConditionResult": "core",
+    "ArtifactError": "core",
+    "Attributions": "attribution",
+    "Attributor": "attribution",
+    "AssessmentStore": "store",
+    "BundleError": "bundle",
+    "CascadeModel": "cascade",
+    "DriftMonitor": "drift",
+    "LabelTables": "labels",
+    "MicroBatcher": "batching",
+    "ModelProfiler": "profiling",
+    "PredictionCache": "cache",
+    "ScoringPool": "pool",
+    "ScoringTimeout": "pool",
+    "WhatIf": "sensitivity",
+    "CONDITIONS": "core",
+    "build_input_row": "core",
+    "extract_number": "core",
+    "feature_aliases": "core",
+    "is_emergency": "core",
+    "is_low_risk_label": "core",
+    "load_artifacts": "core",
+    "load_bundle": "bundle",
+    "load_resources": "core",
+    "severity_bucket": "core",
+    "top_features": "attribution",
+    "what_if": "sensitivity",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'screening' has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,190 @@
+"""Cohort rollups over the assessment store, maintained incrementally.
+
+For every dimension (``DIMENSIONS``: all assessments, department, academic
+year, university and CGPA band) and group, ``rollup_groups`` holds the number
+of assessments and emergency flags, and ``rollup_labels`` the count and
+confidence sum per condition and label. ``AssessmentStore`` updates both in
+the same transaction as each batch of inserts, so the rollups always match
+the committed raw rows. Dashboard queries (``summary``) read only these
+tables and cost O(groups), not O(rows).
+
+``compute`` recomputes the rollups from the raw rows with plain SQL
+``GROUP BY`` queries, independently of the incremental code path;
+``verify`` compares the two and ``rebuild`` replaces the stored rollups
+(see ``rebuild_rollups.py``).
+"""
+from collections import defaultdict
+
+from .core import CONDITIONS, is_low_risk_label
+from .store import COLUMNS, TABLE
+
+DIMENSIONS = {"all": "All assessments", "dept": "Department", "year": "Academic Year",
+              "uni": "University", "cgpa_band": "CGPA band"}
+CGPA_BANDS = [(2.5, "< 2.50"), (3.0, "2.50-2.99"), (3.5, "3.00-3.49"), (None, "3.50-4.00")]
+UNKNOWN = "unknown"
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_groups (
+    dimension TEXT NOT NULL, grp TEXT NOT NULL, n INTEGER NOT NULL, emergency INTEGER NOT NULL,
+    PRIMARY KEY (dimension, grp)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_labels (
+    dimension TEXT NOT NULL, grp TEXT NOT NULL, condition TEXT NOT NULL, label TEXT NOT NULL,
+    n INTEGER NOT NULL, conf_sum REAL NOT NULL,
+    PRIMARY KEY (dimension, grp, condition, label)
+) WITHOUT ROWID;
+"""
+UPSERT_GROUP = ("INSERT INTO rollup_groups VALUES (?, ?, ?, ?) ON CONFLICT (dimension, grp) "
+                "DO UPDATE SET n = n + excluded.n, emergency = emergency + excluded.emergency")
+UPSERT_LABEL = ("INSERT INTO rollup_labels VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (dimension, grp, condition, label) "
+                "DO UPDATE SET n = n + excluded.n, conf_sum = conf_sum + excluded.conf_sum")
+
+_POS = {c: i for i, c in enumerate(COLUMNS)}
+_RESULT_POS = [(c, _POS[f"{c.lower()}_label"], _POS[f"{c.lower()}_confidence"]) for c in CONDITIONS]
+
+
+def cgpa_band(cgpa):
+    if cgpa is None:
+        return UNKNOWN
+    for upper, name in CGPA_BANDS:
+        if upper is None or cgpa < upper:
+            return name
+
+
+def _group_sql(dimension):
+    """SQL expression for a row's group, matching ``group_keys``."""
+    if dimension == "all":
+        return "'all'"
+    if dimension == "cgpa_band":
+        cases = " ".join(f"WHEN cgpa < {upper} THEN '{name}'" for upper, name in CGPA_BANDS if upper is not None)
+        return f"CASE WHEN cgpa IS NULL THEN '{UNKNOWN}' {cases} ELSE '{CGPA_BANDS[-1][1]}' END"
+    return f"COALESCE({dimension}, '{UNKNOWN}')"
+
+
+def group_keys(row):
+    """``(dimension, group)`` pairs of one ``assessments`` row tuple."""
+    keys = [("all", "all")]
+    for dim in ("dept", "year", "uni"):
+        value = row[_POS[dim]]
+        keys.append((dim, UNKNOWN if value is None else value))
+    keys.append(("cgpa_band", cgpa_band(row[_POS["cgpa"]])))
+    return keys
+
+
+# -----------------------------
+# INCREMENTAL UPDATE
+# -----------------------------
+def ensure_rollups(conn):
+    """Create the rollup tables; fill them from the raw rows if they are new and rows exist."""
+    conn.executescript(ROLLUP_SCHEMA)
+    empty = conn.execute("SELECT COUNT(*) FROM rollup_groups").fetchone()[0] == 0
+    if empty and conn.execute(f"SELECT EXISTS (SELECT 1 FROM {TABLE})").fetchone()[0]:
+        rebuild(conn)
+
+
+def update_rollups(conn, rows):
+    """Add a batch of inserted rows to the rollups; call inside the insert transaction."""
+    groups = defaultdict(lambda: [0, 0])
+    labels = defaultdict(lambda: [0, 0.0])
+    emergency = _POS["emergency"]
+    for row in rows:
+        results = [(c, row[li], row[ci]) for c, li, ci in _RESULT_POS]
+        for key in group_keys(row):
+            g = groups[key]
+            g[0] += 1
+            g[1] += row[emergency]
+            for c, label, conf in results:
+                entry = labels[key + (c, label)]
+                entry[0] += 1
+                entry[1] += conf
+    conn.executemany(UPSERT_GROUP, [k + tuple(v) for k, v in groups.items()])
+    conn.executemany(UPSERT_LABEL, [k + tuple(v) for k, v in labels.items()])
+
+
+# -----------------------------
+# QUERIES
+# -----------------------------
+def summary(conn, dimension="dept"):
+    """Per group of ``dimension``: counts, emergency rate and per-condition label mix. O(groups)."""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"unknown dimension {dimension!r}; expected one of {list(DIMENSIONS)}")
+    out = {}
+    for grp, n, emergency in conn.execute(
+            "SELECT grp, n, emergency FROM rollup_groups WHERE dimension = ? ORDER BY grp", (dimension,)):
+        out[grp] = {"group": grp, "n": n, "emergency": emergency, "emergency_rate": emergency / n if n else 0.0,
+                    "conditions": {c: {"labels": {}, "at_risk": 0, "conf_sum": 0.0} for c in CONDITIONS}}
+    for grp, condition, label, n, conf_sum in conn.execute(
+            "SELECT grp, condition, label, n, conf_sum FROM rollup_labels WHERE dimension = ?", (dimension,)):
+        c = out[grp]["conditions"][condition]
+        c["labels"][label] = {"n": n, "mean_confidence": conf_sum / n if n else 0.0}
+        c["conf_sum"] += conf_sum
+        if not is_low_risk_label(label):
+            c["at_risk"] += n
+    for g in out.values():
+        for c in g["conditions"].values():
+            c["at_risk_rate"] = c["at_risk"] / g["n"] if g["n"] else 0.0
+            c["mean_confidence"] = c.pop("conf_sum") / g["n"] if g["n"] else 0.0
+    if dimension == "cgpa_band":  # band order, not alphabetical
+        order = [name for _, name in CGPA_BANDS] + [UNKNOWN]
+        return sorted(out.values(), key=lambda g: order.index(g["group"]))
+    return list(out.values())
+
+
+# -----------------------------
+# REBUILD / VERIFY
+# -----------------------------
+def stored(conn):
+    groups = {(d, g): (n, e) for d, g, n, e in conn.execute("SELECT * FROM rollup_groups")}
+    labels = {(d, g, c, l): (n, s) for d, g, c, l, n, s in conn.execute("SELECT * FROM rollup_labels")}
+    return groups, labels
+
+
+def compute(conn):
+    """Rollups recomputed from the raw rows (O(rows)), as ``stored`` returns them."""
+    groups, labels = {}, {}
+    for dim in DIMENSIONS:
+        expr = _group_sql(dim)
+        for g, n, e in conn.execute(f"SELECT {expr}, COUNT(*), SUM(emergency) FROM {TABLE} GROUP BY 1"):
+            groups[(dim, g)] = (n, e)
+        for c in CONDITIONS:
+            col = c.lower()
+            for g, l, n, s in conn.execute(f"SELECT {expr}, {col}_label, COUNT(*), SUM({col}_confidence) "
+                                           f"FROM {TABLE} GROUP BY 1, 2"):
+                labels[(dim, g, c, l)] = (n, s)
+    return groups, labels
+
+
+def verify(conn, rel_tol=1e-9):
+    """Differences between the stored rollups and a recomputation; empty when consistent."""
+    conn.execute("BEGIN")  # one snapshot for both reads
+    try:
+        fresh, current = compute(conn), stored(conn)
+    finally:
+        conn.execute("COMMIT")
+    problems = []
+    for name, a, b in (("group", fresh[0], current[0]), ("label", fresh[1], current[1])):
+        for key in sorted(set(a) | set(b), key=str):
+            x, y = a.get(key), b.get(key)
+            if x is None or y is None or x[0] != y[0] or abs(x[1] - y[1]) > rel_tol * max(1.0, abs(x[1])):
+                problems.append(f"{name} {'/'.join(map(str, key))}: raw {x}, rollup {y}")
+    return problems
+
+
+def rebuild(conn):
+    """Replace the stored rollups with a recomputation from the raw rows, atomically."""
+    own = not conn.in_transaction
+    if own:
+        conn.execute("BEGIN IMMEDIATE")  # holds the write lock: the batching writer waits
+    try:
+        groups, labels = compute(conn)
+        conn.execute("DELETE FROM rollup_groups")
+        conn.execute("DELETE FROM rollup_labels")
+        conn.executemany("INSERT INTO rollup_groups VALUES (?, ?, ?, ?)", [k + v for k, v in groups.items()])
+        conn.executemany("INSERT INTO rollup_labels VALUES (?, ?, ?, ?, ?, ?)", [k + v for k, v in labels.items()])
+        if own:
+            conn.execute("COMMIT")
+    except BaseException:
+        if own:
+            conn.execute("ROLLBACK")
+        raise
+    return len(groups), len(labels)
@@ -0,0 +1,341 @@
+"""Per-feature attributions of the predicted labels, batched and cached.
+
+For every condition ``Attributor.explain`` splits the probability of the
+predicted label into one contribution per raw feature column (the 33
+``feature_columns``), relative to a background: by default a single
+reference student built from the model itself (the scaler's training means
+and the imputer's most frequent categories), or up to ``n_background``
+rows sampled from data passed in. Contributions are in probability units
+and add up to the predicted probability minus the background's expected
+probability. Soft voting averages the members' probabilities, so the
+ensemble's attribution is the voting-weighted average of the members':
+
+* LogisticRegression members are explained exactly, in closed form. On
+  the line from a background row to the student's row the class log-odds
+  are linear, and feature ``j`` moves the log-odds of class ``k`` by
+  ``sum(coef[k, cols(j)] * (z - z_bg)[cols(j)])``, where ``cols(j)`` are
+  the scaled numeric column or the one-hot columns of raw column ``j``.
+  These exact contributions to the predicted class's (centred) log-odds are
+  returned as ``Attributions.linear``. In ``values`` they are turned into
+  probability: each class's contributions are weighted by the softmax
+  sensitivity ``d p_c / d logit_k`` integrated along that line (a 1-D
+  Gauss-Legendre integral of a smooth function, so the result adds up to
+  the member's probability change to ~1e-12).
+* SVC members are explained by sampled permutations (Shapley value
+  sampling): ``n_samples`` walks per row, in antithetic pairs, each
+  switching the features from a background row to the student's one at a
+  time. All walks of a chunk of rows go through one shared-kernel
+  evaluation for the three conditions. A row's walks are seeded from its
+  canonical key, so its attribution does not depend on the batch it came
+  in, and results are kept in an LRU ``PredictionCache``.
+
+Attributions always explain the full ensemble, also for a screener with
+the cascade enabled. The compiled model is used (compiled on first use if
+the screener scores with the sklearn pipeline).
+"""
+import zlib
+from typing import NamedTuple
+
+import numpy as np
+
+from .cache import PredictionCache, canonical_key
+from .core import CONDITIONS, build_input_row
+
+MAX_HYBRID_ROWS = 2048  # rows per SVC kernel evaluation (n_samples * 33 per student)
+PATH_NODES = 32  # Gauss-Legendre nodes for the LR log-odds -> probability path integral
+
+
+class Attributions(NamedTuple):
+    condition: str
+    index: np.ndarray        # (n,) predicted class per row
+    probability: np.ndarray  # (n,) its ensemble probability
+    base: np.ndarray         # (n,) its expected probability over the background
+    values: np.ndarray       # (n, 33) contributions, probability units; rows sum to probability - base
+    linear: np.ndarray       # (n, 33) exact LR log-odds contributions (weighted mean if several LR members)
+
+
+def top_features(attributions, row=0, k=5):
+    """[(feature index, contribution)] of one row, largest absolute contribution first."""
+    v = attributions.values[row]
+    order = np.argsort(-np.abs(v), kind="stable")[:k]
+    return [(int(j), float(v[j])) for j in order if v[j] != 0.0]
+
+
+def _softmax(d):
+    d = d - d.max(axis=-1, keepdims=True)
+    e = np.exp(d)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _softmax_parameters(m):
+    """(d, k) coefficients and (k,) intercepts of a compiled LR as a softmax, centred over classes.
+
+    A binary LR's sigmoid is the softmax of ``(-logit / 2, logit / 2)``.
+    """
+    if m.n_classes == 2:
+        return np.column_stack([-m.coef[:, 0], m.coef[:, 0]]) / 2.0, np.array([-m.intercept[0], m.intercept[0]]) / 2.0
+    return m.coef - m.coef.mean(axis=1, keepdims=True), m.intercept - m.intercept.mean()
+
+
+def _group_sum(per_column, group):
+    """(..., d, k) per model input column -> (..., k, 33) per raw feature column."""
+    return np.swapaxes(per_column, -1, -2) @ group
+
+
+class _Tables:
+    """Everything an ``Attributor`` derives from one model, built once and replaced as a whole after a reload."""
+
+    def __init__(self, model, compiled, Z_bg, cache_size):
+        from .compiled import CompiledLogistic, CompiledSVC
+
+        self.model = model
+        self.compiled = compiled
+        pre = compiled.pre
+        n_num = len(pre.num_keep)
+        # Raw feature column of every model input column (numeric block first, then one-hot)
+        owner = np.empty(pre.n_out, dtype=np.int64)
+        owner[:n_num] = pre.num_idx[pre.num_keep]
+        for col, table in zip(pre.cat_idx, pre.cat_tables):
+            owner[[n_num + pos for pos in table.values()]] = col
+        self.n_features = len(compiled.feature_columns)
+        self.owner = owner
+        self.group = np.zeros((pre.n_out, self.n_features))
+        self.group[np.arange(pre.n_out), owner] = 1.0
+        self.features = np.unique(owner)  # raw columns the model reads (CGPA is dropped by the imputer)
+
+        self.Z_bg = Z_bg
+        self.outputs = []
+        for out in compiled.outputs:
+            w = np.ones(len(out.members)) if out.weights is None else out.weights
+            w = w / w.sum()
+            lr = []
+            for wi, m in zip(w, out.members):
+                if isinstance(m, CompiledLogistic):
+                    W, b = _softmax_parameters(m)
+                    lr.append((wi, W, b, _softmax(Z_bg @ W + b)))
+            svc = [(wi, m) for wi, m in zip(w, out.members) if isinstance(m, CompiledSVC)]
+            self.outputs.append((lr, svc))
+        # Per model, so a result computed from the old tables can never land in the new cache
+        self.cache = PredictionCache(cache_size) if cache_size else None
+
+
+class Attributor:
+    """Exact LR and sampled SVC attributions for a screener's voting ensembles.
+
+    ``background`` is rows in any form ``Screener.predict_proba`` accepts;
+    at most ``n_background`` of them are kept (sampled with ``seed``).
+    ``n_samples`` (even) is the number of permutation walks per row.
+    One Attributor may serve many threads: the tables built from the model
+    are swapped in with one assignment after a reload, and every ``explain``
+    call works on the tables it started with.
+    """
+
+    def __init__(self, screener, background=None, n_background=8, n_samples=16, cache_size=4096, seed=0):
+        if n_samples < 2 or n_samples % 2:
+            raise ValueError("n_samples must be an even number >= 2")
+        self.screener = screener
+        self.n_samples = n_samples
+        self.seed = seed
+        self._cache_size = cache_size
+        self._background = background
+        self._n_background = n_background
+        x, wt = np.polynomial.legendre.leggauss(PATH_NODES)
+        self._nodes = ((x + 1.0) / 2.0, wt / 2.0)
+        self._tables = None
+        self._refresh()
+
+    @property
+    def compiled(self):
+        return self._tables.compiled
+
+    @property
+    def cache(self):
+        return self._tables.cache
+
+    @property
+    def Z_bg(self):
+        return self._tables.Z_bg
+
+    @property
+    def features(self):
+        return self._tables.features
+
+    @property
+    def owner(self):
+        return self._tables.owner
+
+    # -----------------------------
+    # SETUP
+    # -----------------------------
+    def _refresh(self):
+        """The tables for the screener's current model, rebuilt (with an empty cache) after a reload."""
+        from .compiled import CompiledModel
+
+        s = self.screener
+        tables, model = self._tables, s.model
+        if tables is not None and tables.model is model:
+            return tables
+        compiled = s.compiled or CompiledModel(model, s.feature_columns)
+        tables = _Tables(model, compiled, self._background_inputs(compiled), self._cache_size)
+        self._tables = tables
+        return tables
+
+    def _background_inputs(self, compiled):
+        """Model inputs of the background rows, or of the reference student."""
+        pre = compiled.pre
+        if self._background is None:
+            z = np.zeros((1, pre.n_out))  # scaled training mean = 0
+            n_num = len(pre.num_keep)
+            for fill, table in zip(pre.cat_fill, pre.cat_tables):
+                pos = table.get(fill)
+                if pos is not None:
+                    z[0, n_num + pos] = 1.0
+            return z
+        rows = self.screener._raw_rows(self._background, compiled)
+        if len(rows) > self._n_background:
+            rng = np.random.default_rng(self.seed)
+            rows = rows[np.sort(rng.choice(len(rows), self._n_background, replace=False))]
+        return compiled.transform(rows)
+
+    # -----------------------------
+    # EXPLAIN
+    # -----------------------------
+    def explain(self, rows):
+        """One ``Attributions`` per condition for a batch of rows (dicts, DataFrame or raw array)."""
+        t = self._refresh()
+        raw = self.screener._raw_rows(rows, t.compiled)
+        Z = t.compiled.transform(raw)
+        svc = self._svc_cached(t, raw, Z)  # per condition: (p(x), base, phi), each (n, [33,] k)
+        n = len(Z)
+        rows_n = np.arange(n)
+        dz = Z[:, None, :] - t.Z_bg[None, :, :]  # (n, B, d)
+
+        results = []
+        for (lr, svc_members), (p_svc, base_svc, phi_svc), condition in zip(t.outputs, svc, CONDITIONS):
+            proba, base, members = 0.0, 0.0, []
+            for w, W, b, p_bg in lr:
+                p = _softmax(Z @ W + b)
+                proba, base = proba + w * p, base + w * p_bg.mean(axis=0)
+                members.append((w, W, b))
+            if svc_members:
+                proba, base = proba + p_svc, base + base_svc
+            index = proba.argmax(axis=1)
+            lr_weight = sum(w for w, _, _ in members)
+
+            values = np.zeros((n, t.n_features))
+            linear = np.zeros((n, t.n_features))
+            for w, W, b in members:
+                A = _group_sum(dz[..., None] * W, t.group)  # (n, B, k, 33) exact log-odds contributions
+                linear += w / lr_weight * A[rows_n, :, index].mean(axis=1)
+                values += w * np.einsum("nbk,nbkf->nf", self._path_sensitivity(t, W, b, dz, index), A) / len(t.Z_bg)
+            if svc_members:
+                values += phi_svc[rows_n, :, index]
+            results.append(Attributions(condition, index, proba[rows_n, index], base[rows_n, index], values, linear))
+        return results
+
+    def _path_sensitivity(self, tables, W, b, dz, index):
+        """(n, B, k): integral over t in [0, 1] of d p_c / d logit_k on the line from each background row to x.
+
+        The logits are linear in t, so p_c(x) - p_c(bg) = sum_k integral * (logit_k(x) - logit_k(bg)),
+        and weighting each class's exact log-odds contributions by it gives probability contributions
+        that add up to the change (Gauss-Legendre quadrature on the smooth softmax).
+        """
+        t, wt = self._nodes
+        d0 = tables.Z_bg @ W + b                                          # (B, k)
+        dd = dz @ W                                                     # (n, B, k)
+        P = _softmax(d0[None, :, None, :] + t[:, None] * dd[:, :, None, :])  # (n, B, Q, k)
+        pc = np.take_along_axis(P, index[:, None, None, None], axis=3)  # (n, B, Q, 1)
+        onehot = np.eye(P.shape[-1])[index][:, None, None, :]
+        return np.einsum("q,nbqk->nbk", wt, pc * (onehot - P))
+
+    def explain_one(self, profile, answers):
+        """``explain`` for one student's profile and 0-3 answers (row 0 of each result)."""
+        return self.explain([build_input_row(self.screener.feature_columns, profile, answers)])
+
+    # -----------------------------
+    # SVC: SAMPLED PERMUTATIONS
+    # -----------------------------
+    def _svc_cached(self, t, raw, Z):
+        """Per condition (voting-weighted SVC probability, base, contributions) for every row."""
+        n = len(Z)
+        keys = [canonical_key(r) for r in raw.tolist()]
+        found = [t.cache.get(key) if t.cache is not None else None for key in keys]
+        missing = [i for i, f in enumerate(found) if f is None]
+        step = max(1, MAX_HYBRID_ROWS // (self.n_samples * (len(t.features) + 1)))
+        for start in range(0, len(missing), step):
+            idx = missing[start:start + step]
+            fresh = self._svc_walks(t, Z[idx], [keys[i] for i in idx])
+            for r, i in enumerate(idx):
+                found[i] = [(p[r], b[r], phi[r]) for p, b, phi in fresh]
+                if t.cache is not None:
+                    t.cache.put(keys[i], found[i])
+        out = []
+        for c in range(len(t.outputs)):
+            if not t.outputs[c][1]:
+                out.append((None, None, None))
+                continue
+            out.append(tuple(np.stack([f[c][part] for f in found]) if n else None for part in range(3)))
+        return out
+
+    def _svc_walks(self, t, Z, keys):
+        """Permutation walks for a chunk of rows; per condition (p(x), base, phi) arrays."""
+        n, S, feats = len(Z), self.n_samples, t.features
+        F = len(feats)
+        n_bg = len(t.Z_bg)
+        # Position of each feature in each walk; antithetic pairs walk the reversed order
+        pos = np.empty((n, S, F), dtype=np.int64)
+        bg = np.empty((n, S), dtype=np.int64)
+        for r, key in enumerate(keys):
+            rng = np.random.default_rng([self.seed, zlib.crc32(repr(key).encode())])
+            order = rng.permuted(np.tile(np.arange(F), (S // 2, 1)), axis=1)
+            ranks = np.argsort(order, axis=1)
+            pos[r, 0::2] = ranks
+            pos[r, 1::2] = F - 1 - ranks
+            pair_bg = (np.arange(S // 2) + rng.integers(n_bg)) % n_bg
+            bg[r] = np.repeat(pair_bg, 2)
+        kernels = {k: self._walk_kernel(t, k, Z, bg, pos) for k in t.compiled.kernels}
+        H = None
+        if any(m.shared not in kernels for _, svc in t.outputs for _, m in svc):
+            column = np.searchsorted(feats, t.owner)  # feature slot of every model input column
+            start = t.Z_bg[bg]                         # (n, S, d)
+            switched = pos[:, :, column][:, :, None, :] < np.arange(F + 1)[:, None]
+            H = (start[:, :, None, :] + (Z[:, None, :] - start)[:, :, None, :] * switched).reshape(-1, Z.shape[1])
+        fresh = []
+        for _, svc in t.outputs:
+            if not svc:
+                fresh.append((None, None, None))
+                continue
+            P = sum(w * (m.predict_proba(None, kernels[m.shared]) if m.shared in kernels else m.predict_proba(H))
+                    for w, m in svc)
+            P = P.reshape(n, S, F + 1, -1)
+            diffs = np.diff(P, axis=2)                                        # (n, S, F, k)
+            per_feature = np.take_along_axis(diffs, pos[..., None], axis=2)   # by feature slot
+            phi = np.zeros((n, t.n_features, P.shape[-1]))
+            phi[:, feats] = per_feature.mean(axis=1)
+            fresh.append((P[:, 0, -1], P[:, :, 0].mean(axis=1), phi))
+        return fresh
+
+    def _walk_kernel(self, t, kernel, Z, bg, pos):
+        """RBF kernel of every walk step against ``kernel``'s support vectors, (n * S * (F+1), n_SV).
+
+        Switching feature ``j`` from background row ``b`` to ``x`` changes the squared distance to
+        support vector ``v`` by ``sum over cols(j) of (x - v)**2 - (b - v)**2``, whatever the walk
+        order. Those (row, background, feature) increments cost one small matmul; each walk's
+        distances are then a cumulative sum in its own order, instead of a distance matmul per step.
+        """
+        sv = kernel.support_vectors.astype(np.float64, copy=False)
+        group = t.group[:, t.features]
+        bg_sq = (np.einsum("bd,bd->b", t.Z_bg, t.Z_bg)[:, None] + kernel.sv_sq[None, :]
+                 - 2.0 * (t.Z_bg @ sv.T))                                               # (B, n_SV)
+        dz = Z[:, None, :] - t.Z_bg[None, :, :]                                          # (n, B, d)
+        norms = (Z * Z)[:, None, :] - (t.Z_bg * t.Z_bg)[None, :, :]
+        step = (norms @ group)[..., None] - 2.0 * (np.swapaxes(dz[..., None] * group, -1, -2) @ sv.T)  # (n, B, F, n_SV)
+        n, S, F = pos.shape
+        order = np.argsort(pos, axis=2)                                                 # feature slot at each step
+        rows = np.arange(n)[:, None, None]
+        sq = np.empty((n, S, F + 1, len(sv)))
+        sq[:, :, 0] = bg_sq[bg]
+        np.cumsum(step[rows, bg[:, :, None], order], axis=2, out=sq[:, :, 1:])
+        sq[:, :, 1:] += sq[:, :, :1]
+        np.maximum(sq, 0.0, out=sq)
+        return np.exp(-kernel.gamma * sq).reshape(-1, len(sv))
@@ -0,0 +1,146 @@
+"""Process-wide micro-batching of single-row predictions.
+
+Concurrent sessions that submit at the same time are coalesced into one
+batched model call: the worker waits at most ``max_wait_ms`` after the first
+pending request (or until ``max_batch_size`` rows are queued), scores them
+together and hands each caller its own result. When nothing else is queued
+or running, a request is scored directly in the caller's thread, so an idle
+server pays no queueing delay.
+"""
+import math
+import threading
+import time
+from collections import Counter, deque
+
+
+class _Request:
+    __slots__ = ("row", "enqueued", "event", "result", "error")
+
+    def __init__(self, row):
+        self.row = row
+        self.enqueued = time.monotonic()
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _check_count(results, n):
+    if len(results) != n:
+        raise RuntimeError(f"predict_fn returned {len(results)} results for {n} rows")
+    return results
+
+
+class MicroBatcher:
+    """Coalesce ``submit(row)`` calls into ``predict_fn(rows)`` batches.
+
+    ``predict_fn`` takes a list of rows and returns a list of results in the
+    same order (e.g. ``lambda rows: screener.decode(screener.predict_proba(rows))``).
+    A batch that comes back with a different number of results fails every
+    request in it.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0, delay_window=2048):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._busy = 0
+        self._worker = None
+        # Metrics
+        self.direct_calls = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.batch_sizes = Counter()
+        self.queue_delays = deque(maxlen=delay_window)  # seconds, most recent requests
+
+    def submit(self, row, timeout=None):
+        """Score one row; blocks until its batch is done. Raises TimeoutError after ``timeout`` s."""
+        with self._cond:
+            direct = self._busy == 0 and not self._queue
+            if direct:
+                self._busy += 1
+                self.direct_calls += 1
+            else:
+                req = _Request(row)
+                self._queue.append(req)
+                self._ensure_worker()
+                self._cond.notify()
+
+        if direct:
+            try:
+                return _check_count(self.predict_fn([row]), 1)[0]
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    if self._queue:
+                        self._cond.notify()
+
+        if not req.event.wait(timeout):
+            with self._cond:
+                if req in self._queue:  # not picked up yet: drop it instead of scoring it for nobody
+                    self._queue.remove(req)
+            raise TimeoutError(f"prediction not completed within {timeout} s")
+        if req.error is not None:
+            raise req.error
+        return req.result
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._worker.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0].enqueued + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            n = min(len(self._queue), self.max_batch_size)
+            batch = [self._queue.popleft() for _ in range(n)]
+            self._busy += 1
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.monotonic()
+            try:
+                results = _check_count(self.predict_fn([r.row for r in batch]), len(batch))
+                for req, res in zip(batch, results):
+                    req.result = res
+            except Exception as exc:
+                for req in batch:
+                    req.error = exc
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self.batches += 1
+                    self.batched_rows += len(batch)
+                    self.batch_sizes[len(batch)] += 1
+                    self.queue_delays.extend(started - r.enqueued for r in batch)
+                for req in batch:
+                    req.event.set()
+
+    def stats(self):
+        with self._cond:
+            delays = sorted(self.queue_delays)
+            sizes = dict(sorted(self.batch_sizes.items()))
+
+        def pct(q):
+            return delays[max(0, math.ceil(q * len(delays)) - 1)] * 1000 if delays else 0.0  # nearest rank
+
+        return {
+            "direct_calls": self.direct_calls,
+            "batches": self.batches,
+            "batched_rows": self.batched_rows,
+            "mean_batch_size": self.batched_rows / self.batches if self.batches else 0.0,
+            "batch_size_hist": sizes,
+            "queue_delay_ms": {"p50": pct(0.50), "p95": pct(0.95), "max": pct(1.0)},
+        }
@@ -0,0 +1,260 @@
+"""Versioned, checksummed model bundle.
+
+A bundle is one directory that replaces the three pickles:
+
+    manifest.json    format and bundle version, library versions, feature
+                     schema, label tables, per-file SHA-256 and a content hash
+    model.pkl        pickle of (model, encoders, feature_columns) with the
+                     large numeric arrays stored out of line
+    arrays/NNN.npy   those arrays, memory-mapped copy-on-write at load time, so
+                     worker processes share the same page-cache pages (libsvm
+                     rejects read-only buffers, so ``mmap_mode="c"`` not "r")
+
+``load_bundle`` checks the hashes and that the manifest, the label encoders and
+the fitted pipeline agree on the schema, and raises ``BundleError`` with the
+reason otherwise. Build one with ``python build_bundle.py``.
+
+A bundle whose manifest has ``"kind": "compact"`` holds a float32
+``CompiledModel`` instead of the sklearn pipeline (see ``screening.compact``);
+``"kind": "distilled"`` holds a student model (see ``screening.distill``).
+"""
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+
+from .core import CONDITIONS
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+PICKLE_FILE = "model.pkl"
+ARRAY_DIR = "arrays"
+MIN_ARRAY_BYTES = 4096  # smaller arrays stay inline in the pickle
+
+
+class BundleError(ValueError):
+    """The bundle is missing, corrupt, or inconsistent with itself or this environment."""
+
+
+# -----------------------------
+# SCHEMA
+# -----------------------------
+def describe_schema(model, encoders, feature_columns):
+    """Feature schema and label tables as plain JSON-able data."""
+    pre = model.steps[0][1]
+    numeric, categorical = [], {}
+    for name, trans, cols in pre.transformers_:
+        if name == "num":
+            numeric.extend(cols)
+        elif name == "cat":
+            onehot = trans.steps[-1][1]
+            for col, cats in zip(cols, onehot.categories_):
+                categorical[col] = [str(c) for c in cats]
+    return {
+        "columns": list(feature_columns),
+        "numeric": numeric,
+        "categorical": categorical,
+        "labels": {c: [str(x) for x in encoders[f"{c} Label"].classes_] for c in CONDITIONS},
+    }
+
+
+def validate(model, encoders, feature_columns, schema=None):
+    """Raise BundleError unless the pipeline, encoders, column list (and manifest schema) agree."""
+    cols = list(feature_columns)
+    pre = model.steps[0][1]
+    fitted = [str(c) for c in getattr(pre, "feature_names_in_", [])]
+    if fitted and fitted != cols:
+        raise BundleError("feature_columns do not match the columns the pipeline was fitted on")
+    covered = [c for name, _, cs in pre.transformers_ if name != "remainder" for c in cs]
+    if sorted(covered) != sorted(cols):
+        raise BundleError("pipeline transformers do not cover each feature column exactly once")
+
+    clf = model.steps[-1][1]
+    if len(clf.estimators_) != len(CONDITIONS):
+        raise BundleError(f"model has {len(clf.estimators_)} outputs, expected {len(CONDITIONS)}")
+    for c, est in zip(CONDITIONS, clf.estimators_):
+        enc = encoders.get(f"{c} Label")
+        if enc is None:
+            raise BundleError(f"no label encoder for {c!r}")
+        if len(enc.classes_) != len(est.classes_):
+            raise BundleError(f"{c}: encoder has {len(enc.classes_)} labels, model predicts {len(est.classes_)} classes")
+
+    if schema is not None and schema != describe_schema(model, encoders, cols):
+        raise BundleError("manifest schema does not match the pickled model and encoders")
+
+
+# -----------------------------
+# SAVE
+# -----------------------------
+class _ArrayPickler(pickle.Pickler):
+    """Moves large numeric ndarrays out of the pickle into .npy files."""
+
+    def __init__(self, file, array_dir):
+        super().__init__(file, protocol=5)
+        self.array_dir = array_dir
+        self.arrays = {}  # id -> name, so shared arrays are written once
+
+    def persistent_id(self, obj):
+        import numpy as np
+
+        if type(obj) is not np.ndarray or obj.dtype.hasobject or obj.nbytes < MIN_ARRAY_BYTES:
+            return None
+        name = self.arrays.get(id(obj))
+        if name is None:
+            name = f"{len(self.arrays):03d}.npy"
+            np.save(os.path.join(self.array_dir, name), obj, allow_pickle=False)
+            self.arrays[id(obj)] = name
+        return name
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def dir_size(path):
+    """Bytes of all files under ``path``."""
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def _content_hash(files):
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"{name}:{files[name]}\n".encode())
+    return h.hexdigest()
+
+
+def _versions():
+    import numpy
+    import sklearn
+
+    return {"python": sys.version.split()[0], "numpy": numpy.__version__, "sklearn": sklearn.__version__}
+
+
+def save_bundle(path, model, encoders, feature_columns, version=None, source=None):
+    """Validate and write a bundle to ``path``; returns the manifest.
+
+    The bundle is built in a sibling temp directory and swapped in, so a
+    process loading ``path`` never sees a half-written bundle.
+    """
+    validate(model, encoders, feature_columns)
+    return write_bundle(path, (model, encoders, list(feature_columns)),
+                        {"schema": describe_schema(model, encoders, feature_columns), "source": source or {}},
+                        version=version)
+
+
+def write_bundle(path, payload, fields, version=None):
+    """Write ``payload`` (pickled, large arrays out of line) and a manifest with ``fields`` added."""
+    path = os.path.abspath(path)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(os.path.join(tmp, ARRAY_DIR))
+
+    buf = io.BytesIO()
+    pickler = _ArrayPickler(buf, os.path.join(tmp, ARRAY_DIR))
+    pickler.dump(payload)
+    with open(os.path.join(tmp, PICKLE_FILE), "wb") as f:
+        f.write(buf.getvalue())
+
+    files = {PICKLE_FILE: sha256_file(os.path.join(tmp, PICKLE_FILE))}
+    for name in sorted(pickler.arrays.values()):
+        files[f"{ARRAY_DIR}/{name}"] = sha256_file(os.path.join(tmp, ARRAY_DIR, name))
+    content_hash = _content_hash(files)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version or f"{time.strftime('%Y%m%d')}-{content_hash[:8]}",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "versions": _versions(),
+        "files": files,
+        "content_hash": content_hash,
+        **fields,
+    }
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+# -----------------------------
+# LOAD
+# -----------------------------
+class _ArrayUnpickler(pickle.Unpickler):
+    def __init__(self, file, array_dir, mmap):
+        super().__init__(file)
+        self.array_dir = array_dir
+        self.mmap_mode = "c" if mmap else None
+
+    def persistent_load(self, pid):
+        import numpy as np
+
+        return np.load(os.path.join(self.array_dir, pid), mmap_mode=self.mmap_mode, allow_pickle=False)
+
+
+def read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise BundleError(f"no {MANIFEST} in {path!r}; build one with build_bundle.py") from None
+    except ValueError as e:
+        raise BundleError(f"unreadable {MANIFEST}: {e}") from None
+    if manifest.get("format") != FORMAT_VERSION:
+        raise BundleError(f"bundle format {manifest.get('format')!r} is not supported (expected {FORMAT_VERSION})")
+    return manifest
+
+
+def load_bundle(path, mmap=True, verify=True):
+    """Load ``(model, encoders, feature_columns, manifest)`` from a bundle directory.
+
+    ``verify`` re-hashes every file against the manifest. Raises BundleError
+    on a missing/corrupt file, a library version mismatch or schema drift.
+    """
+    manifest = read_manifest(path)
+    files = manifest.get("files", {})
+    if verify:
+        for name, digest in files.items():
+            full = os.path.join(path, name)
+            if not os.path.exists(full):
+                raise BundleError(f"bundle file {name!r} is missing")
+            if sha256_file(full) != digest:
+                raise BundleError(f"checksum mismatch for {name!r}; the bundle is corrupt or was edited")
+        if _content_hash(files) != manifest.get("content_hash"):
+            raise BundleError("content hash does not match the file checksums")
+
+    kind = manifest.get("kind", "pipeline")
+    if kind not in ("pipeline", "compact", "distilled"):
+        raise BundleError(f"unknown bundle kind {kind!r}")
+    if kind == "pipeline":  # the other kinds hold no sklearn objects
+        built = manifest.get("versions", {}).get("sklearn")
+        current = _versions()["sklearn"]
+        if built and built.split(".")[:2] != current.split(".")[:2]:
+            raise BundleError(f"bundle was built with scikit-learn {built}, running {current}; rebuild it")
+
+    try:
+        with open(os.path.join(path, PICKLE_FILE), "rb") as f:
+            model, encoders, feature_columns = _ArrayUnpickler(f, os.path.join(path, ARRAY_DIR), mmap).load()
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+        raise BundleError(f"cannot unpickle {PICKLE_FILE}: {e}") from e
+    if kind == "compact":
+        from .compact import validate_compact
+
+        validate_compact(model, encoders, feature_columns, manifest.get("schema"))
+    elif kind == "distilled":
+        from .distill import validate_distilled
+
+        validate_distilled(model, encoders, feature_columns, manifest.get("schema"))
+    else:
+        validate(model, encoders, feature_columns, manifest.get("schema"))
+    return model, encoders, feature_columns, manifest
@@ -0,0 +1,135 @@
+"""Bounded LRU memoization of predictions keyed on the canonical feature vector.
+
+The input space is small and discrete (26 answers in 0-3, a handful of profile
+options, CGPA to two decimals), so identical submissions are common: default
+all-"Not at all" forms, or Analyze re-clicked after a Streamlit rerun. A hit
+costs one dict lookup instead of a model call.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(values):
+    """Hashable, normalised key for one row of 33 raw feature values.
+
+    Floats are rounded to two decimals (CGPA precision), missing values
+    (None/NaN) collapse to None, and ints/floats that compare equal hash equal.
+    """
+    key = []
+    for v in values:
+        if v is None or v != v:
+            v = None
+        elif isinstance(v, float):
+            v = round(v, 2)
+        key.append(v)
+    return tuple(key)
+
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with hit/miss counters.
+
+    When ``watch_paths`` is set, the files' mtime/size are re-checked at most
+    every ``check_interval`` seconds; ``source_changed`` reports a change to
+    any of them once and clears the cache so stale predictions are never served.
+
+    ``generation`` counts the clears. A caller that scores misses reads it
+    first and passes it to ``put``; a put from before a clear is dropped, so
+    a result computed by a model replaced during the call is never cached.
+    """
+
+    def __init__(self, max_entries=4096, watch_paths=(), check_interval=1.0):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.watch(watch_paths)
+        self._next_check = time.monotonic() + check_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            if self._data:
+                self._data.clear()
+                self.invalidations += 1
+
+    def watch(self, paths):
+        """Watch ``paths`` from now on, recording their current signatures."""
+        with self._lock:
+            self.watch_paths = tuple(paths)
+            self._signature = self._signatures()
+
+    def _signatures(self):
+        return tuple(file_signature(p) for p in self.watch_paths)
+
+    def source_changed(self):
+        """True (once) if a watched file changed since the last check; clears the cache."""
+        if not self.watch_paths:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        with self._lock:
+            self._next_check = now + self.check_interval
+            signature = self._signatures()
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            self.clear()
+            return True
+
+    def mark_stale(self):
+        """Forget the recorded signature so the next check reports a change again."""
+        with self._lock:
+            self._signature = None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,165 @@
+"""Cascaded early-exit inference on the compiled model.
+
+For each output the LogisticRegression voter runs first. Rows where its
+top-1 minus top-2 probability margin reaches that output's threshold exit
+early with the LR probabilities, and only the remaining rows pay for the SVC
+kernel and the full soft vote. Early-exit rows keep the ensemble's label (at
+the calibrated agreement rate) but report the LR's confidence.
+
+``calibrate`` picks, per output, the lowest threshold whose early exits keep
+label agreement with the full ensemble at or above ``target`` on a set of
+calibration rows, using the Wilson upper bound of the disagreement rate at
+``confidence``, so the target also holds for new rows from the same
+distribution with that confidence. ``save_thresholds``/``load_thresholds``
+store the thresholds with the hash of the model they were calibrated for.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+from .compiled import CompiledLogistic
+from .core import CONDITIONS, ROOT
+
+THRESHOLDS_PATH = os.path.join(ROOT, "cascade_thresholds.json")
+
+
+def lr_margin(p):
+    """Top-1 minus top-2 probability per row."""
+    top2 = np.partition(p, -2, axis=1)[:, -2:]
+    return top2[:, 1] - top2[:, 0]
+
+
+def _linear_index(voting):
+    for i, m in enumerate(voting.members):
+        if isinstance(m, CompiledLogistic):
+            return i
+    raise ValueError("voting ensemble has no LogisticRegression member to exit on")
+
+
+class CascadeModel:
+    """``predict_proba`` with per-output early exit on the LR margin; counts early exits."""
+
+    def __init__(self, compiled, thresholds):
+        missing = [c for c in CONDITIONS if c not in thresholds]
+        if missing:
+            raise ValueError(f"no cascade threshold for {', '.join(missing)}")
+        self.compiled = compiled
+        self.thresholds = [float(thresholds[c]) for c in CONDITIONS]
+        self.linear = [_linear_index(out) for out in compiled.outputs]
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.early = [0] * len(CONDITIONS)
+        self.all_early = 0  # rows where no SVC ran at all
+
+    def predict_proba(self, rows):
+        Z = self.compiled.transform(rows)
+        n = len(Z)
+        probs = []
+        needs_full = np.zeros(n, dtype=bool)
+        early = []
+        for out, li, t in zip(self.compiled.outputs, self.linear, self.thresholds):
+            p = out.members[li].predict_proba(Z)
+            unsure = np.flatnonzero(lr_margin(p) < t)
+            if unsure.size:
+                Zu = Z[unsure]
+                member_p = [p[unsure] if j == li else m.predict_proba(Zu) for j, m in enumerate(out.members)]
+                p[unsure] = out.combine(member_p)
+                needs_full[unsure] = True
+            early.append(n - unsure.size)
+            probs.append(p)
+        with self._lock:
+            self.rows += n
+            self.early = [a + b for a, b in zip(self.early, early)]
+            self.all_early += int(n - needs_full.sum())
+        return probs
+
+    def stats(self):
+        with self._lock:
+            rows, early, all_early = self.rows, list(self.early), self.all_early
+        return {
+            "rows": rows,
+            "early_exit": {c: e / rows if rows else 0.0 for c, e in zip(CONDITIONS, early)},
+            "no_svc": all_early / rows if rows else 0.0,
+            "thresholds": dict(zip(CONDITIONS, self.thresholds)),
+        }
+
+
+# -----------------------------
+# CALIBRATION
+# -----------------------------
+def wilson_upper(errors, n, z):
+    """Upper Wilson score bound of a binomial error rate."""
+    p = errors / n
+    centre = p + z * z / (2 * n)
+    spread = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return (centre + spread) / (1 + z * z / n)
+
+
+def calibrate(compiled, rows, target=0.995, confidence=0.95):
+    """Per-output thresholds keeping LR-vs-ensemble label agreement >= ``target``.
+
+    Returns ``(thresholds, report)``; a threshold of ``inf`` means the output
+    never exits early.
+    """
+    from statistics import NormalDist
+
+    z = NormalDist().inv_cdf(confidence) if confidence else 0.0
+    Z = compiled.transform(rows)
+    n = len(Z)
+    thresholds, report = {}, {}
+    for c, out, li in zip(CONDITIONS, compiled.outputs, [_linear_index(o) for o in compiled.outputs]):
+        p_lr = out.members[li].predict_proba(Z)
+        full = out.predict_proba(Z)
+        margin = lr_margin(p_lr)
+        agree = p_lr.argmax(axis=1) == full.argmax(axis=1)
+
+        order = np.argsort(-margin, kind="stable")
+        m = margin[order]
+        disagreements = np.cumsum(~agree[order])
+        # Rows exit when margin >= t, so only the last row of each run of equal margins is a valid cut
+        group_end = np.append(m[1:] != m[:-1], True)
+        ok = group_end & (wilson_upper(disagreements, n, z) <= 1.0 - target)
+        cut = np.flatnonzero(ok)
+        if cut.size:
+            k = cut[-1] + 1
+            thresholds[c] = float(m[k - 1])
+            exit_agreement = 1.0 - disagreements[k - 1] / k
+        else:
+            k = 0
+            thresholds[c] = float("inf")
+            exit_agreement = 1.0
+        report[c] = {
+            "threshold": thresholds[c],
+            "early_exit": k / n,
+            "agreement": 1.0 - (disagreements[k - 1] if k else 0) / n,
+            "agreement_among_exits": exit_agreement,
+            "lr_agreement": float(agree.mean()),
+        }
+    return thresholds, report
+
+
+def evaluate(compiled, cascade, rows):
+    """Label agreement of ``cascade`` with the full ensemble on ``rows``, per output."""
+    full = compiled.predict_proba(rows)
+    fast = cascade.predict_proba(rows)
+    return {c: float((f.argmax(axis=1) == g.argmax(axis=1)).mean()) for c, f, g in zip(CONDITIONS, full, fast)}
+
+
+def save_thresholds(path, thresholds, model_hash=None, target=None, report=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"model_hash": model_hash, "target": target,
+                   "thresholds": {c: (None if t == float("inf") else t) for c, t in thresholds.items()},
+                   "report": report or {}}, f, indent=2)
+
+
+def load_thresholds(path=THRESHOLDS_PATH, model_hash=None):
+    """Thresholds from a calibration file; refuses a file calibrated for a different model."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    saved = data.get("model_hash")
+    if model_hash and saved and saved != model_hash:
+        raise ValueError(f"cascade thresholds in {path!r} were calibrated for a different model "
+                         f"({saved[:12]} != {model_hash[:12]}); rerun calibrate_cascade.py")
+    return {c: float("inf") if t is None else float(t) for c, t in data["thresholds"].items()}
@@ -0,0 +1,116 @@
+"""Compact float32 export of the compiled model.
+
+``compact_model`` turns a ``CompiledModel`` into a smaller copy:
+
+* the support vectors of all SVCs are merged into one deduplicated matrix,
+  and each SVC keeps only its dual coefficients on that matrix;
+* ``prune`` optionally drops support vectors whose dual coefficients are all
+  below that fraction of the SVC's largest one (each class keeps at least
+  its strongest support vector);
+* kernel and LR parameters are stored as float32, and nothing from sklearn
+  is kept, so loading a compact bundle does not import scikit-learn.
+
+``save_compact`` writes it in the bundle format (see ``screening.bundle``)
+with ``"kind": "compact"``. ``load_bundle`` and ``Screener.load`` accept
+either kind. Build and measure one with ``python compact_model.py``.
+"""
+import copy
+
+import numpy as np
+
+from .bundle import BundleError, write_bundle
+from .compiled import CompiledLogistic, CompiledModel, CompiledSVC, SharedKernel
+from .core import CONDITIONS
+
+KIND = "compact"
+
+
+class LabelClasses:
+    """Stand-in for a fitted LabelEncoder: ``classes_`` and ``inverse_transform`` only."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y)]
+
+
+def _svcs(compiled):
+    return [m for out in compiled.outputs for m in out.members if isinstance(m, CompiledSVC)]
+
+
+def _prune(svc, prune):
+    strength = np.abs(svc.pair_coef).max(axis=1)
+    keep = strength >= prune * strength.max()
+    for c in range(svc.n_classes):
+        s, e = svc.starts[c], svc.starts[c + 1]
+        if e > s and not keep[s:e].any():
+            keep[s + strength[s:e].argmax()] = True
+    svc.n_support = np.array([keep[svc.starts[c]:svc.starts[c + 1]].sum() for c in range(svc.n_classes)])
+    svc.starts = np.concatenate([[0], np.cumsum(svc.n_support)])
+    svc.support_vectors = svc.support_vectors[keep]
+    svc.sv_sq = svc.sv_sq[keep]
+    svc.pair_coef = svc.pair_coef[keep]
+    svc.dual_coef = svc.dual_coef[:, keep]
+
+
+def compact_model(compiled, dtype="float32", prune=0.0):
+    """A compacted deep copy of ``compiled``; returns ``(compact, stats)``."""
+    compact = copy.deepcopy(compiled)
+    svcs = _svcs(compact)
+    before = [len(m.support_vectors) for m in svcs]
+    if prune:
+        for m in svcs:
+            _prune(m, prune)
+    after = [len(m.support_vectors) for m in svcs]
+
+    by_gamma = {}
+    for m in svcs:
+        by_gamma.setdefault(m.gamma, []).append(m)
+    compact.kernels = [SharedKernel(group) for group in by_gamma.values()]
+    for k in compact.kernels:
+        k.support_vectors = k.support_vectors.astype(dtype)
+        k.sv_sq = k.sv_sq.astype(dtype)
+    for m in svcs:
+        m.shared_coef = m.shared_coef.astype(dtype)
+        m.support_vectors = m.sv_sq = m.pair_coef = m.dual_coef = None
+    for out in compact.outputs:
+        for m in out.members:
+            if isinstance(m, CompiledLogistic):
+                m.coef = m.coef.astype(dtype)
+
+    stats = {
+        "dtype": str(np.dtype(dtype)),
+        "prune": prune,
+        "support_vectors": dict(zip(CONDITIONS, before)),
+        "support_vectors_kept": dict(zip(CONDITIONS, after)),
+        "unique_support_vectors": sum(len(k.support_vectors) for k in compact.kernels),
+    }
+    return compact, stats
+
+
+def save_compact(path, compact, encoders, feature_columns, schema, stats, source=None, version=None):
+    """Write a compact bundle; ``schema`` and ``source`` describe the original model."""
+    labels = {name: LabelClasses(enc.classes_) for name, enc in encoders.items()}
+    validate_compact(compact, labels, feature_columns, schema)
+    fields = {"kind": KIND, "schema": schema, "source": source or {}, "compact": stats}
+    return write_bundle(path, (compact, labels, list(feature_columns)), fields, version=version)
+
+
+def validate_compact(model, encoders, feature_columns, schema=None):
+    """Raise BundleError unless the compact model, labels and column list agree."""
+    if not isinstance(model, CompiledModel):
+        raise BundleError(f"compact bundle holds a {type(model).__name__}, expected a CompiledModel")
+    if list(feature_columns) != model.feature_columns:
+        raise BundleError("feature_columns do not match the compiled model")
+    if schema is not None and list(schema.get("columns", [])) != model.feature_columns:
+        raise BundleError("manifest schema does not match the compiled model's columns")
+    if len(model.outputs) != len(CONDITIONS):
+        raise BundleError(f"model has {len(model.outputs)} outputs, expected {len(CONDITIONS)}")
+    for c, out in zip(CONDITIONS, model.outputs):
+        enc = encoders.get(f"{c} Label")
+        if enc is None:
+            raise BundleError(f"no label encoder for {c!r}")
+        n = out.members[0].n_classes
+        if len(enc.classes_) != n:
+            raise BundleError(f"{c}: encoder has {len(enc.classes_)} labels, model predicts {n} classes")
@@ -0,0 +1,385 @@
+"""NumPy-only "compiled" inference for the hybrid pipeline.
+
+The fitted sklearn ``Pipeline`` (ColumnTransformer -> MultiOutputClassifier of
+soft-voting LogisticRegression + SVC) is flattened once into plain arrays:
+imputer fill values, scaler means/scales, one-hot lookup tables, LR
+coefficients and the SVC support vectors, dual coefficients, intercepts and
+Platt parameters. Scoring raw 33-feature rows is then a handful of vectorized
+NumPy operations with no DataFrame construction or sklearn validation.
+
+SVC probabilities follow libsvm exactly: one-vs-one decision values, Platt
+sigmoid per pair and the iterative pairwise-coupling solver
+(``multiclass_probability``), so results match ``predict_proba`` to ~1e-12.
+
+The three per-condition SVCs were fitted on the same training rows and share
+most of their support vectors. ``SharedKernel`` evaluates the RBF kernel once
+against the deduplicated union and each SVC reads its decision values from
+that matrix through dual coefficients scattered onto the union rows.
+"""
+import numpy as np
+
+MIN_PROB = 1e-7  # libsvm clips pairwise probabilities to [MIN_PROB, 1 - MIN_PROB]
+
+
+class UnsupportedModelError(ValueError):
+    """The fitted pipeline uses a component the compiler does not handle."""
+
+
+# -----------------------------
+# MEMBER ESTIMATORS
+# -----------------------------
+class CompiledLogistic:
+    def __init__(self, lr):
+        self.coef = np.ascontiguousarray(lr.coef_, dtype=np.float64).T
+        self.intercept = np.asarray(lr.intercept_, dtype=np.float64)
+        self.n_classes = len(lr.classes_)
+
+    def decision(self, Z):
+        return Z @ self.coef + self.intercept
+
+    def predict_proba(self, Z):
+        d = self.decision(Z)
+        if self.n_classes == 2:
+            p1 = 1.0 / (1.0 + np.exp(-d[:, 0]))
+            return np.column_stack([1.0 - p1, p1])
+        d = d - d.max(axis=1, keepdims=True)
+        e = np.exp(d)
+        return e / e.sum(axis=1, keepdims=True)
+
+
+class CompiledSVC:
+    def __init__(self, svc):
+        if svc.kernel != "rbf":
+            raise UnsupportedModelError(f"SVC kernel {svc.kernel!r} is not supported (rbf only)")
+        if getattr(svc, "_sparse", False):
+            raise UnsupportedModelError("sparse SVC models are not supported")
+        if svc.probA_.size == 0:
+            raise UnsupportedModelError("SVC was fitted without probability=True")
+        self.support_vectors = np.ascontiguousarray(svc.support_vectors_, dtype=np.float64)
+        self.sv_sq = np.einsum("ij,ij->i", self.support_vectors, self.support_vectors)
+        self.gamma = float(svc._gamma)
+        self.n_support = np.asarray(svc._n_support, dtype=np.int64)
+        self.starts = np.concatenate([[0], np.cumsum(self.n_support)])
+        self.dual_coef = np.asarray(svc._dual_coef_, dtype=np.float64)
+        self.rho = -np.asarray(svc._intercept_, dtype=np.float64)
+        self.prob_a = np.asarray(svc.probA_, dtype=np.float64)
+        self.prob_b = np.asarray(svc.probB_, dtype=np.float64)
+        self.n_classes = len(self.n_support)
+        self.pairs = [(i, j) for i in range(self.n_classes) for j in range(i + 1, self.n_classes)]
+        self.pair_coef = self._pair_coefficients()
+        self.shared = None        # SharedKernel this SVC's support vectors belong to
+        self.shared_coef = None   # pair_coef scattered onto the shared union rows
+
+    def _pair_coefficients(self):
+        """Dense (n_SV, n_pairs) matrix so all one-vs-one decisions are one matmul."""
+        W = np.zeros((len(self.support_vectors), len(self.pairs)))
+        s = self.starts
+        for p, (i, j) in enumerate(self.pairs):
+            W[s[i]:s[i + 1], p] = self.dual_coef[j - 1, s[i]:s[i + 1]]
+            W[s[j]:s[j + 1], p] = self.dual_coef[i, s[j]:s[j + 1]]
+        return W
+
+    def sq_distances(self, Z):
+        Z = Z.astype(self.support_vectors.dtype, copy=False)  # float32 in a compact export
+        sq = np.einsum("ij,ij->i", Z, Z)[:, None] + self.sv_sq[None, :] - 2.0 * (Z @ self.support_vectors.T)
+        np.maximum(sq, 0.0, out=sq)
+        return sq
+
+    def kernel(self, Z):
+        return np.exp(-self.gamma * self.sq_distances(Z))
+
+    def decision(self, Z, K=None):
+        """One-vs-one decision values, shape (n, n_pairs), libsvm pair order.
+
+        ``K`` is a precomputed kernel against ``self.shared``'s support vectors.
+        """
+        if K is None:
+            if self.support_vectors is None:  # compact export: only the shared kernel is kept
+                K = self.shared.kernel(Z)
+            else:
+                return self.kernel(Z) @ self.pair_coef - self.rho
+        return K @ self.shared_coef - self.rho
+
+    def predict_proba(self, Z, K=None):
+        return self.proba_from_decision(self.decision(Z, K))
+
+    def proba_from_decision(self, dec):
+        f = dec * self.prob_a + self.prob_b
+        r_pair = np.clip(1.0 / (1.0 + np.exp(f)), MIN_PROB, 1.0 - MIN_PROB)
+        if self.n_classes == 2:
+            return np.column_stack([r_pair[:, 0], 1.0 - r_pair[:, 0]])
+        return pairwise_coupling(r_pair, self.pairs, self.n_classes)
+
+
+def pairwise_coupling(r_pair, pairs, k):
+    """libsvm's ``multiclass_probability`` vectorized across rows.
+
+    Each row runs the same Gauss-Seidel updates as the C code and is frozen
+    as soon as its own stopping criterion is met.
+    """
+    n = r_pair.shape[0]
+    I, J = np.asarray(pairs).T
+    r = np.zeros((n, k, k))
+    r[:, I, J] = r_pair
+    r[:, J, I] = 1.0 - r_pair
+
+    # Q[t, j] = -r[j, t] * r[t, j]; Q[t, t] = sum_j r[j, t]^2
+    Q = -r.transpose(0, 2, 1) * r
+    diag = np.arange(k)
+    Q[:, diag, diag] = np.einsum("njt,njt->nt", r, r)
+
+    p = np.full((n, k), 1.0 / k)
+    eps = 0.005 / k
+    active = np.arange(n)
+    Qa, pa = Q, p.copy()
+    for _ in range(max(100, k)):
+        Qp = np.einsum("ntj,nj->nt", Qa, pa)
+        pQp = np.einsum("nt,nt->n", pa, Qp)
+        done = np.abs(Qp - pQp[:, None]).max(axis=1) < eps
+        if done.any():
+            p[active[done]] = pa[done]
+            keep = ~done
+            if not keep.any():
+                return p
+            active, Qa, pa, Qp, pQp = active[keep], Qa[keep], pa[keep], Qp[keep], pQp[keep]
+        for t in range(k):
+            Qtt = Qa[:, t, t]
+            diff = (pQp - Qp[:, t]) / Qtt
+            pa[:, t] += diff
+            scale = 1.0 + diff
+            pQp = (pQp + diff * (diff * Qtt + 2.0 * Qp[:, t])) / scale / scale
+            Qp = (Qp + diff[:, None] * Qa[:, t, :]) / scale[:, None]
+            pa /= scale[:, None]
+    p[active] = pa
+    return p
+
+
+class SharedKernel:
+    """RBF kernel against the deduplicated union of several SVCs' support vectors."""
+
+    def __init__(self, svcs):
+        gammas = {m.gamma for m in svcs}
+        if len(gammas) != 1:
+            raise UnsupportedModelError("SVCs with different gammas cannot share a kernel")
+        self.gamma = gammas.pop()
+        stacked = np.vstack([m.support_vectors for m in svcs])
+        self.support_vectors, inverse = np.unique(stacked, axis=0, return_inverse=True)
+        self.support_vectors = np.ascontiguousarray(self.support_vectors)
+        self.sv_sq = np.einsum("ij,ij->i", self.support_vectors, self.support_vectors)
+        self.n_total = len(stacked)
+        inverse = inverse.reshape(-1)
+        offset = 0
+        for m in svcs:
+            rows = inverse[offset:offset + len(m.support_vectors)]
+            offset += len(m.support_vectors)
+            W = np.zeros((len(self.support_vectors), len(m.pairs)))
+            np.add.at(W, rows, m.pair_coef)
+            m.shared, m.shared_coef = self, W
+
+    def support_vector_columns(self):
+        """The support vectors as float64, one contiguous row per model input column (built on first use)."""
+        columns = self.__dict__.get("_columns")
+        if columns is None:
+            columns = self._columns = np.ascontiguousarray(self.support_vectors.T, dtype=np.float64)
+        return columns
+
+    @property
+    def overlap(self):
+        """Kernel columns saved: total support vectors / union size."""
+        return self.n_total / len(self.support_vectors)
+
+    sq_distances = CompiledSVC.sq_distances
+    kernel = CompiledSVC.kernel
+
+
+class CompiledVoting:
+    """Soft-voting ensemble of compiled LR/SVC members."""
+
+    def __init__(self, voting):
+        if voting.voting != "soft":
+            raise UnsupportedModelError("only soft voting is supported")
+        self.members = []
+        for est in voting.estimators_:
+            name = type(est).__name__
+            if name == "LogisticRegression":
+                self.members.append(CompiledLogistic(est))
+            elif name == "SVC":
+                self.members.append(CompiledSVC(est))
+            else:
+                raise UnsupportedModelError(f"voting member {name} is not supported")
+        w = voting.weights
+        self.weights = None if w is None else np.asarray(w, dtype=np.float64)
+
+    def combine(self, member_probas):
+        return np.average(np.asarray(member_probas), axis=0, weights=self.weights)
+
+    def predict_proba(self, Z, kernels=None):
+        """``kernels`` maps SharedKernel -> its kernel matrix for ``Z``."""
+        if not kernels:
+            return self.combine([m.predict_proba(Z) for m in self.members])
+        return self.combine([m.predict_proba(Z, kernels[m.shared]) if getattr(m, "shared", None) in kernels
+                             else m.predict_proba(Z) for m in self.members])
+
+
+# -----------------------------
+# PREPROCESSING
+# -----------------------------
+class CompiledPreprocessor:
+    """Imputation, scaling and one-hot encoding of the ColumnTransformer."""
+
+    def __init__(self, column_transformer, feature_columns):
+        index = {c: i for i, c in enumerate(feature_columns)}
+        self.num_idx = None
+        self.cat_idx = None
+        names = {}
+        for name, trans, cols in column_transformer.transformers_:
+            if trans == "drop" or (name == "remainder" and not len(cols)):
+                continue
+            if trans == "passthrough":
+                raise UnsupportedModelError("passthrough columns are not supported")
+            steps = dict(trans.steps)
+            if "scaler" in steps:
+                self._compile_numeric(steps, [index[c] for c in cols])
+                names.setdefault("num", []).append(name)
+            elif "onehot" in steps:
+                self._compile_categorical(steps, [index[c] for c in cols])
+                names.setdefault("cat", []).append(name)
+            else:
+                raise UnsupportedModelError(f"transformer {name!r} is not supported")
+        if list(names) != ["num", "cat"] or any(len(v) != 1 for v in names.values()):
+            raise UnsupportedModelError("expected one numeric transformer followed by one categorical transformer")
+        n_num = len(self.num_keep)
+        self.n_out = n_num + self.n_onehot
+        # transform() and the kernel/attribution code put the numeric block first
+        slices = getattr(column_transformer, "output_indices_", None)
+        if slices is not None and (slices[names["num"][0]] != slice(0, n_num)
+                                   or slices[names["cat"][0]] != slice(n_num, self.n_out)):
+            raise UnsupportedModelError("numeric and categorical outputs are not laid out as compiled")
+
+    def _compile_numeric(self, steps, idx):
+        imputer, scaler = steps["imputer"], steps["scaler"]
+        stats = np.asarray(imputer.statistics_, dtype=np.float64)
+        # Columns with no observed value at fit time are dropped by SimpleImputer
+        keep = np.flatnonzero(~np.isnan(stats))
+        self.num_idx = np.asarray(idx)
+        self.num_keep = keep
+        self.num_fill = stats[keep]
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(len(keep))
+        scale = scaler.scale_ if scaler.with_std else np.ones(len(keep))
+        self.num_mean = np.asarray(mean, dtype=np.float64)
+        self.num_scale = np.asarray(scale, dtype=np.float64)
+
+    def _compile_categorical(self, steps, idx):
+        imputer, onehot = steps["imputer"], steps["onehot"]
+        if onehot.drop is not None:
+            raise UnsupportedModelError("OneHotEncoder(drop=...) is not supported")
+        if getattr(onehot, "infrequent_categories_", None) and any(c is not None for c in onehot.infrequent_categories_):
+            raise UnsupportedModelError("infrequent-category grouping is not supported")
+        self.cat_idx = list(idx)
+        self.cat_fill = list(imputer.statistics_)
+        self.cat_tables = []
+        offset = 0
+        for cats in onehot.categories_:
+            self.cat_tables.append({c: offset + k for k, c in enumerate(cats)})
+            offset += len(cats)
+        self.n_onehot = offset
+
+    def transform(self, rows):
+        """Raw rows (n, 33) in ``feature_columns`` order -> model inputs (n, 64)."""
+        rows = rows if isinstance(rows, np.ndarray) else np.asarray(rows, dtype=object)
+        n = rows.shape[0]
+        n_num = len(self.num_keep)
+        Z = np.zeros((n, self.n_out))
+
+        num = rows[:, self.num_idx[self.num_keep]].astype(np.float64)
+        missing = np.isnan(num)
+        if missing.any():
+            num = np.where(missing, self.num_fill, num)
+        Z[:, :n_num] = (num - self.num_mean) / self.num_scale
+
+        for col, fill, table in zip(self.cat_idx, self.cat_fill, self.cat_tables):
+            for r, value in enumerate(rows[:, col]):
+                if value is None or value != value:  # None / NaN -> most_frequent
+                    value = fill
+                pos = table.get(value)
+                if pos is not None:  # handle_unknown="ignore" -> all zeros
+                    Z[r, n_num + pos] = 1.0
+        return Z
+
+
+# -----------------------------
+# FULL MODEL
+# -----------------------------
+class CompiledModel:
+    """Drop-in replacement for ``pipeline.predict_proba`` on raw feature rows.
+
+    With ``shared_kernel`` (default) SVCs with the same gamma share one kernel
+    evaluation per batch; otherwise each SVC computes its own.
+    """
+
+    def __init__(self, pipeline, feature_columns, shared_kernel=True):
+        steps = dict(pipeline.steps)
+        pre, clf = pipeline.steps[0][1], pipeline.steps[-1][1]
+        if len(steps) != 2 or type(clf).__name__ != "MultiOutputClassifier":
+            raise UnsupportedModelError("expected Pipeline(ColumnTransformer, MultiOutputClassifier)")
+        self.feature_columns = list(feature_columns)
+        self.pre = CompiledPreprocessor(pre, self.feature_columns)
+        self.outputs = [CompiledVoting(est) for est in clf.estimators_]
+        self.kernels = []
+        if shared_kernel:
+            by_gamma = {}
+            for out in self.outputs:
+                for m in out.members:
+                    if isinstance(m, CompiledSVC):
+                        by_gamma.setdefault(m.gamma, []).append(m)
+            self.kernels = [SharedKernel(svcs) for svcs in by_gamma.values() if len(svcs) > 1]
+
+    def rows_from_records(self, records):
+        """List of dicts keyed by feature column -> row array (missing -> 0, like reindex)."""
+        cols = self.feature_columns
+        return np.array([[rec.get(c, 0) for c in cols] for rec in records], dtype=object)
+
+    def transform(self, rows):
+        return self.pre.transform(rows)
+
+    def predict_proba(self, rows):
+        Z = self.transform(rows)
+        kernels = {k: k.kernel(Z) for k in self.kernels}
+        return [out.predict_proba(Z, kernels) for out in self.outputs]
+
+    def predict_proba_variants(self, row, columns, deltas):
+        """Probabilities for ``row`` (first) and for copies with ``row[columns[v]] += deltas[v]``.
+
+        Only numeric columns may change. The base row is preprocessed once and
+        each variant differs from it in one scaled column, so its RBF kernel
+        exponent is the base row's plus ``-gamma * (2 * d * (z_j - sv_j) + d**2)``:
+        no distance matmul per variant. With ``d = m * u`` (``m`` answer levels,
+        ``u`` one level scaled) the first term is ``m * G_j`` for
+        ``G_j = -2 * gamma * u * (z_j - sv_j)``, computed once per changed
+        column and shared by its +1 and -1 variants; all rows then take one
+        exp together. Matches ``predict_proba`` on the materialized rows to
+        rounding.
+        """
+        pre = self.pre
+        position = {f: k for k, f in enumerate(pre.num_idx[pre.num_keep])}
+        j = np.array([position[c] for c in columns], dtype=np.int64)
+        m = np.asarray(deltas, dtype=np.float64)
+        unique, which = np.unique(j, return_inverse=True)
+        unit = 1.0 / pre.num_scale[unique]
+        d = m * unit[which]
+        z0 = self.transform(np.asarray([row], dtype=object))
+        Z = np.repeat(z0, len(j) + 1, axis=0)
+        Z[np.arange(1, len(j) + 1), j] += d
+        kernels = {}
+        for k in self.kernels:
+            K = np.empty((len(j) + 1, len(k.support_vectors)))
+            K[0] = -k.gamma * k.sq_distances(z0)[0]
+            G = (-2.0 * k.gamma * unit)[:, None] * (z0[0, unique][:, None] - k.support_vector_columns()[unique])
+            Kv = K[1:]
+            np.take(G, which, axis=0, out=Kv)
+            Kv *= m[:, None]
+            Kv -= (k.gamma * d * d)[:, None]
+            Kv += K[0]
+            np.exp(K, out=K)
+            kernels[k] = K
+        return [out.predict_proba(Z, kernels) for out in self.outputs]
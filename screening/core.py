@@ -0,0 +1,639 @@
+"""Streamlit-free inference core shared by the apps, batch jobs and services.
+
+Only the standard library is imported at module level; numpy, pandas and
+joblib/sklearn are imported the first time a model is loaded, so importing
+this module stays cheap for code that never scores anything.
+"""
+import contextlib
+import os
+import re
+import threading
+import time
+from typing import NamedTuple
+
+from . import metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, "mental_health_hybrid_model.pkl")
+ENCODERS_PATH = os.path.join(ROOT, "label_encoders.pkl")
+COLUMNS_PATH = os.path.join(ROOT, "feature_columns.pkl")
+BUNDLE_PATH = os.path.join(ROOT, "model_bundle")
+COMPACT_PATH = os.path.join(ROOT, "model_compact")
+
+CONDITIONS = ["Anxiety", "Stress", "Depression"]
+N_QUESTIONS = 26
+EMERGENCY_LEVEL = 2  # Q26 answer ("Often" or worse) that triggers the emergency alert
+
+# Profile keys as stored by the apps, in feature_columns order (first 7 columns)
+PROFILE_KEYS = ["age", "gender", "uni", "dept", "year", "cgpa", "sch"]
+
+
+class ArtifactError(RuntimeError):
+    """A model artifact could not be loaded; the message names the file and the cause."""
+
+
+class ConditionResult(NamedTuple):
+    condition: str
+    label: str
+    confidence: float  # percent, 0-100
+    is_low: bool
+    bucket: str
+    index: int  # class index; see Screener.labels for display labels
+
+
+# -----------------------------
+# HELPERS
+# -----------------------------
+def extract_number(text):
+    if text is None or text != text: return 0.0  # None / NaN
+    try:
+        match = re.search(r"[-+]?\d*\.\d+|\d+", str(text))
+        return float(match.group()) if match else 0.0
+    except: return 0.0
+
+def is_low_risk_label(label: str) -> bool:
+    low_exact = {"Minimal Anxiety", "Low Stress", "No Depression", "Minimal Depression", "Normal", "None"}
+    return (label in low_exact) or any(x in label for x in ["Minimal", "Low", "No Depression", "No Stress", "No Anxiety"])
+
+def severity_bucket(label: str) -> str:
+    if any(x in label for x in ["Severe", "High"]): return "Severe/High"
+    if "Moderate" in label: return "Moderate"
+    return "Mild"
+
+def is_emergency(answers) -> bool:
+    return answers[N_QUESTIONS - 1] >= EMERGENCY_LEVEL
+
+def load_resources(model_path=MODEL_PATH, encoders_path=ENCODERS_PATH, columns_path=COLUMNS_PATH, compact=False):
+    """Load the three pickled artifacts. Raises on missing or corrupt files.
+
+    ``compact=True`` (or a directory path) loads the compact float32 export
+    instead (see ``screening.compact``); its model is a ``CompiledModel``.
+    """
+    if compact:
+        from .bundle import load_bundle
+
+        return load_bundle(COMPACT_PATH if compact is True else compact)[:3]
+    import joblib
+
+    loaded = []
+    for what, path in (("model", model_path), ("label encoders", encoders_path), ("feature columns", columns_path)):
+        try:
+            loaded.append(joblib.load(path))
+        except Exception as e:
+            # Unpickling errors are often bare ("EOFError", "invalid load key"): say which file failed
+            raise ArtifactError(f"could not load the {what} from {path!r}: {type(e).__name__}: {e or 'no details'}") from e
+    return tuple(loaded)
+
+def stale_bundle(path=BUNDLE_PATH, pickles=(MODEL_PATH, ENCODERS_PATH, COLUMNS_PATH)):
+    """Why the bundle at ``path`` no longer holds the current pickles, or None.
+
+    ``build_bundle.py`` records the sha256 of the pickles it packed. A pickle
+    that differs and is newer than the manifest was replaced after the
+    build, and the bundle would keep serving the old model. (A bundle newer
+    than the pickles was deliberately built from other files, e.g. a retrain.)
+    """
+    from .bundle import MANIFEST, read_manifest, sha256_file
+
+    manifest = read_manifest(path)
+    built = os.path.getmtime(os.path.join(path, MANIFEST))
+    source = manifest.get("source") or {}
+    for p in pickles:
+        name = os.path.basename(p)
+        if name in source and os.path.exists(p) and os.path.getmtime(p) > built and sha256_file(p) != source[name]:
+            return f"{name} was replaced after {os.path.basename(path)}/ was built"
+    return None
+
+def _stale_compact(path):
+    """Why the compact export at ``path`` is older than the model it was compacted from, or None."""
+    from .bundle import read_manifest
+
+    if not os.path.isdir(BUNDLE_PATH):
+        return None
+    reason = stale_bundle(BUNDLE_PATH)
+    if reason is None and read_manifest(path).get("source", {}).get("content_hash") not in (
+            None, read_manifest(BUNDLE_PATH).get("content_hash")):
+        reason = f"{os.path.basename(BUNDLE_PATH)}/ was rebuilt after {os.path.basename(path)}/ was exported"
+    return reason
+
+def model_hash(manifest, source):
+    """Hash naming a loaded model, recorded by the files derived from it (cascade thresholds, distilled student).
+
+    A bundle's or export's ``content_hash``; for pickles, the hash of the
+    bundle built from exactly these files, else the model pickle's sha256.
+    None for a model built in code.
+    """
+    if manifest is not None:
+        return manifest.get("content_hash")
+    if not isinstance(source, (tuple, list)):
+        return None
+    from .bundle import BundleError, read_manifest, sha256_file
+
+    hashes = {os.path.basename(p): sha256_file(p) for p in source}
+    try:
+        bundle = read_manifest(BUNDLE_PATH)
+    except BundleError:
+        bundle = {}
+    return bundle["content_hash"] if bundle.get("source") == hashes else hashes[os.path.basename(source[0])]
+
+def default_source():
+    """The built bundle if there is one, else the three pickles.
+
+    With ``MH_COMPACT_MODEL=1`` in the environment the compact export is
+    preferred when it has been built. A bundle or export older than the
+    pickles it came from is skipped with a warning (see ``stale_bundle``),
+    so replacing a pickle never leaves the apps on the old model.
+    """
+    import warnings
+
+    from .bundle import BundleError
+
+    candidates = [(BUNDLE_PATH, stale_bundle, "build_bundle.py")]
+    if os.environ.get("MH_COMPACT_MODEL") == "1":
+        candidates.insert(0, (COMPACT_PATH, _stale_compact, "build_bundle.py and compact_model.py"))
+    for path, stale, rebuild in candidates:
+        if not os.path.isdir(path):
+            continue
+        try:
+            reason = stale(path)
+        except BundleError:
+            return path  # unreadable manifest: loading it reports the error
+        if reason is None:
+            return path
+        warnings.warn(f"ignoring {path}: {reason}; rerun {rebuild}", stacklevel=2)
+    return (MODEL_PATH, ENCODERS_PATH, COLUMNS_PATH)
+
+def load_artifacts(source=None, mmap=True):
+    """``(model, encoders, feature_columns, manifest)`` from a bundle or the three pickles.
+
+    ``source`` is a bundle directory, a ``(model, encoders, columns)`` path
+    tuple, or None for the default bundle (falling back to the pickles when
+    no bundle has been built). ``manifest`` is None for pickles.
+    """
+    if source is None:
+        source = default_source()
+    t0 = time.perf_counter()
+    try:
+        if isinstance(source, (tuple, list)):
+            out = (*load_resources(*source), None)
+        else:
+            from .bundle import load_bundle
+
+            out = load_bundle(source, mmap=mmap)
+    except Exception as e:
+        cause = e.__cause__ if isinstance(e, ArtifactError) and e.__cause__ else e
+        metrics.MODEL_LOADS.labels("error", type(cause).__name__).inc()
+        raise
+    metrics.STAGE["load"].observe(time.perf_counter() - t0)
+    metrics.MODEL_LOADS.labels("ok", "").inc()
+    return out
+
+def watch_paths(source):
+    """Files whose change means the artifacts were replaced (see ``PredictionCache``).
+
+    For a bundle, its manifest plus the pickles it was built from: replacing
+    a pickle makes the bundle stale, and a screener on the default source
+    then reloads from the pickles (see ``default_source``). A compact export
+    also watches the bundle it was exported from.
+    """
+    from .bundle import MANIFEST, BundleError, read_manifest
+
+    if source is None:
+        return ()
+    if isinstance(source, (tuple, list)):
+        return tuple(source)
+    try:
+        recorded = read_manifest(source).get("source") or {}
+    except BundleError:
+        recorded = {}
+    paths = [os.path.join(source, MANIFEST)]
+    paths += [p for p in (MODEL_PATH, ENCODERS_PATH, COLUMNS_PATH) if os.path.basename(p) in recorded]
+    if "content_hash" in recorded and os.path.abspath(source) != os.path.abspath(BUNDLE_PATH) \
+            and os.path.isdir(BUNDLE_PATH):
+        paths += watch_paths(BUNDLE_PATH)
+    return tuple(paths)
+
+def silence_imputer_warning():
+    """The fitted imputer warns about the all-NaN CGPA column on every transform.
+
+    A process-wide filter, because ``warnings.catch_warnings`` is not
+    thread-safe and the screener is shared across sessions.
+    """
+    import warnings
+
+    warnings.filterwarnings("ignore", message="Skipping features without any observed values", category=UserWarning)
+
+def feature_aliases(feature_columns):
+    """Short names -> full column names: the profile keys plus q1..q26."""
+    aliases = dict(zip(PROFILE_KEYS, feature_columns[:7]))
+    aliases.update({f"q{i + 1}": feature_columns[7 + i] for i in range(N_QUESTIONS)})
+    return aliases
+
+def build_input_row(feature_columns, profile, answers):
+    """Map a saved profile dict and the 26 answers onto the 33 model columns."""
+    row = {
+        feature_columns[0]: extract_number(profile["age"]),
+        feature_columns[1]: profile["gender"],
+        feature_columns[2]: profile["uni"],
+        feature_columns[3]: profile["dept"],
+        feature_columns[4]: profile["year"],
+        feature_columns[5]: float(extract_number(profile["cgpa"])),
+        feature_columns[6]: profile["sch"],
+    }
+    for i in range(N_QUESTIONS):
+        row[feature_columns[7 + i]] = int(answers[i])
+    return row
+
+
+# -----------------------------
+# SCREENER
+# -----------------------------
+class Screener:
+    """Wraps the fitted hybrid model, its label encoders and column order.
+
+    ``predict_one`` scores a single profile + answers (the UI path);
+    ``predict_many`` scores a frame or list of rows with one ``predict_proba``.
+    With ``compiled=True`` the pipeline is flattened into NumPy arrays once
+    (see ``screening.compiled``) and scoring bypasses pandas and sklearn; a
+    compact export (see ``screening.compact``) is always scored that way.
+    With ``cache_size > 0`` dict rows are memoized in an LRU cache (see
+    ``screening.cache``); a screener created by ``load`` also reloads its
+    artifacts and drops the cache when the model file changes on disk.
+    ``enable_micro_batching`` coalesces concurrent single-row predictions
+    from many threads (Streamlit sessions) into batched model calls, and
+    ``enable_process_pool`` moves the model calls into worker processes.
+    Decoding uses ``labels`` (see ``screening.labels``), built once per load.
+    ``enable_profiling`` times each pipeline stage (see ``screening.profiling``),
+    and ``enable_cascade`` skips the SVC for rows the LR voter is sure about.
+    ``enable_distilled`` loads a student model that ``predict_many(rows,
+    distilled=True)`` uses instead of the ensemble (see ``screening.distill``).
+    ``enable_drift_monitor`` feeds every prediction into streaming input and
+    label histograms compared with a baseline (see ``screening.drift``).
+    """
+
+    def __init__(self, model, encoders, feature_columns, compiled=False, cache_size=0, source=None, manifest=None):
+        silence_imputer_warning()
+        self.source = source
+        self._default_source = False
+        self._use_compiled = compiled
+        self._cascade_thresholds = None
+        self.distilled = None
+        self._set_artifacts(model, encoders, feature_columns, manifest)
+        self.cache = None
+        self.batcher = None
+        self.pool = None
+        self.profiler = None
+        self.drift = None
+        self._pool_args = None
+        self._reloading = threading.Lock()  # held while a background reload runs
+        if cache_size:
+            from .cache import PredictionCache
+
+            self.cache = PredictionCache(cache_size, watch_paths=watch_paths(source))
+        metrics.REGISTRY.add_collector(self._metric_samples)
+
+    @classmethod
+    def load(cls, source=None, compiled=False, cache_size=0):
+        """Load from a bundle directory, a pickle path tuple, or the default (see ``load_artifacts``).
+
+        A screener loaded from the default source picks it again on ``reload``,
+        so a stale bundle is left for the pickles as at startup.
+        """
+        resolved = default_source() if source is None else source
+        model, encoders, feature_columns, manifest = load_artifacts(resolved)
+        screener = cls(model, encoders, feature_columns, compiled=compiled, cache_size=cache_size,
+                       source=resolved, manifest=manifest)
+        screener._default_source = source is None
+        return screener
+
+    def enable_micro_batching(self, max_batch_size=32, max_wait_ms=5.0, timeout=10.0):
+        """Route single-row cache misses through a shared ``MicroBatcher``. Returns self.
+
+        A request whose batch is not done within ``timeout`` seconds raises
+        ``screening.pool.ScoringTimeout``, as a missed worker deadline does.
+        """
+        from .batching import MicroBatcher
+
+        self.batcher = MicroBatcher(self._score, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self._batch_timeout = timeout
+        return self
+
+    def enable_process_pool(self, n_workers=2, blas_threads=1, timeout=10.0):
+        """Score in ``n_workers`` pre-warmed processes with a per-job deadline. Returns self.
+
+        Jobs that miss the deadline raise ``screening.pool.ScoringTimeout``.
+        Call ``enable_cascade`` first for the workers to use the cascade.
+        """
+        from .pool import ScoringPool
+
+        self._pool_args = dict(n_workers=n_workers, blas_threads=blas_threads, timeout=timeout)
+        self.pool = ScoringPool(compiled=self._use_compiled, source=self.source,
+                                cascade=self._cascade_thresholds, **self._pool_args)
+        return self
+
+    def enable_profiling(self):
+        """Record per-stage wall time of every in-process model call. Returns the ``ModelProfiler``.
+
+        Calls that run in a process pool are not profiled.
+        """
+        from .profiling import ModelProfiler
+
+        if self.profiler is None:
+            self.profiler = ModelProfiler().attach(self._scoring_model())
+        return self.profiler
+
+    def disable_profiling(self):
+        """Remove the timing wrappers; the estimators run unmodified again."""
+        if self.profiler is not None:
+            self.profiler.detach()
+            self.profiler = None
+
+    def enable_cascade(self, thresholds=None):
+        """Early-exit scoring: LR first, SVC only for uncertain rows (see ``screening.cascade``). Returns self.
+
+        ``thresholds`` is a ``{condition: margin}`` dict or the path of a
+        calibration file (default ``cascade_thresholds.json``, written by
+        ``calibrate_cascade.py`` and checked against the model hash).
+        """
+        from .cascade import THRESHOLDS_PATH
+
+        if self.compiled is None:
+            raise ValueError("cascade inference needs the compiled model: Screener.load(compiled=True)")
+        self._cascade_thresholds = THRESHOLDS_PATH if thresholds is None else thresholds
+        self.cascade = self._build_cascade(self.compiled, self.manifest)
+        if self.profiler is not None:
+            self.profiler.attach(self._scoring_model())
+        return self
+
+    def enable_distilled(self, path=None):
+        """Load the distilled student (default ``model_distilled/``) for ``distilled=True`` calls. Returns self.
+
+        Raises ValueError if the student was distilled from a different model.
+        """
+        from .bundle import load_bundle
+        from .distill import DISTILLED_PATH
+
+        path = DISTILLED_PATH if path is None else path
+        student, _, _, manifest = load_bundle(path)
+        teacher = manifest.get("teacher", {}).get("content_hash")
+        ours = {self.model_hash, (self.manifest or {}).get("source", {}).get("content_hash")} - {None}
+        if teacher and ours and teacher not in ours:
+            raise ValueError(f"distilled model in {path!r} was trained from a different model "
+                             f"({teacher[:12]}); rerun distill_model.py")
+        if student.feature_columns != self.feature_columns:
+            raise ValueError(f"distilled model in {path!r} expects different feature columns")
+        self.distilled = student
+        return self
+
+    def enable_drift_monitor(self, baseline=None, window=500, history=12):
+        """Count every prediction's inputs and results in a ``DriftMonitor``. Returns the monitor.
+
+        ``baseline`` is a snapshot dict or the path of a baseline file (default
+        ``drift_baseline.json`` if it exists, written by ``drift_baseline.py``
+        and checked against the model hash).
+        """
+        from .drift import BASELINE_PATH, DriftMonitor, load_baseline
+
+        if baseline is None and os.path.exists(BASELINE_PATH):
+            baseline = BASELINE_PATH
+        if isinstance(baseline, str):
+            m = self.manifest or {}
+            baseline = load_baseline(baseline, {m.get("content_hash"), m.get("source", {}).get("content_hash")} - {None})
+        self.drift = DriftMonitor.for_screener(self, baseline=baseline, window=window, history=history)
+        return self.drift
+
+    def _build_cascade(self, compiled, manifest):
+        from .cascade import CascadeModel, load_thresholds
+
+        thresholds = self._cascade_thresholds
+        if not isinstance(thresholds, dict):
+            thresholds = load_thresholds(thresholds, model_hash(manifest, self.source))
+        return CascadeModel(compiled, thresholds)
+
+    @property
+    def model_hash(self):
+        """Hash naming the loaded model, for the files derived from it (see ``model_hash``)."""
+        return model_hash(self.manifest, self.source)
+
+    def _scoring_model(self):
+        return self.cascade or self.compiled or self.model
+
+    def _set_artifacts(self, model, encoders, feature_columns, manifest=None):
+        from .labels import LabelTables
+
+        feature_columns = list(feature_columns)
+        from .compiled import CompiledModel
+
+        compiled = cascade = None
+        if isinstance(model, CompiledModel):  # compact export
+            compiled = model
+        elif self._use_compiled:
+            compiled = CompiledModel(model, feature_columns)
+        if self._cascade_thresholds is not None:
+            cascade = self._build_cascade(compiled, manifest)  # may raise before anything is swapped
+        self.model = model
+        self.manifest = manifest
+        self.encoders = encoders
+        self.labels = LabelTables(encoders)
+        self.feature_columns = feature_columns
+        self.compiled = compiled
+        self.cascade = cascade
+        if getattr(self, "profiler", None) is not None:
+            self.profiler.attach(self._scoring_model())
+
+    def reload(self, background=False):
+        """Re-read the artifacts from ``source`` (set by ``load``) and clear the cache.
+
+        With ``background=True`` the artifacts are loaded and the new pool
+        is warmed in a thread, while the current model and pool keep serving;
+        they are swapped in when ready. A second background reload while one
+        runs is ignored, and a failed one marks the cache stale so the next
+        check retries.
+        """
+        if self.source is None:
+            raise ValueError("screener was not created by Screener.load(); nothing to reload")
+        if not background:
+            self._reload()
+        elif self._reloading.acquire(blocking=False):
+            threading.Thread(target=self._reload_in_background, name="screener-reload", daemon=True).start()
+
+    def _reload_in_background(self):
+        try:
+            self._reload()
+        except Exception:
+            if self.cache is not None:
+                self.cache.mark_stale()
+        finally:
+            self._reloading.release()
+
+    def _reload(self):
+        source = default_source() if self._default_source else self.source
+        artifacts = load_artifacts(source)
+        old_pool = new_pool = self.pool
+        if old_pool is not None:
+            from .pool import ScoringPool
+
+            new_pool = ScoringPool(compiled=self._use_compiled, source=source,
+                                   cascade=self._cascade_thresholds, **self._pool_args)
+        # Swap and clear together, so no other thread caches under the new generation from the old model
+        with self.cache._lock if self.cache is not None else contextlib.nullcontext():
+            self._set_artifacts(*artifacts)
+            self.source = source
+            self.pool = new_pool
+            if self.cache is not None:
+                self.cache.clear()
+                self.cache.watch(watch_paths(source))
+        if old_pool is not None:
+            # Jobs already queued on the old pool finish before its workers exit
+            threading.Thread(target=old_pool.shutdown, name="pool-retire", daemon=True).start()
+
+    def frame(self, rows):
+        """Align rows (DataFrame or list of dicts) to ``feature_columns``."""
+        import pandas as pd
+
+        df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        return df.reindex(columns=self.feature_columns, fill_value=0)
+
+    def predict_proba(self, rows, distilled=False):
+        """One ``predict_proba`` call; returns one (n, n_classes) array per condition.
+
+        ``distilled=True`` scores with the student from ``enable_distilled``.
+        """
+        if distilled and self.distilled is None:
+            raise ValueError("no distilled model loaded; call enable_distilled() first")
+        t0 = time.perf_counter()
+        try:
+            if distilled:
+                model, X = self.distilled, self._raw_rows(rows, self.distilled)
+            elif self.compiled is not None:
+                model, X = self.cascade or self.compiled, self._raw_rows(rows)
+            else:
+                model, X = self.model, self.frame(rows)
+        except Exception as e:
+            metrics.stage_error("assemble", e)
+            raise
+        t1 = time.perf_counter()
+        metrics.STAGE["assemble"].observe(t1 - t0)
+        try:
+            probs = model.predict_proba(X)
+        except Exception as e:
+            metrics.stage_error("predict", e)
+            raise
+        metrics.STAGE["predict"].observe(time.perf_counter() - t1)
+        metrics.BATCH_ROWS.observe(len(X))
+        return probs
+
+    def _raw_rows(self, rows, model=None):
+        """Rows in ``feature_columns`` order for the compiled model, without pandas for dict input."""
+        import numpy as np
+
+        if isinstance(rows, np.ndarray):
+            return rows
+        if isinstance(rows, (list, tuple)) and (not rows or isinstance(rows[0], dict)):
+            return (model or self.compiled).rows_from_records(rows)
+        return self.frame(rows).to_numpy(dtype=object)
+
+    def decode(self, probs):
+        """Turn per-condition probability matrices into ConditionResult lists per row."""
+        t0 = time.perf_counter()
+        try:
+            per_condition = [
+                list(map(ConditionResult, [d.condition] * len(d.index), d.label.tolist(), d.confidence.tolist(),
+                         d.is_low.tolist(), d.bucket.tolist(), d.index.tolist()))
+                for d in self.labels.decode(probs)
+            ]
+        except Exception as e:
+            metrics.stage_error("decode", e)
+            raise
+        metrics.STAGE["decode"].observe(time.perf_counter() - t0)
+        return [list(row) for row in zip(*per_condition)]
+
+    def predict_many(self, rows, distilled=False):
+        results = self._predict_many(rows, distilled)
+        metrics.PREDICTED["distilled" if distilled else "full"].inc(len(results))
+        if self.drift is not None:
+            records = isinstance(rows, (list, tuple)) and rows and isinstance(rows[0], dict)
+            self.drift.observe(rows if records else self._raw_rows(rows), results)
+        return results
+
+    def _predict_many(self, rows, distilled):
+        if distilled:  # always in-process and uncached: the student costs microseconds per row
+            return self.decode(self.predict_proba(rows, distilled=True))
+        if not (isinstance(rows, (list, tuple)) and rows and isinstance(rows[0], dict)):
+            return self._score(rows)
+        if self.cache is None:
+            return self._score_records(rows)
+        return self._predict_cached(rows)
+
+    def _score(self, rows):
+        if self.pool is not None:
+            records = rows if isinstance(rows, list) and rows and isinstance(rows[0], dict) else self.frame(rows).to_dict("records")
+            t0 = time.perf_counter()
+            try:
+                results = self.pool.predict_many(records)  # model call and decoding run in the worker
+            except Exception as e:
+                metrics.stage_error("predict", e)
+                raise
+            metrics.STAGE["predict"].observe(time.perf_counter() - t0)
+            metrics.BATCH_ROWS.observe(len(records))
+            return results
+        return self.decode(self.predict_proba(rows))
+
+    def _score_records(self, records):
+        if self.batcher is not None and len(records) == 1:
+            from .pool import ScoringTimeout
+
+            try:
+                return [self.batcher.submit(records[0], timeout=self._batch_timeout)]
+            except ScoringTimeout:
+                raise
+            except TimeoutError as e:
+                raise ScoringTimeout(str(e)) from None
+        return self._score(records)
+
+    def _predict_cached(self, records):
+        from .cache import canonical_key
+
+        if self.cache.source_changed():
+            if self.pool is not None:
+                self.reload(background=True)  # warming new workers takes seconds; the old pool serves meanwhile
+            else:
+                try:
+                    self.reload()
+                except Exception:
+                    # Half-written or broken file: keep serving the loaded model, retry on the next check
+                    self.cache.mark_stale()
+        cols = self.feature_columns
+        keys = [canonical_key([rec.get(c, 0) for c in cols]) for rec in records]
+        generation = self.cache.generation  # read before scoring: puts are dropped if a reload happens meanwhile
+        results = [self.cache.get(k) for k in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            fresh = self._score_records([records[i] for i in missing])
+            for i, res in zip(missing, fresh):
+                results[i] = tuple(res)
+                self.cache.put(keys[i], results[i], generation)
+        return [list(r) for r in results]
+
+    def predict_one(self, profile, answers):
+        t0 = time.perf_counter()
+        try:
+            row = build_input_row(self.feature_columns, profile, answers)
+        except Exception as e:
+            metrics.stage_error("assemble", e)
+            raise
+        metrics.STAGE["assemble"].observe(time.perf_counter() - t0)
+        return self.predict_many([row])[0]
+
+    def _metric_samples(self):
+        """Cache and micro-batcher counters for the metrics export (see ``screening.metrics``)."""
+        if self.cache is not None:
+            s = self.cache.stats()
+            yield "mh_cache_hits_total", "counter", "Prediction cache hits", {}, s["hits"]
+            yield "mh_cache_misses_total", "counter", "Prediction cache misses", {}, s["misses"]
+            yield "mh_cache_evictions_total", "counter", "Prediction cache LRU evictions", {}, s["evictions"]
+            yield "mh_cache_entries", "gauge", "Prediction cache entries", {}, s["entries"]
+        if self.batcher is not None:
+            b = self.batcher
+            yield "mh_microbatch_direct_total", "counter", "Single-row calls scored directly (idle server)", {}, b.direct_calls
+            yield "mh_microbatch_batches_total", "counter", "Coalesced micro-batches", {}, b.batches
+            yield "mh_microbatch_rows_total", "counter", "Rows scored in coalesced micro-batches", {}, b.batched_rows
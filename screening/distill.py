@@ -0,0 +1,104 @@
+"""Distilled student model: one multinomial linear model per condition.
+
+``distill`` fits each student to the full ensemble's soft probabilities on
+synthetic questionnaires (cross-entropy against the teacher's distribution,
+via one weighted sample per class), on the same preprocessed inputs as the
+compiled model. ``features="quadratic"`` adds pairwise products of the
+numeric inputs (age and the 26 answers) for a closer fit at a higher cost.
+Scoring is one matmul and a softmax per condition, NumPy only.
+
+The student is an approximation: use it for bulk screening where a small
+label disagreement with the ensemble is acceptable (see ``fidelity``), and
+select it per call (``Screener.predict_many(rows, distilled=True)``). It is
+saved as a bundle of kind ``"distilled"`` that records its teacher's hash.
+Build one with ``python distill_model.py``.
+"""
+import os
+
+import numpy as np
+
+from .bundle import BundleError, write_bundle
+from .compact import LabelClasses
+from .compiled import CompiledLogistic, CompiledModel
+from .core import CONDITIONS, ROOT
+
+KIND = "distilled"
+DISTILLED_PATH = os.path.join(ROOT, "model_distilled")
+FEATURES = ("linear", "quadratic")
+
+
+class DistilledModel:
+    """``predict_proba`` on raw feature rows, like ``CompiledModel``."""
+
+    rows_from_records = CompiledModel.rows_from_records
+
+    def __init__(self, pre, feature_columns, features="linear"):
+        if features not in FEATURES:
+            raise ValueError(f"unknown student features {features!r}; expected one of {FEATURES}")
+        self.pre = pre
+        self.feature_columns = list(feature_columns)
+        self.features = features
+        self.students = []  # one CompiledLogistic per condition
+        n_num = len(pre.num_keep)
+        self._pairs = np.triu_indices(n_num) if features == "quadratic" else None
+
+    def transform(self, rows):
+        Z = self.pre.transform(rows)
+        if self._pairs is None:
+            return Z
+        num = Z[:, :len(self.pre.num_keep)]
+        i, j = self._pairs
+        return np.hstack([Z, num[:, i] * num[:, j]])
+
+    def predict_proba(self, rows):
+        F = self.transform(rows)
+        return [s.predict_proba(F) for s in self.students]
+
+
+def distill(compiled, rows, features="linear", C=10.0, max_iter=1000):
+    """Fit a ``DistilledModel`` to ``compiled``'s probabilities on ``rows``."""
+    from sklearn.linear_model import LogisticRegression
+
+    student = DistilledModel(compiled.pre, compiled.feature_columns, features)
+    F = student.transform(rows)
+    for P in compiled.predict_proba(rows):
+        k = P.shape[1]
+        lr = LogisticRegression(C=C, max_iter=max_iter)
+        lr.fit(np.repeat(F, k, axis=0), np.tile(np.arange(k), len(F)), sample_weight=P.ravel())
+        student.students.append(CompiledLogistic(lr))
+    return student
+
+
+def fidelity(teacher, student):
+    """Per condition: label agreement and mean KL(teacher || student) in nats."""
+    out = {}
+    for c, p, q in zip(CONDITIONS, teacher, student):
+        kl = np.sum(p * (np.log(np.clip(p, 1e-12, 1.0)) - np.log(np.clip(q, 1e-12, 1.0))), axis=1)
+        out[c] = {"agreement": float((p.argmax(1) == q.argmax(1)).mean()), "kl": float(kl.mean())}
+    return out
+
+
+def save_distilled(path, student, encoders, schema, teacher, report, version=None):
+    """Write a distilled bundle; ``teacher`` is ``{"version", "content_hash"}`` of the ensemble."""
+    labels = {name: LabelClasses(enc.classes_) for name, enc in encoders.items()}
+    validate_distilled(student, labels, student.feature_columns, schema)
+    fields = {"kind": KIND, "schema": schema, "teacher": teacher, "student": report}
+    return write_bundle(path, (student, labels, student.feature_columns), fields, version=version)
+
+
+def validate_distilled(model, encoders, feature_columns, schema=None):
+    """Raise BundleError unless the student, labels and column list agree."""
+    if not isinstance(model, DistilledModel):
+        raise BundleError(f"distilled bundle holds a {type(model).__name__}, expected a DistilledModel")
+    if list(feature_columns) != model.feature_columns:
+        raise BundleError("feature_columns do not match the distilled model")
+    if schema is not None and list(schema.get("columns", [])) != model.feature_columns:
+        raise BundleError("manifest schema does not match the distilled model's columns")
+    if len(model.students) != len(CONDITIONS):
+        raise BundleError(f"model has {len(model.students)} students, expected {len(CONDITIONS)}")
+    for c, s in zip(CONDITIONS, model.students):
+        enc = encoders.get(f"{c} Label")
+        if enc is None:
+            raise BundleError(f"no label encoder for {c!r}")
+        if len(enc.classes_) != s.n_classes:
+            raise BundleError(f"{c}: encoder has {len(enc.classes_)} labels, student predicts {s.n_classes} classes")
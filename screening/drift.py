@@ -0,0 +1,290 @@
+"""Streaming drift monitor: input and prediction histograms vs a stored baseline.
+
+``DriftMonitor.observe`` is fed each scored row with its results (see
+``Screener.enable_drift_monitor``). It bins the row into fixed histograms:
+
+* the 26 answers (0-3, plus "other" for anything else),
+* the profile columns: age and CGPA bands, and the training categories of
+  gender, university, department, year and scholarship (plus "other"),
+* per condition, the predicted label and the confidence in 10% bins.
+
+Counts go into tumbling windows of ``window`` predictions, and the last
+``history`` closed windows are kept, so memory is constant. ``report``
+compares a window (``"current"``, ``"last"``, ``"recent"`` = kept history
+plus the open window, or ``"total"``) with the baseline, per feature, by
+PSI and KL divergence (both with add-half smoothing). A baseline is a
+``snapshot`` of a monitor fed with reference data, e.g. the training set,
+saved with the model hash by ``drift_baseline.py``.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+from collections import deque
+from itertools import repeat
+from operator import add
+from typing import NamedTuple
+
+from .core import CONDITIONS, N_QUESTIONS, PROFILE_KEYS, ROOT
+
+BASELINE_PATH = os.path.join(ROOT, "drift_baseline.json")
+WINDOWS = ("current", "last", "recent", "total")
+AGE_EDGES = [18, 21, 24, 27, 30]
+CGPA_EDGES = [2.0, 2.5, 3.0, 3.5]
+CONFIDENCE_BINS = 10
+OTHER = "other"
+MISSING = "missing"
+# Common PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, >= 0.25 significant shift
+PSI_MODERATE = 0.1
+PSI_SHIFT = 0.25
+_ANSWER_CODES = {0: 0, 1: 1, 2: 2, 3: 3}
+
+
+class Feature(NamedTuple):
+    name: str
+    group: str  # "answers", "profile", "labels" or "confidence"
+    bins: tuple
+    offset: int  # first bin in the flat count vector
+
+
+def _edge_bins(edges, fmt):
+    names = [f"<{fmt(edges[0])}"]
+    names += [f"{fmt(a)}-{fmt(b)}" for a, b in zip(edges, edges[1:])]
+    return tuple(names + [f"{fmt(edges[-1])}+", MISSING])
+
+
+def _edge_code(value, edges):
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        return len(edges) + 1
+    if x != x:  # NaN
+        return len(edges) + 1
+    return bisect.bisect_right(edges, x)
+
+
+def categorical_vocab(model):
+    """Training categories per categorical column index, from a pipeline or a CompiledModel."""
+    if hasattr(model, "pre"):
+        return {i: [str(v) for v in table] for i, table in zip(model.pre.cat_idx, model.pre.cat_tables)}
+    pre = model.steps[0][1]
+    cats = pre.named_transformers_["cat"].named_steps["onehot"].categories_
+    cols = list(pre.feature_names_in_)
+    _, _, cat_cols = next(t for t in pre.transformers_ if t[0] == "cat")
+    return {cols.index(c): [str(v) for v in cat] for c, cat in zip(cat_cols, cats)}
+
+
+def layout(vocab, labels):
+    """Feature list for categorical ``vocab`` ({column index: categories}) and ``labels`` per condition."""
+    features, offset = [], 0
+
+    def push(name, group, bins):
+        nonlocal offset
+        features.append(Feature(name, group, tuple(bins), offset))
+        offset += len(bins)
+
+    for i, key in enumerate(PROFILE_KEYS):
+        if key == "age":
+            push(key, "profile", _edge_bins(AGE_EDGES, str))
+        elif key == "cgpa":
+            push(key, "profile", _edge_bins(CGPA_EDGES, "{:.2f}".format))
+        else:
+            push(key, "profile", list(vocab[i]) + [OTHER])
+    for q in range(N_QUESTIONS):
+        push(f"q{q + 1}", "answers", ["0", "1", "2", "3", OTHER])
+    for c in CONDITIONS:
+        push(f"{c.lower()}_label", "labels", labels[c])
+    for c in CONDITIONS:
+        push(f"{c.lower()}_confidence", "confidence",
+             [f"{10 * k}-{10 * (k + 1)}%" for k in range(CONFIDENCE_BINS)])
+    return features
+
+
+def divergence(p_counts, q_counts):
+    """(PSI, KL(p || q)) of two count vectors, with add-half smoothing."""
+    k = len(p_counts)
+    np_, nq = sum(p_counts) + 0.5 * k, sum(q_counts) + 0.5 * k
+    psi = kl = 0.0
+    for a, b in zip(p_counts, q_counts):
+        p, q = (a + 0.5) / np_, (b + 0.5) / nq
+        r = math.log(p / q)
+        psi += (p - q) * r
+        kl += p * r
+    return psi, kl
+
+
+def status(psi):
+    return "shift" if psi >= PSI_SHIFT else "moderate" if psi >= PSI_MODERATE else "stable"
+
+
+class DriftMonitor:
+    """Thread-safe, constant-memory histograms of scored rows and their results."""
+
+    def __init__(self, feature_columns, vocab, labels, baseline=None, window=500, history=12, min_count=100):
+        self.feature_columns = list(feature_columns)
+        self.features = layout(vocab, labels)
+        self.by_name = {f.name: f for f in self.features}
+        self.size = self.features[-1].offset + len(self.features[-1].bins)
+        self.window = window
+        self.min_count = min_count
+        self._lock = threading.Lock()
+        self._counts = [0] * self.size
+        self._n = 0
+        self._closed = deque(maxlen=history)  # (n, counts) of closed windows
+        self._total = [0] * self.size
+        self._total_n = 0
+        self.baseline = baseline
+
+        by_name = self.by_name
+        self._cat = [(i, by_name[k].offset, {v: j for j, v in enumerate(vocab[i])}, len(vocab[i]))
+                     for i, k in enumerate(PROFILE_KEYS) if k not in ("age", "cgpa")]
+        self._age = (PROFILE_KEYS.index("age"), by_name["age"].offset)
+        self._cgpa = (PROFILE_KEYS.index("cgpa"), by_name["cgpa"].offset)
+        self._answer_offsets = [by_name[f"q{q + 1}"].offset for q in range(N_QUESTIONS)]
+        self._label_offsets = [by_name[f"{c.lower()}_label"].offset for c in CONDITIONS]
+        self._conf_offsets = [by_name[f"{c.lower()}_confidence"].offset for c in CONDITIONS]
+
+    @classmethod
+    def for_screener(cls, screener, **kwargs):
+        model = screener.compiled if screener.compiled is not None else screener.model
+        labels = {t.condition: [str(l) for l in t.labels] for t in screener.labels.tables}
+        return cls(screener.feature_columns, categorical_vocab(model), labels, **kwargs)
+
+    # --- feeding ---
+    def _codes(self, values, results):
+        """Flat bin indices of one row (values in feature_columns order) and its ConditionResults."""
+        a = len(PROFILE_KEYS)
+        idx = list(map(add, self._answer_offsets, map(_ANSWER_CODES.get, values[a:a + N_QUESTIONS], repeat(4))))
+        for i, off, table, other in self._cat:
+            idx.append(off + table.get(values[i], other))
+        i, off = self._age
+        idx.append(off + _edge_code(values[i], AGE_EDGES))
+        i, off = self._cgpa
+        idx.append(off + _edge_code(values[i], CGPA_EDGES))
+        for r, lo, co in zip(results, self._label_offsets, self._conf_offsets):
+            idx.append(lo + r.index)
+            idx.append(co + min(int(r.confidence // 10), CONFIDENCE_BINS - 1))
+        return idx
+
+    def observe(self, rows, results):
+        """Count scored rows: dicts keyed by feature_columns or sequences in that order."""
+        cols = self.feature_columns
+        if len(rows) == 1:  # the UI / service path: plain Python, a few microseconds
+            row = rows[0]
+            values = [row.get(c, 0) for c in cols] if isinstance(row, dict) else row
+            idx = self._codes(values, results[0])
+            with self._lock:
+                counts = self._counts
+                for i in idx:
+                    counts[i] += 1
+                self._n += 1
+                if self._n >= self.window:
+                    self._roll()
+            return
+        import numpy as np
+
+        flat = []
+        for row, res in zip(rows, results):
+            flat.extend(self._codes([row.get(c, 0) for c in cols] if isinstance(row, dict) else row, res))
+        added = np.bincount(np.asarray(flat, dtype=np.intp), minlength=self.size).tolist()
+        with self._lock:
+            self._counts = list(map(add, self._counts, added))
+            self._n += len(rows)
+            if self._n >= self.window:
+                self._roll()
+
+    def _roll(self):
+        self._closed.append((self._n, self._counts))
+        self._total = list(map(add, self._total, self._counts))
+        self._total_n += self._n
+        self._counts = [0] * self.size
+        self._n = 0
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * self.size
+            self._n = 0
+            self._closed.clear()
+            self._total = [0] * self.size
+            self._total_n = 0
+
+    # --- reading ---
+    def counts(self, window="recent"):
+        """(n, flat counts) of a window."""
+        if window not in WINDOWS:
+            raise ValueError(f"unknown window {window!r}; expected one of {WINDOWS}")
+        with self._lock:
+            if window == "current":
+                return self._n, list(self._counts)
+            if window == "last":
+                return self._closed[-1] if self._closed else (0, [0] * self.size)
+            if window == "total":
+                return self._total_n + self._n, list(map(add, self._total, self._counts))
+            n, counts = self._n, list(self._counts)
+            for wn, wc in self._closed:
+                n += wn
+                counts = list(map(add, counts, wc))
+            return n, counts
+
+    def histogram(self, name, window="recent"):
+        """``{bin: [window count, baseline count]}`` of one feature."""
+        f = self.by_name[name]
+        _, counts = self.counts(window)
+        base = self.baseline["counts"].get(name) if self.baseline else None
+        return {b: [counts[f.offset + j], base[j] if base else None] for j, b in enumerate(f.bins)}
+
+    def snapshot(self, window="total"):
+        """JSON-able layout and counts of a window; a saved snapshot is a baseline."""
+        n, counts = self.counts(window)
+        return {"n": n, "features": {f.name: {"group": f.group, "bins": list(f.bins)} for f in self.features},
+                "counts": {f.name: counts[f.offset:f.offset + len(f.bins)] for f in self.features}}
+
+    def report(self, window="recent"):
+        """Per-feature PSI/KL of a window against the baseline, worst first."""
+        n, counts = self.counts(window)
+        out = {"window": window, "n": n, "windows_closed": len(self._closed), "window_size": self.window,
+               "baseline_n": self.baseline["n"] if self.baseline else 0, "features": [], "groups": {}}
+        if self.baseline is None:
+            out["status"] = "no baseline"
+            return out
+        rows = []
+        for f in self.features:
+            base = self.baseline["counts"].get(f.name)
+            if base is None or self.baseline["features"][f.name]["bins"] != list(f.bins):
+                continue  # baseline from a different layout (new categories or labels)
+            psi, kl = divergence(counts[f.offset:f.offset + len(f.bins)], base)
+            rows.append({"feature": f.name, "group": f.group, "psi": psi, "kl": kl,
+                         "status": status(psi) if n >= self.min_count else "insufficient data"})
+        rows.sort(key=lambda r: -r["psi"])
+        out["features"] = rows
+        for r in rows:
+            out["groups"][r["group"]] = max(out["groups"].get(r["group"], 0.0), r["psi"])
+        if n < self.min_count:
+            out["status"] = "insufficient data"
+        else:
+            out["status"] = status(rows[0]["psi"]) if rows else "stable"
+        return out
+
+
+# -----------------------------
+# BASELINE FILES
+# -----------------------------
+def save_baseline(path, snapshot, model_hash=None, source=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(snapshot, model_hash=model_hash, source=source), f, indent=1)
+
+
+def load_baseline(path=BASELINE_PATH, model_hash=None):
+    """A saved baseline; refuses one whose label histograms came from a different model.
+
+    ``model_hash`` is the current model's hash, or a set of accepted hashes.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    saved = data.get("model_hash")
+    accepted = {model_hash} if isinstance(model_hash, str) else set(model_hash or ())
+    if accepted and saved and saved not in accepted:
+        raise ValueError(f"drift baseline in {path!r} was built with a different model "
+                         f"({saved[:12]}); rerun drift_baseline.py")
+    return data
@@ -0,0 +1,93 @@
+"""Label-decoding tables, built once per model load.
+
+For each condition, the encoder's classes are expanded into arrays indexed by
+class index: the label, the low-risk flag, the severity bucket and the display
+labels the apps show. Decoding a batch is then one argmax and a few ``take``
+calls, with no ``inverse_transform`` or substring checks per prediction.
+
+Display styles:
+    en       app_v3 English  ("No/Low Anxiety" for low-risk labels)
+    bn       app_v3 Bangla   (risk level in Bangla)
+    healthy  app / app_v2    ("No Anxiety / Healthy" for the healthiest labels)
+"""
+from typing import NamedTuple
+
+from .core import CONDITIONS, is_low_risk_label, severity_bucket
+
+DISPLAY_STYLES = ("en", "bn", "healthy")
+
+HEALTHY_DISPLAY = {
+    "Minimal Anxiety": "No Anxiety / Healthy",
+    "Low Stress": "No Stress / Healthy",
+    "No Depression": "No Depression / Healthy",
+    "Minimal Depression": "No Depression / Healthy",
+}
+
+
+def display_label(condition, label, style):
+    """The app's display text for one label (only used to build the tables)."""
+    low = is_low_risk_label(label)
+    if style == "en":
+        return f"No/Low {condition}" if low else label
+    if style == "bn":
+        if low: return "ঝুঁকি নেই / কম"
+        if "Moderate" in label: return "মাঝারি"
+        if any(x in label for x in ["Severe", "High"]): return "তীব্র"
+        return "মৃদু"
+    if style == "healthy":
+        return HEALTHY_DISPLAY.get(label, label)
+    raise ValueError(f"unknown display style {style!r}; expected one of {DISPLAY_STYLES}")
+
+
+class ConditionTable(NamedTuple):
+    condition: str
+    labels: object   # (k,) object array: class index -> label
+    is_low: object   # (k,) bool array
+    bucket: object   # (k,) object array
+    display: dict    # style -> (k,) object array
+
+
+class DecodedColumns(NamedTuple):
+    """One condition's decoded batch, as parallel arrays of length n."""
+    condition: str
+    index: object
+    label: object
+    confidence: object  # percent
+    is_low: object
+    bucket: object
+
+
+class LabelTables:
+    """Per-condition decode tables for a set of label encoders."""
+
+    def __init__(self, encoders):
+        import numpy as np
+
+        self.tables = []
+        for c in CONDITIONS:
+            labels = [str(x) for x in encoders[f"{c} Label"].classes_]
+            self.tables.append(ConditionTable(
+                c,
+                np.array(labels, dtype=object),
+                np.array([is_low_risk_label(l) for l in labels], dtype=bool),
+                np.array([severity_bucket(l) for l in labels], dtype=object),
+                {s: np.array([display_label(c, l, s) for l in labels], dtype=object) for s in DISPLAY_STYLES},
+            ))
+        self.by_condition = {t.condition: t for t in self.tables}
+
+    def decode(self, probs):
+        """Per-condition probability matrices -> one DecodedColumns per condition."""
+        import numpy as np
+
+        out = []
+        for t, p in zip(self.tables, probs):
+            p = np.asarray(p)
+            idx = p.argmax(axis=1)
+            conf = np.take_along_axis(p, idx[:, None], axis=1)[:, 0] * 100
+            out.append(DecodedColumns(t.condition, idx, t.labels.take(idx), conf,
+                                      t.is_low.take(idx), t.bucket.take(idx)))
+        return out
+
+    def display(self, condition, index, style="en"):
+        """Display label for a class index (scalar or array of indices)."""
+        return self.by_condition[condition].display[style].take(index)
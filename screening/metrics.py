@@ -0,0 +1,286 @@
+"""Process-wide operational metrics with Prometheus text export (standard library only).
+
+The scoring code updates a few module-level metrics as it runs: model
+loads and failures by exception type, per-stage latency histograms
+(``load``, ``assemble``, ``predict``, ``decode``, ``report``)
+and errors, scored rows, and rows per model call. Each update is one lock
+and an add (a ``bisect`` for histograms), well under a microsecond.
+
+State that is already counted elsewhere (prediction cache, micro-batcher,
+assessment store, active sessions) is not duplicated on the hot path:
+objects register a collector callback (``Registry.add_collector``) that is
+read only at export time. ``REGISTRY.render()`` returns the text
+exposition format (version 0.0.4); ``serve.py`` serves it at ``GET
+/metrics``, and ``start_textfile_writer`` rewrites a file periodically
+(e.g. for node_exporter's textfile collector) for the Streamlit apps.
+"""
+import bisect
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+STAGES = ("load", "assemble", "predict", "decode", "report")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+# -----------------------------
+# METRIC TYPES
+# -----------------------------
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Metric:
+    """A named metric family; ``labels(...)`` returns (and caches) one child per label set."""
+
+    def __init__(self, kind, name, doc, labelnames=(), buckets=None):
+        self.kind = kind
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(key, _Histogram(self.buckets) if self.kind == "histogram" else _Value())
+        return child
+
+    # Unlabelled shortcuts
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set(self, value):
+        self._default.set(value)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, child in sorted(self._children.items()):
+            if self.kind != "histogram":
+                yield f"{self.name}{_labels(self.labelnames, key)} {_number(child.value)}"
+                continue
+            counts, total = child.snapshot()
+            running = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                running += n
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _number(bound))])} {running}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {running}"
+
+
+class SessionTracker:
+    """Active sessions: distinct ids seen within ``ttl`` seconds, counted at export time.
+
+    Ids are kept oldest-touch first, so each ``touch`` drops the expired ones
+    from the front; past ``max_sessions`` the oldest are dropped too.
+    """
+
+    def __init__(self, ttl=300.0, max_sessions=100_000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def touch(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            self._seen[session_id] = now
+            self._seen.move_to_end(session_id)
+            self._prune(now)
+            while len(self._seen) > self.max_sessions:
+                self._seen.popitem(last=False)
+
+    def active(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            return len(self._seen)
+
+    def _prune(self, now):
+        cutoff = now - self.ttl
+        while self._seen and next(iter(self._seen.values())) < cutoff:
+            self._seen.popitem(last=False)
+
+    def samples(self):
+        yield "mh_active_sessions", "gauge", f"Sessions active within the last {self.ttl:.0f} s", {}, self.active()
+
+
+# -----------------------------
+# REGISTRY
+# -----------------------------
+class Registry:
+    """Metric families plus export-time collectors."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name, doc, labelnames=(), buckets=None):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(kind, name, doc, labelnames, buckets)
+            elif metric.kind != kind or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name!r} already registered as a {metric.kind} {metric.labelnames}")
+            return metric
+
+    def counter(self, name, doc, labelnames=()):
+        return self._get("counter", name, doc, labelnames)
+
+    def gauge(self, name, doc, labelnames=()):
+        return self._get("gauge", name, doc, labelnames)
+
+    def histogram(self, name, doc, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get("histogram", name, doc, labelnames, buckets)
+
+    def add_collector(self, fn):
+        """Register ``fn() -> iterable of (name, kind, doc, labels dict, value)``, read at export time.
+
+        Bound methods are held weakly, so a collected screener or store drops
+        out of the export. Samples with the same name and labels are summed.
+        """
+        ref = weakref.WeakMethod(fn) if hasattr(fn, "__self__") else (lambda: fn)
+        with self._lock:
+            self._collectors.append(ref)
+
+    def _collected(self):
+        families = {}
+        with self._lock:
+            self._collectors = [ref for ref in self._collectors if ref() is not None]
+            collectors = [ref() for ref in self._collectors]
+        for fn in collectors:
+            if fn is None:
+                continue
+            for name, kind, doc, labels, value in fn():
+                fam = families.setdefault(name, (kind, doc, {}))
+                key = tuple(sorted(labels.items()))
+                fam[2][key] = fam[2].get(key, 0) + value
+        return families
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        out = []
+        for metric in metrics:
+            out.extend(metric.lines())
+        for name, (kind, doc, samples) in sorted(self._collected().items()):
+            out.append(f"# HELP {name} {doc}")
+            out.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(samples.items()):
+                out.append(f"{name}{_labels([k for k, _ in key], [v for _, v in key])} {_number(value)}")
+        return "\n".join(out) + "\n"
+
+    def write_textfile(self, path):
+        """Write ``render()`` to ``path`` atomically (temp file + rename)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def start_textfile_writer(self, path, interval=15.0):
+        """Rewrite ``path`` every ``interval`` seconds from a daemon thread. Returns the thread."""
+        def run():
+            while True:
+                try:
+                    self.write_textfile(path)
+                except OSError:
+                    pass  # e.g. directory not there yet; retry on the next tick
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run, name="metrics-textfile", daemon=True)
+        thread.start()
+        return thread
+
+
+# -----------------------------
+# PROCESS METRICS
+# -----------------------------
+REGISTRY = Registry()
+SESSIONS = SessionTracker()
+REGISTRY.add_collector(SESSIONS.samples)
+
+MODEL_LOADS = REGISTRY.counter("mh_model_loads_total", "Model artifact loads by result and error type",
+                               ["result", "error"])
+STAGE_SECONDS = REGISTRY.histogram("mh_stage_seconds", "Wall time per scoring stage", ["stage"])
+STAGE_ERRORS = REGISTRY.counter("mh_stage_errors_total", "Exceptions raised per scoring stage", ["stage", "error"])
+PREDICTIONS = REGISTRY.counter("mh_predictions_total", "Rows scored, cache hits included", ["model"])
+BATCH_ROWS = REGISTRY.histogram("mh_model_batch_rows", "Rows per model call", buckets=SIZE_BUCKETS)
+
+# Pre-created children for the hot path (no label lookup per call)
+STAGE = {s: STAGE_SECONDS.labels(s) for s in STAGES}
+PREDICTED = {m: PREDICTIONS.labels(m) for m in ("full", "distilled")}
+
+
+def stage_error(stage, exc):
+    STAGE_ERRORS.labels(stage, type(exc).__name__).inc()
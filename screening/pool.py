@@ -0,0 +1,131 @@
+"""Opt-in process pool that keeps the model out of the Streamlit server process.
+
+Each worker loads the artifacts once in its initializer (with BLAS/OpenMP
+thread limits applied before numpy is imported) and is warmed up with a
+dummy prediction, so the first real job does not pay for loading. Bundle
+arrays are memory-mapped, so the workers share their pages. Jobs carry
+a deadline; a missed deadline raises ``ScoringTimeout`` instead of blocking
+the session. A worker that fails to load sends its exception back, and
+``ScoringPool`` re-raises it at once (with the worker's traceback as the cause).
+"""
+import os
+import threading
+
+# Environment variables honoured by OpenBLAS/MKL/OpenMP when the worker imports numpy
+_THREAD_ENV_VARS = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                    "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS"]
+
+_SCREENER = None  # per-worker Screener, set by _init_worker
+
+
+class ScoringTimeout(TimeoutError):
+    """The scoring job did not finish before its deadline."""
+
+
+class _WorkerTraceback(Exception):
+    """Carries a worker's formatted traceback as the cause of a re-raised startup error."""
+
+
+def _init_worker(blas_threads, compiled, source, cascade, ready):
+    try:
+        _load_worker(blas_threads, compiled, source, cascade)
+    except BaseException as e:
+        # Report it, or the parent only sees workers respawning until the start timeout
+        import pickle
+        import traceback
+
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        ready.put(("error", e, traceback.format_exc()))
+        raise
+    ready.put(os.getpid())
+
+
+def _load_worker(blas_threads, compiled, source, cascade):
+    global _SCREENER
+    if blas_threads:
+        for var in _THREAD_ENV_VARS:
+            os.environ[var] = str(blas_threads)
+    from .core import Screener
+
+    if blas_threads:
+        try:
+            from threadpoolctl import threadpool_limits
+
+            threadpool_limits(blas_threads)
+        except ImportError:
+            pass
+    _SCREENER = Screener.load(source, compiled=compiled)
+    if cascade is not None:
+        _SCREENER.enable_cascade(cascade)
+    # Warm-up call so the first real job doesn't pay for lazy imports / first-touch costs
+    _SCREENER.predict_many([{c: 0 for c in _SCREENER.feature_columns}])
+
+
+def _score(records):
+    return _SCREENER.predict_many(records)
+
+
+class ScoringPool:
+    """Pool of ``n_workers`` processes, each holding its own loaded model."""
+
+    def __init__(self, n_workers=2, blas_threads=1, compiled=False, source=None, cascade=None, timeout=10.0, start_timeout=120.0):
+        import multiprocessing
+
+        self.n_workers = n_workers
+        self.timeout = timeout
+        # spawn: forking a multi-threaded server process (Streamlit) is unsafe
+        ctx = multiprocessing.get_context("spawn")
+        ready = ctx.Queue()
+        self._pool = ctx.Pool(processes=n_workers, initializer=_init_worker,
+                              initargs=(blas_threads, compiled, source, cascade, ready))
+        self._lock = threading.Lock()
+        self.timeouts = 0
+        self.pending = 0  # jobs submitted and not finished, including ones whose caller hit the deadline
+        pids = []
+        while len(pids) < n_workers:
+            try:
+                item = ready.get(timeout=start_timeout)
+            except Exception:
+                self._pool.terminate()
+                raise RuntimeError(f"scoring pool workers did not start within {start_timeout} s") from None
+            if isinstance(item, tuple):  # ("error", exception, traceback) from a failed initializer
+                self._pool.terminate()
+                raise item[1] from _WorkerTraceback(f"in a scoring pool worker:\n{item[2]}")
+            pids.append(item)
+        self.worker_pids = sorted(pids)
+
+    def predict_many(self, records, timeout=None):
+        """Score a list of feature dicts in a worker; raises ScoringTimeout past the deadline."""
+        import multiprocessing
+
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self.pending += 1
+        job = self._pool.apply_async(_score, (list(records),), callback=self._finished, error_callback=self._finished)
+        try:
+            return job.get(timeout=timeout)
+        except multiprocessing.TimeoutError:
+            # A running job cannot be interrupted; it finishes in the worker and is discarded
+            with self._lock:
+                self.timeouts += 1
+            raise ScoringTimeout(f"scoring did not finish within {timeout} s") from None
+
+    def _finished(self, _):
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self, wait=True):
+        if wait:
+            self._pool.close()
+            self._pool.join()
+        else:
+            self._pool.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,152 @@
+"""Opt-in per-stage timing of the loaded model.
+
+``ModelProfiler.attach`` wraps the prediction methods of the pipeline's
+stages on the *instances* (the ColumnTransformer, each MultiOutputClassifier
+output, and the LogisticRegression and SVC voters inside each
+VotingClassifier, or the equivalent parts of a ``CompiledModel``). Each call
+then records its wall time and row count. ``detach`` removes the wrappers, so
+a screener without a profiler runs the unmodified estimators with zero
+overhead.
+
+Stage names: ``predict_proba`` (the whole model call), ``preprocess``,
+``shared_kernel`` (compiled model only), ``<Condition>`` (one
+VotingClassifier) and ``<Condition>/<voter>``.
+"""
+import threading
+import time
+from functools import wraps
+
+from .core import CONDITIONS
+
+
+def _voter_name(est):
+    name = type(est).__name__
+    if "Logistic" in name:
+        return "LogisticRegression"
+    if "SVC" in name:
+        return "SVC"
+    return name
+
+
+class StageStats:
+    __slots__ = ("calls", "rows", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class ModelProfiler:
+    """Aggregated wall time and call counts per pipeline stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._order = []
+        self._patched = []  # (object, attribute) pairs to restore on detach
+        self._local = threading.local()  # per thread: inner-stage times of the call in progress, and ``last``
+
+    # --- instrumentation ---
+    def attach(self, model):
+        """Wrap the stages of a fitted pipeline, CompiledModel or CascadeModel. Returns self."""
+        self.detach()
+        self._wrap(model, "predict_proba", "predict_proba", top=True)
+        model = getattr(model, "compiled", model)  # a CascadeModel scores through its CompiledModel's parts
+        if hasattr(model, "outputs"):  # CompiledModel
+            self._wrap(model.pre, "transform", "preprocess")
+            for k in getattr(model, "kernels", []):
+                self._wrap(k, "kernel", "shared_kernel")
+            for c, out in zip(CONDITIONS, model.outputs):
+                self._wrap(out, "predict_proba", c)
+                for member in out.members:
+                    self._wrap(member, "predict_proba", f"{c}/{_voter_name(member)}")
+        else:
+            self._wrap(model.steps[0][1], "transform", "preprocess")
+            for c, voting in zip(CONDITIONS, model.steps[-1][1].estimators_):
+                self._wrap(voting, "predict_proba", c)
+                for est in voting.estimators_:
+                    self._wrap(est, "predict_proba", f"{c}/{_voter_name(est)}")
+        return self
+
+    def detach(self):
+        for obj, attr in self._patched:
+            obj.__dict__.pop(attr, None)
+        self._patched = []
+
+    def _wrap(self, obj, attr, stage, top=False):
+        fn = getattr(obj, attr)
+        record = self._record
+
+        @wraps(fn)
+        def timed(X, *args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(X, *args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - t0, len(X), top)
+
+        if stage not in self._stats:
+            self._stats[stage] = StageStats()
+            self._order.append(stage)
+        obj.__dict__[attr] = timed  # instance attribute shadows the class method
+        self._patched.append((obj, attr))
+
+    def _record(self, stage, elapsed, rows, top):
+        pending = self._local.__dict__.setdefault("pending", {})
+        pending[stage] = elapsed * 1000
+        if top:  # inner stages of this call finished first, on this thread
+            self._local.pending = {}
+        with self._lock:
+            s = self._stats[stage]
+            s.calls += 1
+            s.rows += rows
+            s.total += elapsed
+            if elapsed > s.max:
+                s.max = elapsed
+        if top:
+            self._local.last = pending
+
+    # --- reporting ---
+    @property
+    def last(self):
+        """Stage -> ms of the most recent top-level call made on the calling thread.
+
+        Per thread, so a Streamlit rerun sees its own call and not another
+        session's (the stage totals in ``table`` cover all threads).
+        """
+        return getattr(self._local, "last", {})
+
+    def reset(self):
+        with self._lock:
+            for stage in self._stats:
+                self._stats[stage] = StageStats()
+        self._local.__dict__.pop("last", None)
+
+    def table(self):
+        """One dict per stage: calls, rows, total/mean/max ms and share of predict_proba time."""
+        with self._lock:
+            stats = {k: (v.calls, v.rows, v.total, v.max) for k, v in self._stats.items()}
+        top = stats.get("predict_proba", (0, 0, 0.0, 0.0))[2]
+        rows = []
+        for stage in self._order:
+            calls, n, total, mx = stats[stage]
+            rows.append({
+                "stage": stage,
+                "calls": calls,
+                "rows": n,
+                "total_ms": total * 1000,
+                "mean_ms": total * 1000 / calls if calls else 0.0,
+                "max_ms": mx * 1000,
+                "share": total / top if top else 0.0,
+            })
+        return rows
+
+    def format_table(self):
+        lines = [f"{'stage':34s} {'calls':>7s} {'rows':>8s} {'total ms':>10s} {'mean ms':>9s} {'max ms':>9s} {'share':>6s}"]
+        for r in self.table():
+            indent = "  " * r["stage"].count("/") + ("" if r["stage"] == "predict_proba" else "  ")
+            lines.append(f"{indent + r['stage']:34s} {r['calls']:>7d} {r['rows']:>8d} {r['total_ms']:>10.2f} "
+                         f"{r['mean_ms']:>9.3f} {r['max_ms']:>9.3f} {r['share']:>6.1%}")
+        return "\n".join(lines)
@@ -0,0 +1,177 @@
+"""Successive-halving hyperparameter search over the voting members, scored on accuracy and serving cost.
+
+Every candidate is one setting of the LogisticRegression ``C``, the SVC
+``C`` and ``gamma`` and the soft-voting weights, applied to all three
+outputs. Each candidate is cross-validated on seeded folds (see
+``screening.training``) and scored on three objectives:
+
+* ``macro_f1``: macro-F1 averaged over the three conditions (higher is better),
+* ``latency_ms``: single-row ``predict_proba`` time of the candidate's
+  first-fold model compiled (``CompiledModel``, the serving path), timed
+  in the calling process after the round's fits, lower is better,
+* ``support_vectors``: kernel rows per prediction (the union of the three
+  SVCs' support vectors when they share a kernel), lower is better.
+
+Successive halving: the first round scores all candidates on a small,
+seeded subset of the rows; each next round keeps the best ``1 / factor``
+and multiplies the rows by ``factor``, so the last round uses all rows.
+"Best" ranks by Pareto front (non-dominated sorting on the three
+objectives) and then by macro-F1, so a fast, slightly less accurate
+candidate is not dropped just for its F1. All (candidate, fold) fits of a
+round run in parallel; with a ``memory`` cache directory each fold's
+preprocessing is fitted once per round and shared by every candidate.
+``pareto_front`` of the last round is what to choose the deployed model from.
+"""
+import itertools
+import math
+import time
+
+import numpy as np
+
+from .core import CONDITIONS
+from .training import SEED, build_pipeline, fold_scores, folds
+
+GRID = {
+    "lr_C": [0.1, 1.0, 10.0],
+    "svc_C": [0.3, 1.0, 3.0, 10.0],
+    "svc_gamma": ["scale", 0.01, 0.03, 0.1],
+    "weights": [None, [2.0, 1.0], [1.0, 2.0]],
+}
+# (key, +1 maximize / -1 minimize, relative difference below which two candidates tie)
+OBJECTIVES = (("macro_f1", 1, 0.0), ("latency_ms", -1, 0.1), ("support_vectors", -1, 0.0))
+LATENCY_ROWS = 16    # rows scored one at a time per latency measurement
+LATENCY_REPEAT = 5
+
+
+def candidates(grid=None):
+    """Every combination of the grid's values, as ``build_pipeline`` keyword dicts."""
+    grid = GRID if grid is None else grid
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def dominates(a, b):
+    """``a`` is at least as good as ``b`` on every objective and better on one.
+
+    Latencies within 10% tie: single-row timings are noisy, and a
+    difference that small should not put a candidate on the frontier.
+    """
+    better = []
+    for key, sign, tolerance in OBJECTIVES:
+        d = sign * (a[key] - b[key])
+        better.append(0 if abs(d) <= tolerance * max(abs(a[key]), abs(b[key])) else d)
+    return all(d >= 0 for d in better) and any(d > 0 for d in better)
+
+
+def pareto_ranks(results):
+    """Non-dominated sorting: 0 for the Pareto front, 1 for the front without it, ..."""
+    ranks = [None] * len(results)
+    remaining = set(range(len(results)))
+    rank = 0
+    while remaining:
+        front = {i for i in remaining if not any(dominates(results[j], results[i]) for j in remaining if j != i)}
+        for i in front:
+            ranks[i] = rank
+        remaining -= front
+        rank += 1
+    return ranks
+
+
+def pareto_front(results):
+    """The non-dominated results, most accurate first."""
+    ranks = pareto_ranks(results)
+    return sorted((r for r, k in zip(results, ranks) if k == 0), key=lambda r: -r["macro_f1"])
+
+
+def fit_candidate_fold(X, Y, train, test, feature_columns, params, memory=None, seed=SEED, keep_compiled=False):
+    """Fit one candidate on one fold: scores, support vectors and, with ``keep_compiled``, the compiled model.
+
+    Only the compiled model of one fold per candidate is timed, so the other
+    folds do not ship theirs back from the worker.
+    """
+    from .compiled import CompiledModel
+    from .core import silence_imputer_warning
+
+    silence_imputer_warning()
+    model = build_pipeline(feature_columns, memory=memory, seed=seed, **params)
+    t0 = time.perf_counter()
+    model.fit(X.iloc[train], Y[train])
+    fit_seconds = time.perf_counter() - t0
+    scores = fold_scores(Y[test], model.predict(X.iloc[test]))
+    compiled = CompiledModel(model, feature_columns)
+    support_vectors = sum(len(k.support_vectors) for k in compiled.kernels) + sum(
+        len(m.support_vectors) for out in compiled.outputs for m in out.members
+        if hasattr(m, "support_vectors") and m.shared is None)
+    result = {"scores": scores, "support_vectors": support_vectors, "fit_seconds": fit_seconds}
+    if keep_compiled:
+        result["compiled"] = compiled
+    return result
+
+
+def single_row_latency(models, rows, repeat=LATENCY_REPEAT):
+    """Ms to score one row: per model, the median over ``rows`` of each row's best of ``repeat`` calls.
+
+    The models are timed in turn inside each repetition, in this process
+    and after the parallel fits, so no model is timed under more load than another.
+    """
+    best = np.full((len(models), len(rows)), np.inf)
+    for _ in range(repeat):
+        for i, model in enumerate(models):
+            for r in range(len(rows)):
+                t0 = time.perf_counter()
+                model.predict_proba(rows[r:r + 1])
+                best[i, r] = min(best[i, r], time.perf_counter() - t0)
+    return list(np.median(best, axis=1) * 1000)
+
+
+def summarize_candidate(params, fold_results, latency_ms, rows, round_):
+    per_condition = {c: float(np.mean([f["scores"][c]["macro_f1"] for f in fold_results])) for c in CONDITIONS}
+    return {
+        "params": params,
+        "round": round_,
+        "rows": rows,
+        "macro_f1": float(np.mean(list(per_condition.values()))),
+        "macro_f1_per_condition": per_condition,
+        "accuracy": {c: float(np.mean([f["scores"][c]["accuracy"] for f in fold_results])) for c in CONDITIONS},
+        "latency_ms": float(latency_ms),
+        "support_vectors": int(np.median([f["support_vectors"] for f in fold_results])),
+        "fit_seconds": float(sum(f["fit_seconds"] for f in fold_results)),
+    }
+
+
+def successive_halving(X, Y, feature_columns, params_list, factor=3, min_rows=300, n_splits=3, n_jobs=-1,
+                       memory=None, seed=SEED, log=None):
+    """Run the halving rounds; returns ``[{"rows", "candidates", "seconds", "results"}]`` per round."""
+    from joblib import Parallel, delayed
+
+    if factor < 2:
+        raise ValueError("factor must be >= 2")
+    n_rows = len(X)
+    n_rounds = 1 + max(0, min(math.ceil(math.log(len(params_list), factor)) - 1,
+                              math.floor(math.log(max(n_rows / min_rows, 1), factor))))
+    order = np.random.default_rng(seed).permutation(n_rows)  # nested row subsets, one per round
+    survivors = list(params_list)
+    rounds = []
+    for r in range(n_rounds):
+        rows = n_rows if r == n_rounds - 1 else max(min_rows, n_rows // factor ** (n_rounds - 1 - r))
+        subset = np.sort(order[:rows])
+        Xr, Yr = X.iloc[subset].reset_index(drop=True), Y[subset]
+        splits = folds(rows, n_splits, seed)
+        t0 = time.perf_counter()
+        fits = Parallel(n_jobs=n_jobs)(
+            delayed(fit_candidate_fold)(Xr, Yr, train, test, feature_columns, p, memory, seed, keep_compiled=k == 0)
+            for p in survivors for k, (train, test) in enumerate(splits))
+        timing_rows = Xr.iloc[splits[0][1][:LATENCY_ROWS]].to_numpy(dtype=object)
+        latency = single_row_latency([fits[i * n_splits].pop("compiled") for i in range(len(survivors))], timing_rows)
+        results = [summarize_candidate(p, fits[i * n_splits:(i + 1) * n_splits], latency[i], rows, r)
+                   for i, p in enumerate(survivors)]
+        rounds.append({"rows": rows, "candidates": len(survivors), "seconds": time.perf_counter() - t0,
+                       "results": results})
+        if log:
+            log(f"round {r + 1}/{n_rounds}: {len(survivors)} candidates on {rows} rows, "
+                f"{rounds[-1]['seconds']:.1f} s")
+        if r < n_rounds - 1:
+            ranks = pareto_ranks(results)
+            keep = sorted(range(len(results)), key=lambda i: (ranks[i], -results[i]["macro_f1"]))
+            survivors = [results[i]["params"] for i in keep[:max(1, math.ceil(len(results) / factor))]]
+    return rounds
@@ -0,0 +1,74 @@
+"""Batched one-step what-if analysis of a student's answers.
+
+``what_if`` builds the submitted row and every single-answer change by one
+level (``+1``/``-1`` within 0-3, so 26 to 52 variants) and scores them all
+in one batched model call, instead of one model call per variant. For
+each variant and condition it reports how the probability of the currently
+predicted label moves (in percentage points) and the label the changed
+answer would get. Each condition's entries are ranked on their own, label
+changes first and then by the size of the shift, so the answers that drive
+that condition's result come out on top.
+"""
+from typing import NamedTuple
+
+from .core import CONDITIONS, N_QUESTIONS, build_input_row
+
+MAX_LEVEL = 3  # answers run 0 ("Not at all") to 3 ("Very Often")
+
+
+class WhatIf(NamedTuple):
+    question: int        # 1-based question number
+    delta: int           # +1 or -1 answer levels
+    condition: str
+    shift: float         # change of the current label's probability, percentage points
+    label: str           # label predicted after the change
+    index: int           # its class index (for ``LabelTables.display``)
+    changes_label: bool
+
+
+def variants(answers):
+    """(question index, delta) for every one-level change that stays within 0..MAX_LEVEL."""
+    return [(i, d) for i in range(N_QUESTIONS) for d in (-1, 1) if 0 <= int(answers[i]) + d <= MAX_LEVEL]
+
+
+def what_if(screener, profile, answers, conditions=CONDITIONS, top=None):
+    """``{condition: ranked WhatIf entries}`` for all one-level answer changes, from one batched model call.
+
+    ``top`` keeps that many entries per condition (only those are built).
+    Scores in process with the screener's model; the prediction cache,
+    micro-batcher and worker pool are not involved. A compiled model (without
+    the cascade) updates the base row's kernel per variant instead of
+    scoring the variants from scratch (``CompiledModel.predict_proba_variants``).
+    """
+    import numpy as np
+
+    cols = screener.feature_columns
+    base = build_input_row(cols, profile, answers)
+    changes = variants(answers)
+    if screener.compiled is not None and screener.cascade is None:
+        probs = screener.compiled.predict_proba_variants(
+            [base.get(c, 0) for c in cols], [7 + i for i, _ in changes], [d for _, d in changes])
+    else:
+        rows = [base]
+        for i, d in changes:
+            row = dict(base)
+            row[cols[7 + i]] = int(answers[i]) + d
+            rows.append(row)
+        probs = screener.predict_proba(rows)
+
+    out = {}
+    for table, p in zip(screener.labels.tables, probs):
+        if table.condition not in conditions:
+            continue
+        p = np.asarray(p)
+        current = int(p[0].argmax())
+        shift = (p[1:, current] - p[0, current]) * 100
+        new = p[1:].argmax(axis=1)
+        moved = new != current
+        order = np.lexsort((-np.abs(shift), ~moved))[:top]  # label changes first, then the largest shifts
+        out[table.condition] = [
+            WhatIf(changes[v][0] + 1, changes[v][1], table.condition, float(shift[v]),
+                   str(table.labels[new[v]]), int(new[v]), bool(moved[v]))
+            for v in order.tolist()
+        ]
+    return out
@@ -0,0 +1,228 @@
+"""Optional local assessment store: SQLite in WAL mode behind a batching writer.
+
+``AssessmentStore.record`` converts an assessment to a row, puts it on an
+in-memory queue and returns, so the UI never waits for the disk. One
+background thread drains the queue and inserts up to ``batch_size`` rows per
+transaction, waiting at most ``flush_ms`` after the first queued row. Each
+batch commits atomically. WAL mode lets readers (exports, analytics) query
+while the writer commits. ``flush`` blocks until everything queued so far is
+on disk; ``close`` (also run at interpreter exit) flushes and stops the
+thread. If the queue ever holds ``max_pending`` rows, further records are
+counted as dropped instead of blocking the caller. Unless ``rollups=False``,
+each batch also updates the cohort rollups of ``screening.analytics`` in the
+same transaction.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+from . import metrics
+from .core import CONDITIONS, N_QUESTIONS, PROFILE_KEYS, is_emergency
+
+TABLE = "assessments"
+ANSWER_COLUMNS = [f"q{i + 1}" for i in range(N_QUESTIONS)]
+RESULT_COLUMNS = [f"{c.lower()}_{field}" for c in CONDITIONS for field in ("label", "confidence")]
+COLUMNS = (["created", "session", "model_version", "name"] + PROFILE_KEYS + ANSWER_COLUMNS
+           + RESULT_COLUMNS + ["emergency"])
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    session TEXT,
+    model_version TEXT,
+    name TEXT,
+    age TEXT, gender TEXT, uni TEXT, dept TEXT, year TEXT, cgpa REAL, sch TEXT,
+    {", ".join(f"{q} INTEGER NOT NULL" for q in ANSWER_COLUMNS)},
+    {", ".join(f"{c} {'REAL' if c.endswith('confidence') else 'TEXT'} NOT NULL" for c in RESULT_COLUMNS)},
+    emergency INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {TABLE}_created ON {TABLE} (created);
+"""
+INSERT = f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+_STOP = object()
+
+
+def connect(path, readonly=False):
+    """A connection to the store with the WAL settings; ``readonly`` for readers."""
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable at each WAL checkpoint, no fsync per commit
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def assessment_row(profile, answers, results, emergency=None, session=None, model_version=None, created=None):
+    """One ``assessments`` row (in ``COLUMNS`` order) from the apps' profile, answers and results."""
+    if len(answers) != N_QUESTIONS:
+        raise ValueError(f"expected {N_QUESTIONS} answers, got {len(answers)}")
+    by_condition = {r.condition: r for r in results}
+    outcome = []
+    for c in CONDITIONS:
+        r = by_condition[c]
+        outcome += [r.label, float(r.confidence)]
+    cgpa = profile.get("cgpa")
+    return (
+        time.time() if created is None else created, session, model_version, profile.get("name"),
+        *[str(profile.get(k)) if profile.get(k) is not None else None for k in PROFILE_KEYS[:5]],
+        None if cgpa is None else float(cgpa), profile.get("sch"),
+        *[int(a) for a in answers], *outcome,
+        int(is_emergency(answers) if emergency is None else emergency),
+    )
+
+
+class AssessmentStore:
+    """Non-blocking writes of assessments to a SQLite database."""
+
+    def __init__(self, path, batch_size=256, flush_ms=50.0, max_pending=100_000, rollups=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self._update_rollups = None
+        conn = connect(path)
+        try:
+            conn.executescript(SCHEMA)
+            if rollups:  # cohort rollups (screening.analytics), updated in each batch's transaction
+                from .analytics import ensure_rollups, update_rollups
+                ensure_rollups(conn)
+                self._update_rollups = update_rollups
+        finally:
+            conn.close()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="assessment-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        metrics.REGISTRY.add_collector(self._metric_samples)
+
+    # --- writing ---
+    def record(self, profile, answers, results, emergency=None, session=None, model_version=None):
+        """Queue one assessment; returns False if it was dropped (queue full or store closed)."""
+        return self.record_row(assessment_row(profile, answers, results, emergency, session, model_version))
+
+    def record_row(self, row):
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def flush(self, timeout=None):
+        """Block until every row queued before this call is committed. Returns False on timeout."""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """Flush and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        conn = connect(self.path)
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_ms / 1000
+            # Gather rows until the batch is full, the wait is over, or a flush/stop marker arrives
+            while len(batch) < self.batch_size and isinstance(batch[-1], tuple):
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=wait))
+                except queue.Empty:
+                    break
+            rows = [b for b in batch if isinstance(b, tuple)]
+            if rows:
+                self._write(conn, rows)
+            for b in batch:
+                if isinstance(b, threading.Event):
+                    b.set()
+                elif b is _STOP:
+                    stop = True
+        # Rows queued behind the stop marker (racing with close) are still written
+        rest = []
+        while True:
+            try:
+                rest.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        rows = [b for b in rest if isinstance(b, tuple)]
+        if rows:
+            self._write(conn, rows)
+        for b in rest:
+            if isinstance(b, threading.Event):
+                b.set()
+        conn.close()
+
+    def _write(self, conn, rows):
+        try:
+            with conn:  # one transaction per batch
+                conn.executemany(INSERT, rows)
+                if self._update_rollups:
+                    self._update_rollups(conn, rows)
+        except sqlite3.Error as e:
+            with self._lock:
+                self.errors += len(rows)
+                self.last_error = f"{type(e).__name__}: {e}"
+            return
+        with self._lock:
+            self.written += len(rows)
+            self.batches += 1
+
+    def _metric_samples(self):
+        s = self.stats()
+        yield "mh_store_rows_written_total", "counter", "Assessments committed to the store", {}, s["written"]
+        yield "mh_store_rows_dropped_total", "counter", "Assessments dropped (queue full or store closed)", {}, s["dropped"]
+        yield "mh_store_rows_failed_total", "counter", "Assessments lost to database errors", {}, s["errors"]
+        yield "mh_store_pending_rows", "gauge", "Assessments queued for the writer", {}, s["pending"]
+
+    # --- reading ---
+    def stats(self):
+        with self._lock:
+            return {"written": self.written, "batches": self.batches, "pending": self._queue.qsize(),
+                    "dropped": self.dropped, "errors": self.errors, "last_error": self.last_error,
+                    "mean_batch": self.written / self.batches if self.batches else 0.0}
+
+    def count(self):
+        conn = connect(self.path, readonly=True)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def recent(self, limit=50):
+        """The latest ``limit`` committed assessments as dicts, newest first."""
+        conn = connect(self.path, readonly=True)
+        try:
+            rows = conn.execute(f"SELECT * FROM {TABLE} ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
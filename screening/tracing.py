@@ -0,0 +1,174 @@
+"""Opt-in per-rerun phase tracing for the Streamlit apps (standard library only).
+
+Streamlit runs the whole app script on every widget interaction. A
+``RerunTrace`` started at the top of the script times named phases of that
+rerun and hands one record per span to a ``JsonlExporter``, which appends
+them to a JSON Lines file from a background thread (at most every
+``flush_interval`` seconds, and at exit). A phase is either a block,
+``with trace.span("load_model"): ...``, or the top-level code between
+``trace.start("sidebar")`` and ``trace.end()``, which leaves long script
+sections at their own indentation. A ``with`` span ended by
+``st.stop()``/``st.rerun()`` (control-flow exceptions) or an error is
+still recorded, with the exception's class name in ``exit``; a phase the
+rerun leaves before its ``trace.end()`` is not recorded.
+
+Record fields: ``ts`` (wall clock at the span's end), ``app``, ``session``,
+``rerun`` (id shared by the spans of one rerun), ``phase``, ``start_ms``
+(offset from the start of the rerun) and ``ms`` (duration), ``exit``.
+``trace_summary.py`` reports p50/p99 per phase.
+
+Tracing is off unless ``MH_TRACE`` names the output file; ``get_tracer``
+then returns a tracer whose spans are shared no-op objects.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+
+
+class JsonlExporter:
+    """Buffered, thread-safe appends of records to a JSON Lines file."""
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.exported = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def export(self, record):
+        with self._lock:
+            self._buffer.append(record)
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        self.exported += len(records)
+
+    def _run(self):
+        while not self._wake.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                pass  # e.g. directory not there yet; the records stay lost, tracing never breaks a rerun
+
+
+class _Span:
+    __slots__ = ("trace", "phase", "t0")
+
+    def __init__(self, trace, phase):
+        self.trace = trace
+        self.phase = phase
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = time.perf_counter()
+        trace = self.trace
+        trace.exporter.export({
+            "ts": time.time(), "app": trace.app, "session": trace.session, "rerun": trace.id,
+            "phase": self.phase, "start_ms": round((self.t0 - trace.t0) * 1000, 3),
+            "ms": round((t1 - self.t0) * 1000, 3), "exit": exc_type.__name__ if exc_type else None,
+        })
+        return False
+
+
+class RerunTrace:
+    """The spans of one script run."""
+
+    __slots__ = ("exporter", "app", "session", "id", "t0", "_open")
+
+    def __init__(self, exporter, app, session=None):
+        self.exporter = exporter
+        self.app = app
+        self.session = session
+        self.id = uuid.uuid4().hex[:16]
+        self.t0 = time.perf_counter()
+        self._open = None
+
+    def span(self, phase):
+        return _Span(self, phase)
+
+    def start(self, phase):
+        """Open ``phase`` until ``end()`` (or the next ``start``), without a ``with`` block."""
+        self.end()
+        self._open = _Span(self, phase).__enter__()
+
+    def end(self):
+        span, self._open = self._open, None
+        if span is not None:
+            span.__exit__(None, None, None)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _NullTrace:
+    __slots__ = ()
+    _span = _NullSpan()
+
+    def span(self, phase):
+        return self._span
+
+    def start(self, phase):
+        pass
+
+    def end(self):
+        pass
+
+
+class Tracer:
+    """Starts a ``RerunTrace`` per script run; without an exporter every trace is a no-op."""
+
+    _null = _NullTrace()
+
+    def __init__(self, exporter=None, app=None):
+        self.exporter = exporter
+        self.app = app
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def rerun(self, session=None):
+        if self.exporter is None:
+            return self._null
+        return RerunTrace(self.exporter, self.app, session)
+
+
+_exporters = {}
+_lock = threading.Lock()
+
+
+def get_tracer(app, path=None):
+    """A tracer for ``app`` writing to ``path`` (default ``$MH_TRACE``); a no-op tracer if neither is set.
+
+    Apps in one process share one exporter per file.
+    """
+    path = path or os.environ.get("MH_TRACE")
+    if not path:
+        return Tracer(None, app)
+    with _lock:
+        exporter = _exporters.get(path)
+        if exporter is None:
+            exporter = _exporters[path] = JsonlExporter(path)
+    return Tracer(exporter, app)
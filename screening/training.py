@@ -0,0 +1,139 @@
+"""Rebuild the hybrid pipeline from a labelled survey: parallel CV and a cached preprocessing step.
+
+``build_pipeline`` recreates the shipped structure, ``Pipeline(pre:
+ColumnTransformer, clf: MultiOutputClassifier(VotingClassifier(m1:
+LogisticRegression, m2: SVC)))`` with median imputation + scaling for age,
+CGPA and the 26 answers and most-frequent imputation + one-hot encoding
+(unknown categories ignored) for the five profile categories, with the
+shipped hyperparameters as defaults.
+
+``cross_validate`` fits the folds in parallel worker processes
+(``joblib``), each fold scoring accuracy and macro-F1 per condition and the
+exact match of all three labels. With ``memory`` (a cache directory) the
+pipeline caches its fitted ColumnTransformer on disk, keyed by its
+parameters and the fold's rows: rerunning the CV on the same data, or
+trying other classifier settings on the same folds, loads each fold's
+preprocessing instead of refitting it. All randomness (fold shuffling, the
+SVC's Platt-scaling CV) is seeded, so the same data and seed give the same
+model.
+"""
+import time
+
+import numpy as np
+
+from .core import CONDITIONS, N_QUESTIONS
+
+LABEL_COLUMNS = [f"{c} Label" for c in CONDITIONS]  # keys of label_encoders.pkl
+NUMERIC = [0, 5] + list(range(7, 7 + N_QUESTIONS))   # age, CGPA, the answers (feature_columns positions)
+CATEGORICAL = [1, 2, 3, 4, 6]                        # gender, university, department, year, scholarship
+SEED = 42
+DEFAULT_PARAMS = {"lr_C": 1.0, "svc_C": 1.0, "svc_gamma": "scale", "weights": None}
+
+
+def build_pipeline(feature_columns, memory=None, lr_C=1.0, svc_C=1.0, svc_gamma="scale", weights=None, seed=SEED):
+    """Unfitted pipeline with the shipped model's structure (defaults: its hyperparameters)."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import VotingClassifier
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.multioutput import MultiOutputClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    from sklearn.svm import SVC
+
+    cols = list(feature_columns)
+    numeric = Pipeline([("imputer", SimpleImputer(strategy="median")), ("scaler", StandardScaler())])
+    categorical = Pipeline([("imputer", SimpleImputer(strategy="most_frequent")),
+                            ("onehot", OneHotEncoder(handle_unknown="ignore"))])
+    pre = ColumnTransformer([("num", numeric, [cols[i] for i in NUMERIC]),
+                             ("cat", categorical, [cols[i] for i in CATEGORICAL])])
+    voting = VotingClassifier([("m1", LogisticRegression(C=lr_C, max_iter=1000)),
+                               ("m2", SVC(C=svc_C, gamma=svc_gamma, probability=True, random_state=seed))],
+                              voting="soft", weights=weights)
+    return Pipeline([("pre", pre), ("clf", MultiOutputClassifier(voting))], memory=memory)
+
+
+def encode_labels(frame):
+    """``({label column: LabelEncoder}, Y)`` with Y (n, 3) class indices, like ``label_encoders.pkl``."""
+    from sklearn.preprocessing import LabelEncoder
+
+    encoders, Y = {}, []
+    for col in LABEL_COLUMNS:
+        enc = LabelEncoder()
+        Y.append(enc.fit_transform(frame[col].astype(str).str.strip()))
+        encoders[col] = enc
+    return encoders, np.column_stack(Y)
+
+
+def folds(n_rows, n_splits=5, seed=SEED):
+    """Shuffled, seeded K-fold ``(train, test)`` index pairs."""
+    from sklearn.model_selection import KFold
+
+    return list(KFold(n_splits, shuffle=True, random_state=seed).split(np.arange(n_rows)))
+
+
+def fold_scores(Y_true, Y_pred):
+    """Per-condition accuracy and macro-F1, plus the exact match of all three labels."""
+    from sklearn.metrics import accuracy_score, f1_score
+
+    scores = {c: {"accuracy": float(accuracy_score(Y_true[:, k], Y_pred[:, k])),
+                  "macro_f1": float(f1_score(Y_true[:, k], Y_pred[:, k], average="macro", zero_division=0))}
+              for k, c in enumerate(CONDITIONS)}
+    scores["exact_match"] = float((Y_true == Y_pred).all(axis=1).mean())
+    return scores
+
+
+def fit_fold(X, Y, train, test, feature_columns, params, memory=None, seed=SEED):
+    """Fit one fold and score it; runs in a worker process under ``cross_validate``."""
+    from .core import silence_imputer_warning
+
+    silence_imputer_warning()
+    model = build_pipeline(feature_columns, memory=memory, seed=seed, **params)
+    t0 = time.perf_counter()
+    model.fit(X.iloc[train], Y[train])
+    t1 = time.perf_counter()
+    Y_pred = model.predict(X.iloc[test])
+    t2 = time.perf_counter()
+    return {"fit_seconds": t1 - t0, "predict_ms_per_row": (t2 - t1) / len(test) * 1000,
+            "train_rows": len(train), "test_rows": len(test), "scores": fold_scores(Y[test], Y_pred)}
+
+
+def summarize_folds(results):
+    """Mean and standard deviation of every fold score."""
+    summary = {}
+    for key in CONDITIONS:
+        summary[key] = {m: {"mean": float(np.mean([r["scores"][key][m] for r in results])),
+                            "std": float(np.std([r["scores"][key][m] for r in results]))}
+                        for m in ("accuracy", "macro_f1")}
+    exact = [r["scores"]["exact_match"] for r in results]
+    summary["exact_match"] = {"mean": float(np.mean(exact)), "std": float(np.std(exact))}
+    return summary
+
+
+def cross_validate(X, Y, feature_columns, params=None, n_splits=5, n_jobs=-1, memory=None, seed=SEED):
+    """K-fold CV with the folds fitted in parallel; returns per-fold results and their summary."""
+    from joblib import Parallel, delayed
+
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    t0 = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(fit_fold)(X, Y, train, test, feature_columns, params, memory, seed)
+        for train, test in folds(len(X), n_splits, seed))
+    return {"n_splits": n_splits, "n_jobs": n_jobs, "wall_seconds": time.perf_counter() - t0,
+            "folds": results, "summary": summarize_folds(results)}
+
+
+def fit_final(X, Y, feature_columns, params=None, n_jobs=-1, seed=SEED):
+    """The deployable model, fitted on all rows (the three outputs in parallel).
+
+    Not cached: a transformer loaded from the cache pickles to different
+    bytes, and the artifact should be byte-identical for the same data and seed.
+    """
+    from .core import silence_imputer_warning
+
+    silence_imputer_warning()
+    model = build_pipeline(feature_columns, seed=seed, **{**DEFAULT_PARAMS, **(params or {})})
+    model.set_params(clf__n_jobs=n_jobs)
+    model.fit(X, Y)
+    model.set_params(clf__n_jobs=None)  # ship it like the original artifact
+    return model
@@ -0,0 +1,366 @@
+"""Local HTTP scoring service (standard library only).
+
+Endpoints:
+    POST /predict   {"features": {...}} for one student, or {"rows": [{...}, ...]} for a batch.
+                    Needs a Content-Length (411 without, 400 if invalid, 413 over 8 MiB);
+                    503 with Retry-After while --max-in-flight scoring jobs are unfinished.
+                    Keys are the feature_columns.pkl names or the short aliases
+                    age, gender, uni, dept, year, cgpa, sch, q1..q26. Add
+                    "model": "distilled" to score with the student model
+                    (needs --distilled).
+    GET  /healthz   200 while the process is up
+    GET  /readyz    200 once the model is loaded and the workers are warm, 503 before
+    GET  /drift     drift report vs the baseline (needs --drift); ?window=current|last|recent|total
+    GET  /drift/view  the same report as a small HTML admin page
+    GET  /metrics   Prometheus text format: requests, stage latencies, cache, batching, model loads
+
+Usage:
+    python serve.py                          # 127.0.0.1:8000, 2 worker processes
+    python serve.py --port 9000 --workers 4 --max-batch 500 --timeout 5
+    python serve.py --max-in-flight 16         # 503 once 16 scoring jobs are unfinished
+    python serve.py --workers 0              # score in-process (threads), no worker processes
+    python serve.py --distilled              # also load model_distilled/ for "model": "distilled"
+    python serve.py --drift                  # monitor inputs/labels vs drift_baseline.json
+    python serve.py --metrics-file /var/lib/node_exporter/mh.prom   # also write /metrics to a file
+"""
+import argparse
+import html
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from screening import CONDITIONS, Screener, ScoringTimeout, extract_number, feature_aliases, is_emergency
+from screening.metrics import REGISTRY
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+ENDPOINTS = ("/predict", "/healthz", "/readyz", "/drift", "/drift/view", "/metrics")
+REQUESTS = REGISTRY.counter("mh_http_requests_total", "HTTP requests by endpoint and status code", ["endpoint", "code"])
+REQUEST_SECONDS = REGISTRY.histogram("mh_http_request_seconds", "HTTP request latency by endpoint", ["endpoint"])
+IN_FLIGHT = REGISTRY.gauge("mh_http_requests_in_flight", "HTTP requests being handled")
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class Overloaded(RuntimeError):
+    """Too much scoring work is unfinished; the client should retry later."""
+
+
+class ScoringService:
+    """Model lifecycle, payload validation and scoring; independent of HTTP."""
+
+    def __init__(self, workers=2, blas_threads=1, max_batch=1000, timeout=10.0, compiled=False, cache_size=4096,
+                 cascade=False, distilled=False, drift=False, drift_baseline=None, max_in_flight=64):
+        self.workers = workers
+        self.blas_threads = blas_threads
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.compiled = compiled or cascade
+        self.cascade = cascade
+        self.distilled = distilled
+        self.drift = drift
+        self.drift_baseline = drift_baseline
+        self.cache_size = cache_size
+        self.max_in_flight = max_in_flight
+        self.screener = None
+        self.aliases = {}
+        self.short_names = {}
+        self.error = None
+        self.ready = threading.Event()
+        self._executor = None
+        self._unfinished = 0  # scoring calls not yet returned (threads: not yet finished, even past the deadline)
+        self._unfinished_lock = threading.Lock()
+
+    def start(self):
+        """Load the model (and warm the pool) in the background so /healthz answers immediately."""
+        threading.Thread(target=self._load, name="model-loader", daemon=True).start()
+
+    def _load(self):
+        try:
+            screener = Screener.load(compiled=self.compiled, cache_size=self.cache_size)
+            if self.cascade:
+                screener.enable_cascade()
+            if self.distilled:
+                screener.enable_distilled()
+            if self.drift:
+                screener.enable_drift_monitor(self.drift_baseline)
+            if self.workers > 0:
+                screener.enable_process_pool(self.workers, self.blas_threads, self.timeout)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="score")
+            # Concurrent single-row requests share one model call
+            screener.enable_micro_batching(max_batch_size=min(64, self.max_batch), max_wait_ms=5.0)
+            self.aliases = feature_aliases(screener.feature_columns)
+            self.short_names = {col: alias for alias, col in self.aliases.items()}
+            self.screener = screener
+            self.ready.set()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    # --- payload handling ---
+    def parse_row(self, raw):
+        if not isinstance(raw, dict):
+            raise BadRequest("each row must be a JSON object")
+        cols = self.screener.feature_columns
+        row = {}
+        for key, value in raw.items():
+            col = self.aliases.get(key, key)
+            if col not in cols:
+                raise BadRequest(f"unknown feature {key!r}")
+            row[col] = value
+        missing = [c for c in cols if c not in row]
+        if missing:
+            raise BadRequest(f"missing features: {', '.join(self.short_names.get(c, c) for c in missing)}")
+        for c in cols[:7]:
+            v = row[c]
+            # Categories outside the training vocabulary are fine (the apps send some; one-hot ignores them),
+            # but a list or object would reach the encoder and fail as a 500
+            if isinstance(v, bool) or not isinstance(v, (str, int, float)):
+                raise BadRequest(f"profile value {self.short_names.get(c, c)!r} must be a string or a number")
+        row[cols[0]] = extract_number(row[cols[0]])
+        row[cols[5]] = extract_number(row[cols[5]])
+        for c in cols[7:]:
+            v = row[c]
+            if isinstance(v, bool) or not isinstance(v, int) or not 0 <= v <= 3:
+                raise BadRequest(f"answer {self.short_names.get(c, c)!r} must be an integer 0-3")
+        return row
+
+    def predict(self, payload):
+        if not isinstance(payload, dict):
+            raise BadRequest("payload must be a JSON object")
+        single = "features" in payload
+        raw_rows = [payload["features"]] if single else payload.get("rows")
+        if not isinstance(raw_rows, list) or not raw_rows:
+            raise BadRequest('expected {"features": {...}} or a non-empty {"rows": [...]}')
+        if len(raw_rows) > self.max_batch:
+            raise BadRequest(f"batch of {len(raw_rows)} rows exceeds max batch size {self.max_batch}")
+        variant = payload.get("model", "full")
+        if variant not in ("full", "distilled"):
+            raise BadRequest(f'unknown model {variant!r}; expected "full" or "distilled"')
+        if variant == "distilled" and self.screener.distilled is None:
+            raise BadRequest("the distilled model is not loaded (start the service with --distilled)")
+        rows = [self.parse_row(r) for r in raw_rows]
+
+        if variant == "distilled":  # microseconds per row: scored on the request thread
+            results = self.screener.predict_many(rows, distilled=True)
+        else:
+            results = self._score(rows)
+        answer_cols = self.screener.feature_columns[7:]
+        out = []
+        for row, res in zip(rows, results):
+            item = {r.condition: {"label": r.label, "confidence": round(r.confidence, 2),
+                                  "severity": r.bucket, "low_risk": r.is_low} for r in res}
+            item["emergency"] = is_emergency([row[c] for c in answer_cols])
+            out.append(item)
+        return {"result": out[0]} if single else {"results": out}
+
+    def _score(self, rows):
+        """Score with a deadline, refusing new work while ``max_in_flight`` jobs are unfinished.
+
+        Work past its deadline keeps running (in a thread or a worker), so
+        it still counts: without the cap, the backlog would grow without
+        bound under overload. With the pool, the unfinished worker jobs
+        count too (coalesced requests share a job, so the larger count wins).
+        """
+        pool = self.screener.pool
+        with self._unfinished_lock:
+            if max(self._unfinished, pool.pending if pool is not None else 0) >= self.max_in_flight:
+                raise Overloaded(f"{self.max_in_flight} scoring jobs are unfinished; retry later")
+            self._unfinished += 1
+        if self._executor is None:
+            try:
+                return self.screener.predict_many(rows)  # pool enforces the deadline
+            finally:
+                self._finished()
+        future = self._executor.submit(self.screener.predict_many, rows)
+        future.add_done_callback(self._finished)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise ScoringTimeout(f"scoring did not finish within {self.timeout} s") from None
+
+    def _finished(self, _=None):
+        with self._unfinished_lock:
+            self._unfinished -= 1
+
+
+def drift_page(report):
+    """Minimal HTML view of a drift report for operators."""
+    rows = "".join(
+        f"<tr><td>{html.escape(f['feature'])}</td><td>{f['group']}</td><td>{f['psi']:.4f}</td>"
+        f"<td>{f['kl']:.4f}</td><td class='{f['status'].split()[0]}'>{f['status']}</td></tr>"
+        for f in report["features"])
+    links = " | ".join(f"<a href='?window={w}'>{w}</a>" for w in ("current", "last", "recent", "total"))
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'><title>Drift monitor</title><style>"
+        "body{font-family:sans-serif;margin:24px} td,th{padding:3px 10px;text-align:left}"
+        ".shift{color:#c62828;font-weight:bold} .moderate{color:#e65100}</style></head><body>"
+        f"<h2>Drift monitor: <span class='{report['status'].split()[0]}'>{report['status']}</span></h2>"
+        f"<p>Window <b>{report['window']}</b> ({report['n']} predictions, {report['windows_closed']} closed windows "
+        f"of {report['window_size']}) vs baseline of {report['baseline_n']}. {links}</p>"
+        "<table><tr><th>feature</th><th>group</th><th>PSI</th><th>KL</th><th>status</th></tr>"
+        f"{rows}</table><p>PSI &lt; 0.1 stable, 0.1-0.25 moderate, &ge; 0.25 shift.</p></body></html>"
+    )
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # listen backlog; the default of 5 drops connections under load
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls
+
+        def log_message(self, fmt, *args):  # keep the console quiet under load
+            pass
+
+        def _send(self, status, body, content_type="application/json", headers=None):
+            endpoint = urlsplit(self.path).path
+            endpoint = endpoint if endpoint in ENDPOINTS else "other"
+            REQUESTS.labels(endpoint, status).inc()
+            REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - self._t0)
+            data = (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _drift(self, url):
+            if not service.ready.is_set():
+                self._send(503, {"error": "model not ready"})
+                return
+            monitor = service.screener.drift
+            if monitor is None:
+                self._send(404, {"error": "drift monitor not enabled (start the service with --drift)"})
+                return
+            window = parse_qs(url.query).get("window", ["recent"])[0]
+            try:
+                report = monitor.report(window)
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+                return
+            if url.path == "/drift/view":
+                self._send(200, drift_page(report), "text/html; charset=utf-8")
+            else:
+                self._send(200, report)
+
+        def do_GET(self):
+            self._t0 = time.perf_counter()
+            url = urlsplit(self.path)
+            if url.path == "/healthz":
+                self._send(200, {"status": "ok"})
+            elif url.path == "/readyz":
+                if service.ready.is_set():
+                    manifest = service.screener.manifest or {}
+                    self._send(200, {"status": "ready", "conditions": CONDITIONS,
+                                     "model_version": manifest.get("version"),
+                                     "content_hash": manifest.get("content_hash")})
+                else:
+                    self._send(503, {"status": "error" if service.error else "loading", "error": service.error})
+            elif url.path in ("/drift", "/drift/view"):
+                self._drift(url)
+            elif url.path == "/metrics":
+                self._send(200, REGISTRY.render(), "text/plain; version=0.0.4; charset=utf-8")
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            self._t0 = time.perf_counter()
+            IN_FLIGHT.inc()
+            try:
+                self._post()
+            finally:
+                IN_FLIGHT.dec()
+
+        def _post(self):
+            # Every early reply leaves the body unread, so the connection cannot be reused
+            if urlsplit(self.path).path != "/predict":
+                self.close_connection = True
+                self._send(404, {"error": "not found"})
+                return
+            if not service.ready.is_set():
+                self.close_connection = True
+                self._send(503, {"error": "model not ready"})
+                return
+            header = self.headers.get("Content-Length")
+            if header is None:
+                self.close_connection = True
+                self._send(411, {"error": "Content-Length required"})
+                return
+            try:
+                length = int(header)
+            except ValueError:
+                length = -1
+            if length < 0 or length > MAX_BODY_BYTES:
+                self.close_connection = True
+                if length < 0:
+                    self._send(400, {"error": f"invalid Content-Length {header!r}"})
+                else:
+                    self._send(413, {"error": f"body larger than {MAX_BODY_BYTES} bytes"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length) or b"null")
+                self._send(200, service.predict(payload))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                self._send(400, {"error": "invalid JSON"})
+            except BadRequest as e:
+                self._send(400, {"error": str(e)})
+            except ScoringTimeout as e:
+                self._send(504, {"error": str(e)})
+            except Overloaded as e:
+                self._send(503, {"error": str(e)}, headers={"Retry-After": "1"})
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP scoring service for the hybrid model.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (0 = score in-process)")
+    parser.add_argument("--blas-threads", type=int, default=1, help="BLAS/OpenMP threads per worker")
+    parser.add_argument("--max-batch", type=int, default=1000, help="Max rows per /predict request")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request scoring deadline (s)")
+    parser.add_argument("--max-in-flight", type=int, default=64,
+                        help="Unfinished scoring jobs (including ones past the deadline) before /predict returns 503")
+    parser.add_argument("--compiled", action="store_true", help="Use the NumPy-only compiled model")
+    parser.add_argument("--cascade", action="store_true", help="Compiled model with LR-first early exit")
+    parser.add_argument("--distilled", action="store_true",
+                        help='Also load the distilled student for requests with "model": "distilled"')
+    parser.add_argument("--drift", action="store_true", help="Monitor input and label drift (GET /drift)")
+    parser.add_argument("--drift-baseline", help="Drift baseline file (default: drift_baseline.json if present)")
+    parser.add_argument("--metrics-file", help="Also write the /metrics text to this file every 15 s")
+    args = parser.parse_args(argv)
+
+    service = ScoringService(args.workers, args.blas_threads, args.max_batch, args.timeout, args.compiled,
+                             cascade=args.cascade, distilled=args.distilled,
+                             drift=args.drift or bool(args.drift_baseline), drift_baseline=args.drift_baseline,
+                             max_in_flight=args.max_in_flight)
+    service.start()
+    if args.metrics_file:
+        REGISTRY.start_textfile_writer(args.metrics_file)
+    server = ScoringHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving on http://{args.host}:{args.port} (workers={args.workers}, max batch={args.max_batch})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Summarize per-rerun phase traces (``MH_TRACE`` JSONL) as p50/p99 per phase.
+
+Each line of the trace file is one span of one Streamlit rerun (see
+``screening.tracing``). Per phase this prints the number of spans, p50, p90,
+p99 and max in milliseconds, and the phase's share of all traced rerun
+time. ``rerun`` is the wall time of a whole rerun (up to the end of its last
+span) and ``(untraced)`` the part of it outside any span (module-level
+code between phases). Spans ended by ``st.stop()``/``st.rerun()`` are
+counted per exit type.
+
+Usage:
+    MH_TRACE=traces.jsonl streamlit run app_v3.py
+    python trace_summary.py traces.jsonl
+    python trace_summary.py traces.jsonl --app app_v3 --last-minutes 60 --json
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from collections import Counter, defaultdict
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+
+def read_spans(path, app=None, session=None, since=None):
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                span = json.loads(line)
+            except ValueError:
+                print(f"skipping line {n}: not JSON", file=sys.stderr)  # e.g. a torn final write
+                continue
+            if app and span.get("app") != app:
+                continue
+            if session and span.get("session") != session:
+                continue
+            if since and span.get("ts", 0) < since:
+                continue
+            yield span
+
+
+def summarize(spans):
+    """Per-phase latency stats in script order, plus rerun/untraced rows and counts."""
+    by_phase = defaultdict(list)
+    starts = defaultdict(list)  # rerun id -> [(start, phase)]
+    reruns = defaultdict(lambda: [0.0, 0.0])  # rerun id -> [end of last span, sum of spans]
+    exits = Counter()
+    sessions = set()
+    for s in spans:
+        by_phase[s["phase"]].append(s["ms"])
+        key = (s["app"], s["rerun"])
+        starts[key].append((s["start_ms"], s["phase"]))
+        r = reruns[key]
+        r[0] = max(r[0], s["start_ms"] + s["ms"])
+        r[1] += s["ms"]
+        sessions.add(s["session"])
+        if s.get("exit"):
+            exits[(s["phase"], s["exit"])] += 1
+    # Script order: a phase goes after every phase seen before it in some rerun
+    before = defaultdict(set)
+    for seq in starts.values():
+        seq.sort()
+        for i, (_, phase) in enumerate(seq):
+            before[phase].update(p for _, p in seq[:i] if p != phase)
+    order = sorted(by_phase, key=lambda p: len(before[p]))
+    by_phase = {p: by_phase[p] for p in order}
+    by_phase["rerun"] = [end for end, _ in reruns.values()]
+    by_phase["(untraced)"] = [max(0.0, end - traced) for end, traced in reruns.values()]
+    total = sum(by_phase["rerun"]) or 1.0
+    rows = []
+    for phase, values in by_phase.items():
+        values.sort()
+        rows.append({
+            "phase": phase, "n": len(values), "p50": percentile(values, 50), "p90": percentile(values, 90),
+            "p99": percentile(values, 99), "max": values[-1] if values else float("nan"),
+            "share": sum(values) / total if phase != "rerun" else 1.0,
+        })
+    return {"reruns": len(reruns), "sessions": len(sessions), "phases": rows,
+            "exits": [{"phase": p, "exit": e, "n": n} for (p, e), n in exits.most_common()]}
+
+
+def print_summary(summary):
+    print(f"{summary['reruns']} reruns in {summary['sessions']} sessions")
+    print(f"{'phase':16s} {'n':>7s} {'p50 ms':>9s} {'p90 ms':>9s} {'p99 ms':>9s} {'max ms':>9s} {'share':>7s}")
+    for r in summary["phases"]:
+        print(f"{r['phase']:16s} {r['n']:7d} {r['p50']:9.2f} {r['p90']:9.2f} {r['p99']:9.2f} "
+              f"{r['max']:9.2f} {r['share']:7.1%}")
+    for e in summary["exits"]:
+        print(f"{e['n']} {e['phase']} spans ended by {e['exit']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize Streamlit rerun phase traces.")
+    parser.add_argument("path", help="Trace file written with MH_TRACE")
+    parser.add_argument("--app", help="Only this app (e.g. app_v3)")
+    parser.add_argument("--session", help="Only this session id")
+    parser.add_argument("--last-minutes", type=float, help="Only spans from the last N minutes")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    since = time.time() - args.last_minutes * 60 if args.last_minutes else None
+    summary = summarize(read_spans(args.path, args.app, args.session, since))
+    if not summary["reruns"]:
+        print("no spans")
+        return 1
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
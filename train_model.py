@@ -0,0 +1,245 @@
+"""Retrain the hybrid model from a labelled survey export and report CV timing and accuracy.
+
+The input is a CSV or Excel file with the 33 ``feature_columns.pkl``
+headers plus the three label columns (``Anxiety Label``, ``Stress Label``,
+``Depression Label``). Features are cleaned the way ``batch_score.py``
+cleans them; rows without all three labels are dropped. The script runs a
+seeded K-fold cross-validation with the folds fitted in parallel (see
+``screening.training``), fits the final model on all rows and writes the
+three artifacts the apps load plus ``training_report.json`` to the output
+directory:
+
+    mental_health_hybrid_model.pkl  label_encoders.pkl  feature_columns.pkl
+
+Fitted preprocessing is cached in ``--cache-dir`` (Pipeline ``memory``),
+so a rerun on the same data skips it. Nothing the apps load is touched
+unless asked: review the report, then ``--publish`` rebuilds the served
+``model_bundle/`` from the new artifacts (``--bundle DIR`` builds a bundle
+elsewhere).
+
+``--search`` instead runs a successive-halving search over LR ``C``, SVC
+``C``/``gamma`` and the voting weights (``screening.search``; ``--grid``
+takes a JSON grid), scoring macro-F1, compiled single-row latency and
+support vectors. It writes ``search_report.json`` with every round and the
+Pareto frontier, and prints the frontier with the flags that retrain it.
+
+Usage:
+    python train_model.py survey.csv -o trained/
+    python train_model.py survey.xlsx -o trained/ --folds 10 --jobs 4 --seed 7
+    python train_model.py survey.csv -o trained/ --svc-C 2 --weights 1,2 --no-cv
+    python train_model.py survey.csv -o trained/ --publish   # the apps load the retrained model
+    python train_model.py survey.csv -o search/ --search --folds 3 --factor 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+from joblib import effective_n_jobs
+import pandas as pd
+
+from batch_score import align_headers, prepare_features
+from screening import CONDITIONS
+from screening.bundle import BundleError, save_bundle, sha256_file
+from screening.core import BUNDLE_PATH, COLUMNS_PATH, ENCODERS_PATH, MODEL_PATH, ROOT
+from screening.search import GRID, candidates, pareto_front, successive_halving
+from screening.training import LABEL_COLUMNS, SEED, cross_validate, encode_labels, fit_final
+
+CACHE_DIR = os.path.join(ROOT, ".train_cache")
+ARTIFACTS = {"model": os.path.basename(MODEL_PATH), "encoders": os.path.basename(ENCODERS_PATH),
+             "columns": os.path.basename(COLUMNS_PATH)}
+
+
+def read_survey(path, feature_columns):
+    """``(X, labels, dropped)``: cleaned features and label columns of the rows with all labels."""
+    df = pd.read_excel(path) if str(path).lower().endswith((".xlsx", ".xls")) else pd.read_csv(path)
+    try:
+        df = align_headers(df, list(feature_columns) + LABEL_COLUMNS)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+    labelled = df[LABEL_COLUMNS].notna().all(axis=1) & (df[LABEL_COLUMNS].astype(str).apply(lambda s: s.str.strip()) != "").all(axis=1)
+    try:
+        X = prepare_features(df[labelled], feature_columns).reset_index(drop=True)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+    return X, df.loc[labelled, LABEL_COLUMNS].reset_index(drop=True), int((~labelled).sum())
+
+
+def parse_params(args):
+    weights = [float(w) for w in args.weights.split(",")] if args.weights else None
+    gamma = args.svc_gamma if args.svc_gamma in ("scale", "auto") else float(args.svc_gamma)
+    return {"lr_C": args.lr_C, "svc_C": args.svc_C, "svc_gamma": gamma, "weights": weights}
+
+
+def param_flags(params):
+    """The command-line flags that retrain with ``params``."""
+    weights = params["weights"]
+    return (f"--lr-C {params['lr_C']:g} --svc-C {params['svc_C']:g} --svc-gamma {params['svc_gamma']}"
+            + (f" --weights {','.join(f'{w:g}' for w in weights)}" if weights else ""))
+
+
+def versions():
+    import numpy
+    import sklearn
+
+    return {"python": sys.version.split()[0], "numpy": numpy.__version__, "sklearn": sklearn.__version__}
+
+
+def print_report(report):
+    data, timing = report["data"], report["timing"]
+    print(f"{data['rows']} labelled rows ({data['dropped_rows']} dropped), seed {report['seed']}")
+    cv = report.get("cv")
+    if cv:
+        print(f"{cv['n_splits']}-fold CV ({effective_n_jobs(cv['n_jobs'])} jobs), {cv['wall_seconds']:.1f} s wall, "
+              f"{sum(f['fit_seconds'] for f in cv['folds']):.1f} s of fold fits")
+        print(f"{'':12s} {'accuracy':>16s} {'macro-F1':>16s}")
+        for c in CONDITIONS:
+            s = cv["summary"][c]
+            print(f"{c:12s} {s['accuracy']['mean']:9.3f} ± {s['accuracy']['std']:.3f} "
+                  f"{s['macro_f1']['mean']:9.3f} ± {s['macro_f1']['std']:.3f}")
+        e = cv["summary"]["exact_match"]
+        print(f"{'all three':12s} {e['mean']:9.3f} ± {e['std']:.3f}")
+    final = report["final"]
+    print(f"final fit {timing['final_fit_seconds']:.1f} s, support vectors "
+          + ", ".join(f"{c} {n}" for c, n in final["support_vectors"].items())
+          + f"; total {timing['total_seconds']:.1f} s")
+
+
+def print_frontier(frontier):
+    print(f"{'macro-F1':>8s} {'ms/row':>7s} {'SVs':>5s}  flags")
+    for r in frontier:
+        print(f"{r['macro_f1']:8.3f} {r['latency_ms']:7.3f} {r['support_vectors']:5d}  {param_flags(r['params'])}")
+
+
+def run_search(args, X, Y, feature_columns, memory, t_start):
+    grid = GRID
+    if args.grid:
+        with open(args.grid, encoding="utf-8") as f:
+            grid = {**GRID, **json.load(f)}
+    params_list = candidates(grid)
+    print(f"{len(params_list)} candidates, {len(X)} rows, {args.folds}-fold CV, factor {args.factor}, "
+          f"{effective_n_jobs(args.jobs)} jobs")
+    rounds = successive_halving(X, Y, feature_columns, params_list, factor=args.factor, min_rows=args.min_rows,
+                                n_splits=args.folds, n_jobs=args.jobs, memory=memory, seed=args.seed, log=print)
+    frontier = pareto_front(rounds[-1]["results"])
+    report = {
+        "data": {"path": os.path.abspath(args.input), "sha256": sha256_file(args.input), "rows": len(X)},
+        "grid": grid,
+        "factor": args.factor,
+        "n_splits": args.folds,
+        "seed": args.seed,
+        "rounds": rounds,
+        "frontier": frontier,
+        "total_seconds": time.perf_counter() - t_start,
+        "versions": versions(),
+    }
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, "search_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Pareto frontier ({len(frontier)} of {len(rounds[-1]['results'])} final candidates):")
+    print_frontier(frontier)
+    print(f"wrote search_report.json to {args.output}; retrain a frontier point with "
+          f"python train_model.py {args.input} -o <dir> <flags>")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retrain the hybrid model from a labelled survey export.")
+    parser.add_argument("input", help="CSV or Excel file with the feature_columns.pkl headers and the label columns")
+    parser.add_argument("-o", "--output", required=True, help="Directory for the artifacts and training_report.json")
+    parser.add_argument("--columns", default=COLUMNS_PATH, help="Feature columns to train on (default: the shipped list)")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel fold fits (-1: one per core)")
+    parser.add_argument("--seed", type=int, default=SEED, help="Fold shuffling and SVC Platt-scaling seed")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Pipeline memory for fitted preprocessing")
+    parser.add_argument("--no-cache", action="store_true", help="Refit the preprocessing every time")
+    parser.add_argument("--no-cv", action="store_true", help="Only fit and write the final model")
+    parser.add_argument("--lr-C", type=float, default=1.0, help="LogisticRegression inverse regularization")
+    parser.add_argument("--svc-C", type=float, default=1.0, help="SVC penalty")
+    parser.add_argument("--svc-gamma", default="scale", help="SVC RBF gamma: scale, auto or a number")
+    parser.add_argument("--weights", help="Soft-voting weights LR,SVC (default: equal)")
+    publish = parser.add_mutually_exclusive_group()
+    publish.add_argument("--publish", dest="bundle", action="store_const", const=BUNDLE_PATH,
+                         help=f"Rebuild the served bundle ({os.path.basename(BUNDLE_PATH)}/) from the new artifacts")
+    publish.add_argument("--bundle", help="Build a bundle from the new artifacts in this directory")
+    parser.add_argument("--search", action="store_true", help="Successive-halving search instead of one fit")
+    parser.add_argument("--grid", help="JSON file overriding search grid entries (lr_C, svc_C, svc_gamma, weights)")
+    parser.add_argument("--factor", type=int, default=3, help="Search: keep 1/factor per round, factor x rows")
+    parser.add_argument("--min-rows", type=int, default=300, help="Search: rows in the first round at least")
+    args = parser.parse_args(argv)
+
+    t_start = time.perf_counter()
+    feature_columns = list(joblib.load(args.columns))
+    try:
+        X, labels, dropped = read_survey(args.input, feature_columns)
+    except ValueError as e:
+        print(f"error: {e}")
+        return 1
+    encoders, Y = encode_labels(labels)
+    params = parse_params(args)
+    memory = None if args.no_cache else args.cache_dir
+    t_read = time.perf_counter()
+    if args.search:
+        return run_search(args, X, Y, feature_columns, memory, t_start)
+
+    cv = None
+    if not args.no_cv:
+        cv = cross_validate(X, Y, feature_columns, params, n_splits=args.folds, n_jobs=args.jobs,
+                            memory=memory, seed=args.seed)
+    t_cv = time.perf_counter()
+    model = fit_final(X, Y, feature_columns, params, n_jobs=args.jobs, seed=args.seed)
+    t_fit = time.perf_counter()
+
+    os.makedirs(args.output, exist_ok=True)
+    paths = {k: os.path.join(args.output, name) for k, name in ARTIFACTS.items()}
+    joblib.dump(model, paths["model"])
+    joblib.dump(encoders, paths["encoders"])
+    joblib.dump(feature_columns, paths["columns"])
+
+    svcs = [est.estimators_[1] for est in model.named_steps["clf"].estimators_]
+    report = {
+        "data": {"path": os.path.abspath(args.input), "sha256": sha256_file(args.input), "rows": len(X),
+                 "dropped_rows": dropped,
+                 "class_counts": {c: labels[col].astype(str).str.strip().value_counts().sort_index().to_dict()
+                                  for c, col in zip(CONDITIONS, LABEL_COLUMNS)}},
+        "params": params,
+        "seed": args.seed,
+        "cache_dir": memory,
+        "cv": cv,
+        "final": {"support_vectors": {c: int(svc.support_vectors_.shape[0]) for c, svc in zip(CONDITIONS, svcs)}},
+        "timing": {"read_seconds": t_read - t_start, "cv_seconds": t_cv - t_read, "final_fit_seconds": t_fit - t_cv,
+                   "total_seconds": time.perf_counter() - t_start},
+        "versions": versions(),
+        "artifacts": {name: sha256_file(p) for name, p in paths.items()},
+    }
+    bundle = None
+    if args.bundle:
+        try:
+            bundle = save_bundle(args.bundle, model, encoders, feature_columns,
+                                 source={os.path.basename(p): report["artifacts"][k] for k, p in paths.items()})
+        except BundleError as e:
+            print(f"error: could not build {args.bundle}: {e}")
+            return 1
+        report["bundle"] = {"path": os.path.abspath(args.bundle), "version": bundle["version"],
+                            "content_hash": bundle["content_hash"]}
+    with open(os.path.join(args.output, "training_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report)
+    print(f"wrote {', '.join(ARTIFACTS.values())} and training_report.json to {args.output}")
+    if bundle:
+        served = os.path.abspath(args.bundle) == BUNDLE_PATH
+        print(f"rebuilt {args.bundle}: version {bundle['version']}"
+              + ("; the apps now load this model. Rerun calibrate_cascade.py, distill_model.py and "
+                 "compact_model.py if you use them: files derived from the previous model are refused."
+                 if served else ""))
+    else:
+        print(f"the apps still load {os.path.basename(BUNDLE_PATH)}/; after reviewing the report, ship this retrain "
+              f"with --publish or python build_bundle.py --model {paths['model']} --encoders "
+              f"{paths['encoders']} --columns {paths['columns']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())